@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Check the import cost of the CLI against a time budget
+
+Imports a module in a fresh interpreter with `python -X importtime`, parses
+the report, and prints the module's cumulative import time together with
+the slowest imports beneath it. Fails (exit code 1) when the median over
+several runs exceeds the budget, or when a heavy dependency that should
+only load in the stage that uses it shows up.
+
+Usage:
+    python benchmarks/bench_imports.py [--module url2md.cli] [--budget-ms 150] [--runs 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded by the fetch/clean/translate stages, never by importing the CLI
+HEAVY_MODULES = ("crawl4ai", "httpx", "bs4", "lxml", "html2text", "playwright")
+
+
+def import_times(module: str) -> list[tuple[str, int, int]]:
+    """Import module in a fresh interpreter
+
+    Returns:
+        (module name, self µs, cumulative µs) for every import, in report order
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check CLI import time against a budget')
+    parser.add_argument('--module', default='url2md.cli', help='Module to import (default: url2md.cli)')
+    parser.add_argument('--budget-ms', type=float, default=150, help='Allowed cumulative import time (default: 150)')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list (default: 10)')
+    args = parser.parse_args()
+
+    import_times(args.module)  # compile .pyc files first, so runs measure imports only
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [next(cumulative for name, _, cumulative in times if name == args.module) / 1000
+              for times in runs]
+    total = statistics.median(totals)
+
+    print(f"{'module':<48} {'self ms':>9} {'cumulative ms':>14}")
+    print("-" * 73)
+    for name, self_us, cumulative_us in sorted(runs[-1], key=lambda t: t[2], reverse=True)[:args.top]:
+        print(f"{name:<48} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+    print("-" * 73)
+    print(f"import {args.module}: {total:.1f} ms median of {args.runs} (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    loaded = sorted({name.split('.')[0] for name, _, _ in runs[-1]} & set(HEAVY_MODULES))
+    if loaded:
+        print(f"❌ Heavy dependencies imported eagerly: {', '.join(loaded)}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"❌ Over budget by {total - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("✅ Within budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
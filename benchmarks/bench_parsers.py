@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Benchmark the HTML parser backends on saved pages
+
+Times, per page and backend:
+  parse    - building the tree from raw HTML
+  extract  - extract_main_content() on an already parsed page
+  validate - cross_validate_clean() on an already parsed page
+
+Usage:
+    python benchmarks/bench_parsers.py [--runs N] [page.html ...]
+
+Without arguments every file in benchmarks/fixtures/ is used.
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from url2md.converter import URL2MDConverter
+from url2md.document import ParsedDocument
+from url2md.parsers import BACKENDS
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def median_ms(func, runs: int) -> float:
+    """Median wall time of func() in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_page(html: str, backend_name: str, log_dir: Path, runs: int) -> dict:
+    """Time parse / extract / validate for one page on one backend"""
+    converter = URL2MDConverter(parser_backend=backend_name)
+    converter.log_dir = log_dir
+    markdown = converter.html_to_markdown(html)
+
+    def parsed() -> ParsedDocument:
+        document = ParsedDocument(html, converter.parser)
+        document.root
+        return document
+
+    document = parsed()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {
+            'parse': median_ms(parsed, runs),
+            'extract': median_ms(lambda: converter.extract_main_content(document, "https://example.com/"), runs),
+            'validate': median_ms(lambda: converter.cross_validate_clean(markdown, document), runs),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends')
+    parser.add_argument('pages', nargs='*', help='HTML files (default: benchmarks/fixtures/*.html)')
+    parser.add_argument('--runs', type=int, default=20, help='Runs per measurement (default: 20)')
+    args = parser.parse_args()
+
+    pages = [Path(p) for p in args.pages] or sorted(FIXTURES_DIR.glob('*.html'))
+    if not pages:
+        print(f"❌ No pages found in {FIXTURES_DIR}")
+        sys.exit(1)
+
+    header = f"{'page':<24} {'backend':<8} {'parse ms':>10} {'extract ms':>11} {'validate ms':>12} {'total ms':>10}"
+    print(header)
+    print("-" * len(header))
+
+    totals = {name: 0.0 for name in BACKENDS}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for page in pages:
+            html = page.read_text(encoding='utf-8')
+            for name in BACKENDS:
+                t = bench_page(html, name, Path(log_dir), args.runs)
+                total = t['parse'] + t['extract'] + t['validate']
+                totals[name] += total
+                print(f"{page.name[:24]:<24} {name:<8} {t['parse']:>10.2f} {t['extract']:>11.2f} "
+                      f"{t['validate']:>12.2f} {total:>10.2f}")
+
+    print("-" * len(header))
+    baseline = totals.get('bs4')
+    for name, total in totals.items():
+        speedup = f"  ({baseline / total:.1f}x vs bs4)" if baseline and name != 'bs4' else ""
+        print(f"{'all pages':<24} {name:<8} {'':>10} {'':>11} {'':>12} {total:>10.2f}{speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""测试批量转换: URL 列表解析 (保留 #片段), 按完成顺序返回结果, 单个失败不影响其他 URL"""
+import asyncio
+import tempfile
+from pathlib import Path
+from url2md.cli import _read_url_list
+from url2md.converter import URL2MDConverter
+from url2md.scheduler import ConversionScheduler
+
+
+PAGE = "<html><head><title>{name}</title></head><body><article><h1>{name}</h1><p>{text}</p></article></body></html>"
+
+
+class StubConverter(URL2MDConverter):
+    """fetch_url 不访问网络: 按 URL 中的延迟返回固定页面, 含 "fail" 的 URL 抛出异常"""
+
+    async def fetch_url(self, url: str) -> tuple[str, str]:
+        name = url.rsplit('/', 1)[-1]
+        await asyncio.sleep(float(name.split('-')[-1]) / 100)
+        if 'fail' in name:
+            raise Exception(f"boom: {name}")
+        return PAGE.format(name=name, text="Body text of the page. " * 10), ""
+
+
+def test_read_url_list():
+    content = """# batch list
+https://site.example/app#/route
+  https://site.example/page#section
+
+   # indented comment
+https://site.example/plain
+"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "urls.txt"
+        path.write_text(content, encoding='utf-8')
+        urls = _read_url_list(str(path))
+    assert urls == [
+        "https://site.example/app#/route",
+        "https://site.example/page#section",
+        "https://site.example/plain",
+    ], urls
+    print("✅ URL 列表: 只把 # 开头的行当作注释, 保留 URL 片段")
+
+
+def test_convert_many():
+    urls = [f"https://site{i}.example/page-{delay}" for i, delay in enumerate([30, 5, 20, 1])]
+    urls.insert(2, "https://bad.example/fail-10")
+    converter = StubConverter(cache_mode="bypass", clean_log="off")
+    seen = []
+    results = converter.convert_many(urls, on_result=lambda r: seen.append(r.url),
+                                     scheduler=ConversionScheduler(max_concurrency=10))
+
+    # 按完成顺序返回 (延迟越短越早), 回调顺序一致
+    assert [r.url for r in results] == seen
+    assert [r.url for r in results] == sorted(urls, key=lambda u: int(u.rsplit('-', 1)[-1]))
+
+    failed = [r for r in results if not r.success]
+    assert [r.url for r in failed] == ["https://bad.example/fail-10"]
+    assert "boom" in str(failed[0].error)
+    for result in results:
+        if result.success:
+            name = result.url.rsplit('/', 1)[-1]
+            assert result.title == name and f"**Source:** {result.url}" in result.markdown
+    # 抓取统计随结果返回, 不留在转换器上
+    assert converter.fetch_stats == {}
+    print("✅ convert_many: 结果按完成顺序返回, 失败只影响对应 URL")
+
+
+def test_fetch_stats_bounded():
+    """长期使用的转换器反复调用 convert() 时, fetch_stats 只保留最近一次"""
+    class RecordingConverter(StubConverter):
+        async def fetch_url(self, url: str) -> tuple[str, str]:
+            self.fetch_stats[url] = {'source': 'http'}
+            return await super().fetch_url(url)
+
+    converter = RecordingConverter(cache_mode="bypass", clean_log="off")
+    for i in range(5):
+        converter.convert(f"https://site.example/page{i}-1")
+    assert list(converter.fetch_stats) == ["https://site.example/page4-1"]
+    print("✅ convert(): 抓取统计只保留当前 URL")
+
+
+def test():
+    test_read_url_list()
+    test_convert_many()
+    test_fetch_stats_bounded()
+
+
+if __name__ == "__main__":
+    test()
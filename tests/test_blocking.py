@@ -0,0 +1,136 @@
+"""测试浏览器请求拦截: 域名匹配, 同一注册域名 (第一方) 从不拦截, before_goto 路由按类型/域名拦截并统计"""
+import asyncio
+from url2md.converter import URL2MDConverter, DEFAULT_BLOCKED_DOMAINS, registrable_domain
+
+
+class FakeRequest:
+    def __init__(self, url: str, resource_type: str, frame, navigation: bool = False):
+        self.url = url
+        self.resource_type = resource_type
+        self._frame = frame
+        self._navigation = navigation
+
+    @property
+    def frame(self):
+        if self._frame is None:
+            raise Exception("Service Worker requests do not have an associated frame.")
+        return self._frame
+
+    def is_navigation_request(self) -> bool:
+        return self._navigation
+
+
+class FakeResponse:
+    """sizes 为 None 时模拟页面已关闭, 无法读取实际大小"""
+
+    def __init__(self, headers: dict, sizes=None):
+        self.headers = headers
+        self.request = self
+        self._sizes = sizes
+
+    async def sizes(self) -> dict:
+        if self._sizes is None:
+            raise Exception("Target page, context or browser has been closed")
+        return self._sizes
+
+
+class FakeRoute:
+    def __init__(self, request: FakeRequest):
+        self.request = request
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+class FakePage:
+    """记录 before_goto 安装的路由处理函数和事件监听"""
+
+    def __init__(self):
+        self.main_frame = object()
+        self.handler = None
+        self.listeners = {}
+
+    def on(self, event: str, callback):
+        self.listeners[event] = callback
+
+    async def route(self, pattern: str, handler):
+        self.handler = handler
+
+
+def test_host_matching():
+    assert registrable_domain("blog.hubspot.com") == "hubspot.com"
+    assert registrable_domain("WWW.Example.co.uk.") == "example.co.uk"
+    assert registrable_domain("localhost") == "localhost"
+
+    converter = URL2MDConverter(clean_log="off", block_domains=["tracker.example", ".ads.example.net"])
+    assert converter._is_blocked_host("tracker.example")
+    assert converter._is_blocked_host("cdn.Tracker.example")
+    assert converter._is_blocked_host("x.ads.example.net")
+    assert not converter._is_blocked_host("nottracker.example")
+    assert not converter._is_blocked_host("example.net")
+    # 与页面同一注册域名的请求是第一方请求
+    assert not converter._is_blocked_host("cdn.tracker.example", page_host="www.tracker.example")
+    assert converter._is_blocked_host("cdn.tracker.example", page_host="news.example.org")
+
+    # 默认列表只包含追踪专用的主机, 厂商自己的网站不受影响
+    default = URL2MDConverter(clean_log="off")
+    for host in ["www.google-analytics.com", "js.hs-scripts.com", "cdn.segment.com", "bam.nr-data.net"]:
+        assert default._is_blocked_host(host), host
+    for host in ["blog.hubspot.com", "www.intercom.io", "segment.com", "newrelic.com", "www.optimizely.com"]:
+        assert not default._is_blocked_host(host), host
+    assert not any(domain in DEFAULT_BLOCKED_DOMAINS for domain in ["hubspot.com", "intercom.io", "segment.com"])
+    print("✅ 域名匹配: 子域名被拦截, 第一方请求与厂商网站不被拦截")
+
+
+def test_before_goto_routes():
+    page_url = "https://blog.hubspot.com/marketing/post"
+    converter = URL2MDConverter(clean_log="off")
+    page = FakePage()
+    asyncio.run(converter._before_goto(page, url=page_url))
+    assert page.handler is not None and 'response' in page.listeners
+
+    requests = [
+        (FakeRequest(page_url, "document", page.main_frame, navigation=True), "continue"),
+        (FakeRequest("https://blog.hubspot.com/app.js", "script", page.main_frame), "continue"),
+        (FakeRequest("https://track.hubspot.com/__ptq.gif", "xhr", page.main_frame), "continue"),  # 第一方
+        (FakeRequest("https://www.google-analytics.com/analytics.js", "script", page.main_frame), "abort"),
+        (FakeRequest("https://cdn.example.org/hero.png", "image", page.main_frame), "abort"),
+        (FakeRequest("https://fonts.example.org/a.woff2", "font", page.main_frame), "abort"),
+        (FakeRequest("https://cdn.example.org/site.css", "stylesheet", page.main_frame), "continue"),
+        # Service Worker 请求没有 frame: 放行, 不能让请求悬挂
+        (FakeRequest("https://blog.hubspot.com/offline", "document", None, navigation=True), "continue"),
+    ]
+    for request, expected in requests:
+        route = FakeRoute(request)
+        asyncio.run(page.handler(route))
+        assert route.outcome == expected, (request.url, route.outcome)
+
+    stats = converter.fetch_stats[page_url]
+    assert stats['blocked_requests'] == 3
+    assert stats['blocked_by_type'] == {'script': 1, 'image': 1, 'font': 1}
+
+    # 按实际接收的大小统计 (分块/压缩的响应没有 content-length); 读不到时退回 content-length
+    asyncio.run(page.listeners['response'](FakeResponse(
+        {'transfer-encoding': 'chunked'}, {'responseBodySize': 3000, 'responseHeadersSize': 200})))
+    assert stats['transferred_bytes'] == 3200
+    asyncio.run(page.listeners['response'](FakeResponse({'content-length': '2048'})))
+    assert stats['transferred_bytes'] == 5248
+
+    # 不拦截任何内容时不安装路由
+    page = FakePage()
+    asyncio.run(URL2MDConverter(clean_log="off", block_resource_types=[], block_domains=[])._before_goto(page, url=page_url))
+    assert page.handler is None
+    print("✅ before_goto: 按资源类型和追踪域名拦截, 页面本身与第一方请求放行")
+
+
+def test():
+    test_host_matching()
+    test_before_goto_routes()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,105 @@
+"""测试按 Markdown 结构切分翻译块: 不在代码块或表格中间切断, 标题跟随正文"""
+import random
+
+from url2md.chunker import chunk_markdown, split_blocks
+from url2md.translator import TranslationAgent, TranslationConfig
+
+
+def _fences_balanced(chunk: str) -> bool:
+    return sum(1 for line in chunk.split('\n') if line.lstrip().startswith('```')) % 2 == 0
+
+
+def test_blocks():
+    lines = [
+        "# Title", "", "Intro line one", "intro line two", "## Code",
+        "```python", "x = 1", "", "# not a heading", "```",
+        "| a | b |", "|---|---|", "| 1 | 2 |", "",
+        "* item one", "* item two",
+    ]
+    kinds = [(kind, start, end) for kind, start, end in split_blocks(lines)]
+    assert kinds == [
+        ('heading', 0, 1), ('text', 2, 4), ('heading', 4, 5),
+        ('code', 5, 10), ('table', 10, 13), ('text', 14, 16),
+    ], kinds
+    print("✅ 块识别正确: 标题 / 段落 / 代码块 / 表格 / 列表")
+
+
+def test_packing():
+    code = "```\n" + "\n".join(f"line {i}" for i in range(8)) + "\n```"
+    table = "| k | v |\n|---|---|\n" + "\n".join(f"| {i} | {i * i} |" for i in range(6))
+    content = "\n\n".join([
+        "# Guide", "First paragraph " * 4, "## Setup", code,
+        "## Table", table, "Closing paragraph " * 3,
+    ])
+    chunks = chunk_markdown(content, 120)
+
+    assert len(chunks) > 1
+    assert all(_fences_balanced(chunk) for chunk in chunks)
+    # 代码块与表格没有被切开, 二级标题和后面的内容在同一块
+    assert any(code in chunk for chunk in chunks)
+    assert any(table in chunk for chunk in chunks)
+    assert all(not chunk.rstrip().split('\n')[-1].startswith('#') for chunk in chunks)
+    assert "## Setup\n\n```" in "".join(chunks)
+    # 块之间只丢弃空行, 用空行拼接后内容不变
+    assert [l for l in "\n\n".join(chunks).split('\n') if l] == [l for l in content.split('\n') if l]
+    print(f"✅ 按块打包为 {len(chunks)} 块, 代码块与表格完整")
+
+
+def test_oversized_blocks():
+    code = "```js\n" + "\n".join(f"console.log({i});" for i in range(40)) + "\n```"
+    chunks = chunk_markdown(code, 100)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        lines = chunk.split('\n')
+        assert lines[0] == "```js" and lines[-1] == "```"
+        assert len(chunk) <= 100
+    assert [l for c in chunks for l in c.split('\n')[1:-1]] == code.split('\n')[1:-1]
+    print("✅ 超长代码块在行边界切分, 每块重新加上围栏")
+
+    header = "| name | value |\n|------|-------|"
+    table = header + "\n" + "\n".join(f"| row {i} | {i} |" for i in range(30))
+    chunks = chunk_markdown(table, 120)
+    assert len(chunks) > 1
+    assert all(chunk.startswith(header + "\n") and len(chunk) <= 120 for chunk in chunks)
+    print("✅ 超长表格按行切分, 每块重复表头")
+
+
+def test_random_documents():
+    rng = random.Random(7)
+    for _ in range(200):
+        blocks = []
+        for _ in range(rng.randint(1, 15)):
+            kind = rng.choice(['heading', 'text', 'code', 'table'])
+            if kind == 'heading':
+                blocks.append("#" * rng.randint(1, 4) + " Heading")
+            elif kind == 'text':
+                blocks.append("\n".join("word " * rng.randint(1, 20) for _ in range(rng.randint(1, 4))))
+            elif kind == 'code':
+                blocks.append("```\n" + "\n".join("code();" for _ in range(rng.randint(0, 12))) + "\n```")
+            else:
+                blocks.append("| a | b |\n|---|---|\n" + "\n".join("| x | y |" for _ in range(rng.randint(1, 10))))
+        content = "\n\n".join(blocks)
+        chunk_size = rng.randint(40, 300)
+        chunks = chunk_markdown(content, chunk_size)
+        assert all(_fences_balanced(chunk) for chunk in chunks), content
+        assert all(chunk.strip() for chunk in chunks)
+    print("✅ 随机文档: 所有块的代码围栏成对")
+
+
+def test_agent_uses_chunker():
+    agent = TranslationAgent(TranslationConfig(provider="openai", api_key="test-key", chunk_size=50))
+    content = "# A\n\n```\n" + "x\n" * 30 + "```\n\nText."
+    assert agent._split_content(content) == chunk_markdown(content, 50)
+    print("✅ TranslationAgent 使用结构化切分")
+
+
+def test():
+    test_blocks()
+    test_packing()
+    test_oversized_blocks()
+    test_random_documents()
+    test_agent_uses_chunker()
+
+
+if __name__ == "__main__":
+    test()
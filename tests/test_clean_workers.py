@@ -0,0 +1,45 @@
+"""测试清洗进程池: 在工作进程中清洗的结果与主进程中一致"""
+from pathlib import Path
+from url2md.converter import URL2MDConverter
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+
+def _pages() -> dict:
+    """url -> (html, crawl4ai markdown); 有的页面走 HTML 回退路径, 有的 (None) 由清洗阶段生成 markdown"""
+    pages = {}
+    for i, path in enumerate(sorted(FIXTURES.glob("*.html"))):
+        html = path.read_text(encoding='utf-8')
+        markdown = [URL2MDConverter().html_to_markdown(html), "", None][i % 3]
+        pages[f"https://example.com/{path.stem}"] = (html, markdown)
+    return pages
+
+
+def _convert(converter: URL2MDConverter, pages: dict) -> dict:
+    async def fetch_url(url):
+        return pages[url]
+
+    converter.fetch_url = fetch_url
+    results = converter.convert_many(list(pages))
+    return {r.url: (r.markdown, r.title, r.log_path is not None) for r in results if r.success}
+
+
+def test():
+    pages = _pages()
+    inline = _convert(URL2MDConverter(), pages)
+    pooled_converter = URL2MDConverter(clean_workers=2)
+
+    def render_in_event_loop(html, url):
+        raise AssertionError("markdown rendered in the main process")
+
+    # 使用进程池时, 静态页面的 markdown 只在工作进程中生成
+    pooled_converter.render_markdown = render_in_event_loop
+    pooled = _convert(pooled_converter, pages)
+    assert len(inline) == len(pages)
+    assert pooled == inline
+    print(f"✅ 进程池清洗结果与主进程一致 ({len(pages)} 个页面)")
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,131 @@
+"""测试清洗日志: 各模式的缓冲/写出行为, 关闭时不格式化消息, JSONL 决策记录, 出错时仍写出日志"""
+import io
+import json
+import tempfile
+import contextlib
+from pathlib import Path
+from url2md.cleanlog import CleanLog
+from url2md.converter import URL2MDConverter
+
+
+class Unprintable:
+    def __str__(self):
+        raise AssertionError("message formatted while logging is off")
+
+
+def test_modes():
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = Path(tmp) / "clean.log"
+        log = CleanLog(text_path, "text")
+        log.write("Section %s: %.2f", 1, 0.5)
+        log.event("section", index=1)
+        assert not text_path.exists()  # 缓冲, 关闭时一次写出
+        log.close()
+        assert text_path.read_text(encoding='utf-8') == "Section 1: 0.50\n"
+
+        debug_path = Path(tmp) / "debug.log"
+        log = CleanLog(debug_path, "debug")
+        log.write("line %s", 1)
+        assert debug_path.read_text(encoding='utf-8') == "line 1\n"  # 逐行写出
+        log.close()
+
+        trace_path = Path(tmp) / "clean.jsonl"
+        log = CleanLog(trace_path, "jsonl")
+        log.write("not in the trace %s", Unprintable())
+        log.event("section", index=1, is_footer=True)
+        log.close()
+        assert [json.loads(line) for line in trace_path.read_text(encoding='utf-8').splitlines()] == [
+            {'event': 'section', 'index': 1, 'is_footer': True}
+        ]
+
+    log = CleanLog()
+    log.write("%s", Unprintable())
+    log.close()
+    print("✅ 日志模式行为正确")
+
+
+def test_decision_trace():
+    markdown = "\n".join(["# Title", "", "Intro " * 40, "", "## Body", "Text " * 200, "",
+                          "## Related posts"] + [f"* [Post {i}](/p{i})" for i in range(15)] +
+                         ["", "## Explore"] + [f"* [Topic {i}](/t{i})" for i in range(15)])
+    with tempfile.TemporaryDirectory() as tmp:
+        converter = URL2MDConverter(clean_log="jsonl")
+        converter.log_dir = Path(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cleaned = converter.cross_validate_clean(markdown, "<html><body></body></html>")
+        converter.log_final_output("out.md")
+        records = [json.loads(line) for line in converter.log_path.read_text(encoding='utf-8').splitlines()]
+
+        off = URL2MDConverter(clean_log="off")
+        assert off.cross_validate_clean(markdown, "<html><body></body></html>") == cleaned
+        assert off.log_path is None
+
+    events = [r['event'] for r in records]
+    assert events[0] == 'start' and events[-2:] == ['result', 'saved'], events
+    sections = {r['heading']: r for r in records if r['event'] == 'section'}
+    assert sections['Related posts']['is_footer'] and not sections['Body']['is_footer']
+    assert 'footer_cascade' in events
+    assert "Post 0" not in cleaned
+    print(f"✅ JSONL 决策记录完整 ({len(records)} 条)")
+
+
+def test_final_output_appended():
+    with tempfile.TemporaryDirectory() as tmp:
+        converter = URL2MDConverter()
+        converter.log_dir = Path(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            converter.cross_validate_clean("# Title\n\n## Body\nText.", "<html></html>")
+        before = converter.log_path.read_text(encoding='utf-8')
+        converter.log_final_output("outputs/page.md")
+        after = converter.log_path.read_text(encoding='utf-8')
+
+    # 只在末尾追加, 原有日志内容不变
+    assert after.startswith(before)
+    assert after[len(before):].splitlines()[1] == "Saved to: outputs/page.md"
+    print("✅ 输出路径追加到日志末尾")
+
+
+def test_failure_and_console():
+    markdown = "# Title\n\n## Body\nText."
+
+    def broken(doc):
+        raise RuntimeError("boom")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ["jsonl", "debug"]:
+            converter = URL2MDConverter(clean_log=mode)
+            converter.log_dir = Path(tmp)
+            converter.extract_markdown_sections = broken
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                try:
+                    converter.cross_validate_clean(markdown, "<html></html>")
+                    assert False, "cleaning error swallowed"
+                except RuntimeError:
+                    pass
+            # 清洗出错时日志仍被关闭并完整写出, 记录错误
+            assert converter._clean_log._file is None
+            content = converter.log_path.read_text(encoding='utf-8')
+            assert "boom" in content, (mode, content)
+            if mode == "jsonl":
+                events = [json.loads(line)['event'] for line in content.splitlines()]
+                assert events[0] == 'start' and events[-1] == 'error', events
+            assert str(converter.log_path.absolute()) in stdout.getvalue()
+
+    # off 模式不写日志, 也不向控制台输出
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        URL2MDConverter(clean_log="off").cross_validate_clean(markdown, "<html></html>")
+    assert stdout.getvalue() == ""
+    print("✅ 清洗出错时日志仍写出; off 模式不输出日志路径")
+
+
+def test():
+    test_modes()
+    test_decision_trace()
+    test_final_output_appended()
+    test_failure_and_console()
+
+
+if __name__ == "__main__":
+    test()
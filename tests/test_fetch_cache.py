@@ -0,0 +1,145 @@
+"""测试抓取缓存: URL 规范化, TTL 内直接命中, ETag/Last-Modified 304 重新验证, refresh/bypass 模式, 按最近使用淘汰"""
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+import httpx
+from url2md.cache import FetchCache, normalize_url
+from url2md.converter import URL2MDConverter
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+URL = "https://site.example/article"
+
+
+class Server:
+    """模拟站点: 支持 If-None-Match / If-Modified-Since, 记录每个请求"""
+
+    def __init__(self, html: str):
+        self.html = html
+        self.etag = '"v1"'
+        self.last_modified = "Mon, 05 Oct 2026 10:00:00 GMT"
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(dict(request.headers))
+        if (request.headers.get("if-none-match") == self.etag or
+                request.headers.get("if-modified-since") == self.last_modified):
+            return httpx.Response(304)
+        headers = {"content-type": "text/html", "etag": self.etag, "last-modified": self.last_modified}
+        return httpx.Response(200, headers=headers, text=self.html)
+
+
+class CachedConverter(URL2MDConverter):
+    def __init__(self, server: Server, cache_dir: Path, **options):
+        super().__init__(cache_dir=cache_dir, clean_log="off", **options)
+        self.server = server
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.server.handle))
+
+
+def fetch(server: Server, cache_dir: Path, **options) -> tuple[str, str]:
+    converter = CachedConverter(server, cache_dir, **options)
+    html, _ = asyncio.run(converter.fetch_url(URL))
+    return html, converter.fetch_stats[URL]['source']
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Site.Example:443/a?b=2&a=1#frag") == "https://site.example/a?a=1&b=2"
+    assert normalize_url("http://site.example:80") == "http://site.example/"
+    assert normalize_url("  http://site.example:8080/x?q=  ") == "http://site.example:8080/x?q="
+    assert normalize_url("https://site.example/A") != normalize_url("https://site.example/a")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FetchCache(Path(tmp))
+        cache.put("https://SITE.example/p?b=1&a=2#top", "<p>x</p>", "x", etag='"e"')
+        assert cache.get("https://site.example/p?a=2&b=1")['html'] == "<p>x</p>"
+    print("✅ URL 规范化: 大小写/默认端口/片段/参数顺序不同的 URL 共用缓存")
+
+
+def test_freshness():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FetchCache(Path(tmp), ttl=60)
+        cache.put(URL, "<p>x</p>", "x", last_modified="Mon, 05 Oct 2026 10:00:00 GMT")
+        entry = cache.get(URL)
+        assert cache.is_fresh(entry)
+        entry['fetched_at'] -= 61
+        assert not cache.is_fresh(entry)
+        assert FetchCache.has_validators(entry)
+        assert FetchCache.conditional_headers(entry) == {'If-Modified-Since': "Mon, 05 Oct 2026 10:00:00 GMT"}
+        assert not FetchCache.has_validators({'etag': None, 'last_modified': None})
+    print("✅ TTL: 未过期直接使用, 过期后按校验头重新验证")
+
+
+def test_fetch_modes():
+    html = (FIXTURES / "blog_post.html").read_text(encoding='utf-8')
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp) / "fetch"
+        server = Server(html)
+
+        assert fetch(server, cache_dir, cache_mode="use") == (html, "http")
+        # TTL 内: 不发请求
+        assert fetch(server, cache_dir, cache_mode="use") == (html, "cache")
+        assert len(server.requests) == 1
+
+        # 过期: 条件请求, 304 时使用缓存并重新计时
+        assert fetch(server, cache_dir, cache_mode="use", cache_ttl=0) == (html, "cache (revalidated)")
+        assert server.requests[-1]["if-none-match"] == '"v1"'
+        assert "if-modified-since" in server.requests[-1]
+
+        # 页面变化: 返回 200, 缓存被新内容覆盖
+        server.html = html.replace("<body", "<body data-version=\"2\"", 1)
+        server.etag = '"v2"'
+        server.last_modified = "Tue, 06 Oct 2026 10:00:00 GMT"
+        assert fetch(server, cache_dir, cache_mode="use", cache_ttl=0) == (server.html, "http")
+        assert fetch(server, cache_dir, cache_mode="use") == (server.html, "cache")
+
+        # refresh: 总是请求 (不带条件头) 并覆盖
+        count = len(server.requests)
+        server.html = html
+        assert fetch(server, cache_dir, cache_mode="refresh") == (html, "http")
+        assert len(server.requests) == count + 1 and "if-none-match" not in server.requests[-1]
+        entry = FetchCache(cache_dir).get(URL)
+        # 静态抓取只缓存 HTML, markdown 在清洗阶段按最终 URL 生成
+        assert entry['html'] == html and entry['markdown'] is None and entry['final_url'] == URL
+
+        # bypass (库的默认值): 不读也不写
+        bypass_dir = Path(tmp) / "bypass"
+        assert URL2MDConverter(clean_log="off").cache_mode == "bypass"
+        assert fetch(server, bypass_dir) == (html, "http")
+        assert fetch(server, bypass_dir) == (html, "http")
+        assert not bypass_dir.exists()
+    print("✅ use/refresh/bypass 模式与 304 重新验证正确")
+
+
+def test_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FetchCache(Path(tmp), max_bytes=3600)
+        urls = [f"https://site.example/{i}" for i in range(4)]
+        now = time.time()
+        for i, url in enumerate(urls[:2]):
+            cache.put(url, "x" * 1000, "")
+            os.utime(cache._entry_path(url), (now - 100 + i, now - 100 + i))
+
+        assert cache.get(urls[0]) is not None  # 读取后变为最近使用
+        cache.put(urls[2], "y" * 1000, "")
+        cache.put(urls[3], "z" * 1000, "")
+
+        assert cache.get(urls[1]) is None
+        assert all(cache.get(url) is not None for url in (urls[0], urls[2], urls[3]))
+        total = sum(p.stat().st_size for p in Path(tmp).glob('*/*.json'))
+        assert total <= 3600 and cache._total_bytes == total
+    print("✅ 超过容量上限时淘汰最久未使用的页面")
+
+
+def test():
+    test_normalize_url()
+    test_freshness()
+    test_fetch_modes()
+    test_eviction()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,131 @@
+"""测试静态 HTTP 快速路径: 完整性判断, 何时回退到浏览器, 以及静态页面与浏览器路径得到相同的清洗结果"""
+import asyncio
+from pathlib import Path
+import httpx
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+from url2md.converter import URL2MDConverter, looks_complete
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+SPA_SHELL = """<html><head><title>App</title><script src="/app.js"></script></head>
+<body><div id="root"></div><script>window.__STATE__ = {"items": []};</script></body></html>"""
+
+JS_NOTICE = """<html><body><noscript>You need to enable JavaScript to run this app.</noscript>
+<header><a href="/">Home</a></header><p>{text}</p></body></html>"""
+
+
+class StubFetchConverter(URL2MDConverter):
+    """HTTP 请求由 routes 应答 (url -> (status, content-type, body)), 浏览器抓取只做记录"""
+
+    def __init__(self, routes: dict, **options):
+        super().__init__(cache_mode="bypass", clean_log="off", **options)
+        self.routes = routes
+        self.http_requests = []
+        self.browser_fetches = []
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        def handle(request: httpx.Request) -> httpx.Response:
+            self.http_requests.append(str(request.url))
+            status, content_type, body = self.routes[str(request.url)]
+            if status in (301, 302):
+                return httpx.Response(status, headers={"location": body})
+            return httpx.Response(status, headers={"content-type": content_type}, text=body)
+        return httpx.AsyncClient(transport=httpx.MockTransport(handle), follow_redirects=True)
+
+    async def _get_shared_crawler(self):
+        return None
+
+    async def _crawl(self, crawler, url: str) -> tuple[str, str, dict]:
+        self.browser_fetches.append(url)
+        return "<html><body><p>rendered</p></body></html>", "rendered markdown", {}
+
+
+def fetch(converter: StubFetchConverter, url: str) -> tuple[str, str]:
+    async def run():
+        async with converter:
+            return await converter.fetch_url(url)
+    return asyncio.run(run())
+
+
+def test_looks_complete():
+    for path in sorted(FIXTURES.glob("*.html")):
+        assert looks_complete(path.read_text(encoding='utf-8')), path.name
+
+    assert not looks_complete(SPA_SHELL)
+    assert not looks_complete("<html><body><p>Too short.</p></body></html>")
+    # JavaScript 提示 + 少量正文: 不完整; 正文足够长时忽略提示
+    assert not looks_complete(JS_NOTICE.format(text="Loading the dashboard. " * 50))
+    assert looks_complete(JS_NOTICE.format(text="A long static article body. " * 100))
+    # 脚本里的文本不算可见正文
+    assert not looks_complete(f"<html><body><script>{'var x = 1; ' * 200}</script></body></html>")
+    print("✅ 完整性判断: 示例页面完整, 空挂载点/JS 提示/正文过短均判为不完整")
+
+
+def test_fallback_decision():
+    blog = (FIXTURES / "blog_post.html").read_text(encoding='utf-8')
+    routes = {
+        "https://site.example/article": (200, "text/html; charset=utf-8", blog),
+        "https://site.example/app": (200, "text/html", SPA_SHELL),
+        "https://site.example/data": (200, "application/json", '{"text": "' + "x" * 2000 + '"}'),
+        "https://site.example/error": (500, "text/html", blog),
+        "https://site.example/old": (301, "text/html", "https://site.example/article"),
+    }
+
+    converter = StubFetchConverter(routes)
+    html, markdown = fetch(converter, "https://site.example/article")
+    assert html == blog and converter.browser_fetches == []
+    assert converter.fetch_stats["https://site.example/article"]["source"] == "http"
+    # markdown 不在事件循环中生成, 留给 process_page (清洗进程)
+    assert markdown is None
+
+    # 重定向: 记录最终 URL, 相对链接以它为基准
+    converter = StubFetchConverter(routes)
+    html, markdown = fetch(converter, "https://site.example/old")
+    assert html == blog and markdown is None and converter.browser_fetches == []
+    assert converter.fetch_stats["https://site.example/old"]["final_url"] == "https://site.example/article"
+
+    for url in ["https://site.example/app", "https://site.example/data", "https://site.example/error"]:
+        converter = StubFetchConverter(routes)
+        html, markdown = fetch(converter, url)
+        assert converter.http_requests == [url] and converter.browser_fetches == [url], url
+        assert markdown == "rendered markdown"
+
+    # http 模式从不启动浏览器; browser 模式不发 HTTP 请求
+    converter = StubFetchConverter(routes, fetch_mode="http")
+    assert fetch(converter, "https://site.example/app")[0] == SPA_SHELL and converter.browser_fetches == []
+    converter = StubFetchConverter(routes, fetch_mode="browser")
+    fetch(converter, "https://site.example/article")
+    assert converter.http_requests == [] and converter.browser_fetches == ["https://site.example/article"]
+    print("✅ 回退判断: 完整页面走 HTTP, SPA 空壳/非 HTML/请求失败回退到浏览器")
+
+
+def test_same_output_as_browser():
+    """静态路径的 markdown 与 crawl4ai 对同一 HTML 的处理结果一致, 因而清洗结果相同"""
+    async def browser_markdown(html: str, url: str) -> str:
+        crawler = AsyncWebCrawler(verbose=False)
+        result = await crawler.aprocess_html(
+            url=url, html=html, extracted_content=None, config=CrawlerRunConfig(),
+            screenshot_data=None, pdf_data=None, verbose=False, redirected_url=url,
+        )
+        return str(result.markdown)
+
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding='utf-8')
+        url = f"https://site.example/{path.stem}"
+        converter = StubFetchConverter({url: (200, "text/html", html)})
+        fetched_html, markdown = fetch(converter, url)
+        expected = asyncio.run(browser_markdown(html, url))
+        assert markdown is None and converter.render_markdown(fetched_html, url) == expected, path.name
+        assert converter.process_page(url, fetched_html, None)[0] == converter.process_page(url, html, expected)[0]
+    print("✅ 静态页面: HTTP 路径与浏览器路径的 markdown 和清洗结果一致")
+
+
+def test():
+    test_looks_complete()
+    test_fallback_decision()
+    test_same_output_as_browser()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,29 @@
+"""测试延迟导入: 导入 CLI 时不加载浏览器/HTTP/HTML 解析等重量级依赖"""
+import subprocess
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["crawl4ai", "httpx", "bs4", "lxml", "html2text"]
+
+
+def loaded_modules(code: str) -> list:
+    """在新解释器中运行 code, 返回已加载的重量级模块"""
+    check = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test():
+    assert loaded_modules("import url2md.cli") == []
+    print("✅ import url2md.cli 未加载重量级依赖")
+
+    # 创建转换器只加载清洗所需的模块
+    loaded = loaded_modules("from url2md.converter import URL2MDConverter\nURL2MDConverter(clean_log='off')")
+    assert "crawl4ai" not in loaded and "httpx" not in loaded, loaded
+    print(f"✅ 创建转换器只加载: {', '.join(loaded)}")
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,85 @@
+"""测试 MarkdownDocument: 只切分一次, 按行区间裁剪与链接统计结果与逐段计算一致"""
+from url2md.converter import URL2MDConverter
+from url2md.document import MarkdownDocument
+
+
+MARKDOWN = """Nav [Home](/)
+[Docs](/docs) [Blog](/blog)
+
+# Article title
+
+Intro paragraph.
+
+## Contents
+* [One](#one)
+
+## One
+Body text with [a link](/x).
+
+### Details
+More text."""
+
+
+def test_line_index():
+    doc = MarkdownDocument(MARKDOWN)
+    lines = MARKDOWN.split('\n')
+
+    assert doc.lines == lines
+    assert doc.text() == MARKDOWN
+    assert doc.first_heading(1) == 3
+    assert doc.first_heading(2) == 7
+    assert [level for _, level in doc.headings] == [1, 2, 2, 3]
+    assert doc.link_mark_count(0, 2) == 3
+    assert doc.stripped_length(9, 13) == len('\n'.join(lines[9:13]).strip())
+
+    # 删除行区间: 不重新切分, 结果与手工删除一致
+    cut = doc.slice(3).without([(4, 7)])
+    expected = lines[3:7] + lines[10:]
+    assert cut.lines == expected
+    assert cut.text() == '\n'.join(expected)
+    assert cut.text(1, 5) == '\n'.join(expected[1:5])
+    assert cut.first_heading(2) == 4
+    print("✅ MarkdownDocument 行索引与裁剪正确")
+
+
+def test_span_metrics():
+    converter = URL2MDConverter()
+
+    # 包含跨行链接, 其所在区间需要回退到重新扫描
+    markdown = MARKDOWN + "\n[multi\nline](/m) tail\n* [A](/a) [B](/b)"
+    doc = MarkdownDocument(markdown)
+    lines = markdown.split('\n')
+    for start in range(len(lines) + 1):
+        for end in range(start, len(lines) + 1):
+            text = '\n'.join(lines[start:end])
+            metrics = doc.span_metrics(start, end)
+            expected = converter._calculate_text_length_without_links(text)
+            assert (metrics['text_length_no_links'], metrics['link_count']) == expected, (start, end)
+            assert metrics['link_lines'] == sum(1 for l in lines[start:end] if '](' in l)
+    assert doc.link_texts() == ['Home', 'Docs', 'Blog', 'One', 'a link', 'multi\nline', 'A', 'B']
+    print("✅ 区间链接统计与逐段正则计算一致")
+
+
+def test_toc_ranges():
+    converter = URL2MDConverter()
+    toc = ["Table of contents"] + [f"* [Part {i}](#p{i})" for i in range(10)]
+    lines = (["# Guide", ""] + toc + ["## Part 0", "Text.", "", "Contents"] +
+             [f"* [Step {i}](#s{i})" for i in range(9)] + ["## Step 0", "Done."])
+    doc = MarkdownDocument('\n'.join(lines))
+
+    # 顶部目录和正文中的目录在一次扫描中全部找到
+    ranges = converter._find_toc_ranges(doc)
+    assert ranges == [(2, 13), (16, 26)], ranges
+    remaining = doc.without(ranges).lines
+    assert remaining == ["# Guide", "", "## Part 0", "Text.", "", "## Step 0", "Done."]
+    print("✅ 一次扫描找到全部目录区块")
+
+
+def test():
+    test_line_index()
+    test_span_metrics()
+    test_toc_ranges()
+
+
+if __name__ == "__main__":
+    test()
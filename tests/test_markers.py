@@ -0,0 +1,62 @@
+"""测试页脚/推广关键词匹配: 自动机结果与逐个子串匹配一致, 并支持扩展词表"""
+import json
+import random
+import tempfile
+from pathlib import Path
+from url2md.markers import KeywordAutomaton, MarkerSet, DEFAULT_MARKERS, EXACT_CATEGORIES, load_markers
+
+
+def test_automaton():
+    # 重叠/互为后缀的关键词, 失败链接必须正确
+    keywords = ['he', 'she', 'his', 'hers', 'abcd', 'bc', '产品', 'a']
+    automaton = KeywordAutomaton(keywords)
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = ''.join(rng.choice('abcdehirs产品 ') for _ in range(rng.randint(0, 12)))
+        expected = any(keyword in text for keyword in keywords)
+        assert automaton.search(text) == expected, text
+    assert not KeywordAutomaton([]).search('anything')
+    print("✅ 关键词自动机与逐个子串匹配一致")
+
+
+def test_default_markers():
+    markers = MarkerSet()
+    samples = ['related posts', 'products', 'product', 'about us', 'try it', 'share this',
+               'get started today', 'author', '![avatar](/a.png)', 'learn more about x', '正文']
+    for category, vocabulary in DEFAULT_MARKERS.items():
+        for text in samples:
+            if category in EXACT_CATEGORIES:
+                expected = text in vocabulary
+            else:
+                expected = any(keyword in text for keyword in vocabulary)
+            assert markers.matches(category, text) == expected, (category, text)
+    print("✅ 默认词表匹配结果与原逻辑一致")
+
+
+def test_extra_markers():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "markers.json"
+        path.write_text(json.dumps({"h4_footer": ["Weitere Artikel"], "h3_footer": ["Produkte"]}), encoding='utf-8')
+        markers = MarkerSet(load_markers(path))
+
+    assert markers.matches('h4_footer', 'weitere artikel zum thema')
+    assert markers.matches('h3_footer', 'produkte')
+    assert markers.matches('h4_footer', 'newsletter')
+
+    for bad in [{"h5_footer": ["x"]}, {"h4_footer": "x"}, ["x"]]:
+        try:
+            MarkerSet(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"markers should be rejected: {bad}")
+    print("✅ 扩展词表加载与校验正常")
+
+
+def test():
+    test_automaton()
+    test_default_markers()
+    test_extra_markers()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,106 @@
+"""测试翻译前屏蔽代码/链接/HTML: 占位符还原无损, 请求内容变短, 占位符丢失时不遮蔽重发"""
+import asyncio
+import re
+import tempfile
+import time
+from pathlib import Path
+from url2md.masking import mask_spans, unmask_spans
+from url2md.translator import TranslationAgent, TranslationConfig
+
+
+MARKDOWN = """# Install
+
+Run `pip install url2md`, then read [the docs](https://example.com/docs "Docs") ![logo](img/logo.png).
+
+```bash
+curl https://example.com/install.sh | sh
+```
+
+<div class="note"><span>Note</span></div> See https://example.com/faq, or <https://example.com>.
+<!-- generated -->
+[ref]: https://example.com/ref
+Background on [parsers](https://en.wikipedia.org/wiki/Parsing_(computer_science))."""
+
+
+class ShoutingAgent(TranslationAgent):
+    """把发送的文本转为大写; drop=True 时第一次请求丢掉所有占位符"""
+
+    def __init__(self, config, drop=False):
+        super().__init__(config)
+        self.drop = drop
+        self.prompts = []
+
+    async def _call_openai_api(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        content = prompt.split("\n\n", 2)[-1]
+        if self.drop and len(self.prompts) == 1:
+            content = re.sub(r'⟦\d+⟧', '', content)
+        return content.upper()
+
+
+def test_round_trip():
+    masked, spans = mask_spans(MARKDOWN)
+    assert unmask_spans(masked, spans) == MARKDOWN
+    assert len(masked) < len(MARKDOWN) / 2
+    for kept in ["Run", "the docs", "logo", "Note", "See", "parsers"]:
+        assert kept in masked
+    for hidden in ["pip install", "https://", "curl", "<div", "<!--", "img/logo.png"]:
+        assert hidden not in masked
+    # 相邻的 HTML 标签合并为一个占位符
+    assert re.search(r'⟦\d+⟧Note⟦\d+⟧ See', masked), masked
+
+    # 文本里已有占位符样式的内容时不屏蔽
+    assert mask_spans("keep ⟦1⟧ as is `x`") == ("keep ⟦1⟧ as is `x`", [])
+
+    try:
+        unmask_spans(masked.replace('⟦0⟧', ''), spans)
+        assert False, "missing placeholder not detected"
+    except ValueError:
+        pass
+    print(f"✅ 屏蔽后还原无损: {len(MARKDOWN)} -> {len(masked)} 字符, {len(spans)} 个片段")
+
+
+def translate(content: str, **options) -> tuple[str, ShoutingAgent]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "article.md"
+        path.write_text(content, encoding='utf-8')
+        config = TranslationConfig(provider="openai", cache_mode="bypass", **options.pop('config', {}))
+        agent = ShoutingAgent(config, **options)
+        output = asyncio.run(agent.translate_file(path, Path(tmp) / "out.md"))
+        return output.read_text(encoding='utf-8'), agent
+
+
+def test_agent_masking():
+    translated, agent = translate(MARKDOWN)
+    assert len(agent.prompts) == 1 and "⟦0⟧" in agent.prompts[0]
+    assert "pip install" not in agent.prompts[0]
+    # 正文被"翻译" (大写), 代码与链接原样保留
+    assert "RUN `pip install url2md`" in translated
+    assert "[THE DOCS](https://example.com/docs \"Docs\")" in translated
+    assert "```bash\ncurl https://example.com/install.sh | sh\n```" in translated
+
+    # 关闭屏蔽时整段发送
+    translated, agent = translate(MARKDOWN, config={'mask_spans': False})
+    assert "⟦" not in agent.prompts[0] and translated.endswith(MARKDOWN.upper())
+    print("✅ 请求中只包含需要翻译的文本, 译文中代码与链接不变")
+
+
+def test_lost_placeholders():
+    started = time.monotonic()
+    translated, agent = translate(MARKDOWN, drop=True)
+    # 立即重发, 不算失败重试, 不等待退避时间
+    assert time.monotonic() - started < 2
+    assert len(agent.prompts) == 2
+    assert "⟦" not in agent.prompts[1]
+    assert translated.endswith(MARKDOWN.upper())
+    print("✅ 占位符丢失时立即改为不屏蔽重发")
+
+
+def test():
+    test_round_trip()
+    test_agent_masking()
+    test_lost_placeholders()
+
+
+if __name__ == "__main__":
+    test()
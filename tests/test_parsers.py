@@ -0,0 +1,173 @@
+"""测试 HTML 解析后端: lxml 后端的清洗结果必须与 BeautifulSoup 后端一致"""
+from pathlib import Path
+from url2md.converter import URL2MDConverter
+from url2md.document import ParsedDocument
+from url2md.parsers import ParserBackend, BeautifulSoupBackend, get_backend, subtree_stats, remove_with_stats
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+SNIPPET = """<html><head><title> Demo page </title></head><body>
+<nav><a href="/a">Home</a></nav>
+<article><h1>Title</h1><div class="share-bar"><a href="/s">Share</a></div>
+<p>Hello <b>world</b><!-- hidden --><script>var x = 1;</script> tail text</p>
+<h2><span>Only child</span></h2></article>
+</body></html>"""
+
+
+def test_primitives():
+    bs4_dom = get_backend("bs4")
+    lxml_dom = get_backend("lxml")
+    bs4_root = bs4_dom.parse(SNIPPET)
+    lxml_root = lxml_dom.parse(SNIPPET)
+
+    for name in ['p', 'h2', 'article', 'title']:
+        a = bs4_dom.find_first(bs4_root, name)
+        b = lxml_dom.find_first(lxml_root, name)
+        assert bs4_dom.text(a) == lxml_dom.text(b), name
+        assert bs4_dom.own_string(a) == lxml_dom.own_string(b), name
+
+    assert lxml_dom.text(lxml_dom.find_first(lxml_root, 'p')) == "Helloworldtail text"
+    assert lxml_dom.tag_name(lxml_dom.select_one(lxml_root, '[class*="share"]')) == 'div'
+
+    # 删除元素时保留其后的文本
+    p = lxml_dom.find_first(lxml_root, 'p')
+    lxml_dom.remove(lxml_dom.find_first(p, 'b'))
+    assert lxml_dom.text(p) == "Hellotail text"
+
+    # 向上遍历能到达文档根节点, 与 BeautifulSoup 一致
+    assert lxml_dom.tag_name(lxml_dom.parent(lxml_root.getroot())) == '[document]'
+    assert bs4_dom.tag_name(bs4_dom.parent(bs4_root.html)) == '[document]'
+
+    print("✅ 基本操作一致")
+
+
+def test_subtree_stats():
+    containers = ['section', 'div', 'footer']
+    for name in ['bs4', 'lxml']:
+        dom = get_backend(name)
+        html = (FIXTURES_DIR / "docs_page.html").read_text(encoding='utf-8')
+        body = dom.find_first(dom.parse(html), 'body')
+        stats = subtree_stats(dom, body, containers)
+
+        def check():
+            for element in dom.find_all(body, containers + ['p', 'ul', 'a']):
+                links = dom.find_all(element, ['a'])
+                expected = (
+                    len(dom.find_all(element, containers)),
+                    len(dom.text(element)),
+                    len(links),
+                    sum(len(dom.text(link)) for link in links),
+                )
+                record = stats[dom.node_key(element)]
+                actual = (record['containers'], record['text_length'], record['link_count'], record['link_text_length'])
+                assert actual == expected, f"{name} {dom.tag_name(element)}: {actual} != {expected}"
+
+        check()
+        # 文档顺序编号与遍历顺序一致
+        orders = [stats[dom.node_key(element)]['order'] for element in dom.iter_descendants(body)]
+        assert orders == list(range(1, len(orders) + 1))
+        # 删除节点后祖先节点的统计同步更新
+        for element in dom.find_all(body, ['section'])[:3]:
+            remove_with_stats(dom, element, stats, containers)
+        check()
+        print(f"✅ {name}: 自底向上统计与逐节点计算一致")
+
+
+def test_heading_index():
+    html = """<html><body><section><h2>Related Posts</h2><a href="/1">One</a></section>
+<div><h3> related posts </h3></div><h2>More related posts here</h2><h4><b>Nested</b> text</h4></body></html>"""
+    for name in ['bs4', 'lxml']:
+        document = ParsedDocument(html, get_backend(name))
+        index = document.heading_index
+        # <div> 只有一个 <h3> 子元素, 其字符串也算 (Tag.string)
+        assert [document.backend.tag_name(e) for e in index.exact("Related posts")] == ['h2', 'div', 'h3']
+        assert len(index.containing("related posts")) == 4
+        assert index.exact("More related") == [] and len(index.containing("More related")) == 1
+        # 只有单一字符串的元素才会被索引 (与 Tag.string 一致)
+        assert index.containing("nested") == []
+        print(f"✅ {name}: 标题索引查找正确")
+
+
+def test_cleaning_matches():
+    bs4_converter = URL2MDConverter(parser_backend="bs4")
+    lxml_converter = URL2MDConverter(parser_backend="lxml")
+
+    pages = sorted(FIXTURES_DIR.glob('*.html'))
+    assert pages, f"no fixtures in {FIXTURES_DIR}"
+
+    for page in pages:
+        html = page.read_text(encoding='utf-8')
+        markdown = bs4_converter.html_to_markdown(html)
+
+        a = bs4_converter.html_to_markdown(bs4_converter.extract_main_content(html, "https://example.com/"))
+        b = lxml_converter.html_to_markdown(lxml_converter.extract_main_content(html, "https://example.com/"))
+        assert a == b, f"extract_main_content differs on {page.name}"
+
+        a = bs4_converter.cross_validate_clean(markdown, html)
+        b = lxml_converter.cross_validate_clean(markdown, html)
+        assert a == b, f"cross_validate_clean differs on {page.name}"
+
+        assert ParsedDocument(html, bs4_converter.parser).title == ParsedDocument(html, lxml_converter.parser).title
+        print(f"✅ {page.name}: 两个后端输出一致")
+
+
+def test_main_content_root():
+    nav_links = "".join(f'<li><a href="/n{i}">Link {i}</a></li>' for i in range(20))
+    body_text = "Real article text. " * 40
+    pages = {
+        # 被选中的容器本身匹配删除规则 (评论区): 整体删除
+        'rule': f'<html><body><article class="comment-thread"><p>{body_text}</p></article></body></html>',
+        # 被选中的容器本身是导航式的链接列表: 被链接密度裁剪删除
+        'links': f'<html><body><div class="post-content"><ul>{nav_links}</ul></div></body></html>',
+        # 正常文章: 保留
+        'keep': f'<html><body><article class="post"><h1>Title</h1><p>{body_text}</p></article></body></html>',
+    }
+    for name in ['bs4', 'lxml']:
+        converter = URL2MDConverter(parser_backend=name, clean_log="off")
+        for kind, html in pages.items():
+            document = ParsedDocument(html, converter.parser)
+            before = converter.parser.to_html(document.root)
+            result = converter.extract_main_content(document, "https://example.com/")
+            # 复制后裁剪, 共享的解析树不被修改
+            assert converter.parser.to_html(document.root) == before, f"{name} {kind}: shared tree mutated"
+            markdown = converter.html_to_markdown(result)
+            if kind == 'keep':
+                assert "Real article text." in markdown and "Title" in markdown, (name, markdown)
+            else:
+                assert markdown == "", (name, kind, markdown)
+        print(f"✅ {name}: 主内容容器本身也参与规则删除和链接密度裁剪, 共享树保持不变")
+
+
+def test_incomplete_backend():
+    class PartialBackend(ParserBackend):
+        name = 'partial'
+
+        def parse(self, html: str):
+            return html
+
+    try:
+        PartialBackend()
+        assert False, "incomplete backend was instantiated"
+    except TypeError as e:
+        assert "iter_descendants" in str(e)
+    try:
+        ParserBackend()
+        assert False, "abstract interface was instantiated"
+    except TypeError:
+        pass
+    assert isinstance(BeautifulSoupBackend(), ParserBackend)
+    print("✅ 未实现全部接口的后端在实例化时即报错")
+
+
+def test():
+    test_primitives()
+    test_subtree_stats()
+    test_heading_index()
+    test_cleaning_matches()
+    test_main_content_root()
+    test_incomplete_backend()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,62 @@
+"""测试元素删除规则: 默认规则与原来逐条匹配的结果一致, 并支持自定义规则"""
+import json
+import tempfile
+from pathlib import Path
+from url2md.parsers import get_backend
+from url2md.rules import RuleMatcher, DEFAULT_REMOVAL_RULES, load_rules
+
+
+HTML = """<html><body>
+<nav>menu</nav>
+<article>
+  <div class="Main-Nav">links</div>
+  <section id="navbar">links</section>
+  <p class="nav">kept: nav classes only count on div/section</p>
+  <div id="left-sidebar"><div class="inner">sidebar</div></div>
+  <div class="post-comments">comments</div>
+  <div class="ad-slot">ad</div>
+  <div class="badge">kept: "ad" without dash</div>
+  <div class="social share-row">share</div>
+  <div class="cookie-banner">cookies</div>
+  <p>content</p>
+</article>
+</body></html>"""
+
+
+def test_default_rules():
+    matcher = RuleMatcher()
+    for name in ['bs4', 'lxml']:
+        dom = get_backend(name)
+        root = dom.parse(HTML)
+        matched = matcher.find_matches(dom, root)
+        labels = [dom.get_attr(e, 'class') or dom.get_attr(e, 'id') or dom.tag_name(e) for e in matched]
+        assert labels == ['nav', 'Main-Nav', 'navbar', 'left-sidebar', 'post-comments', 'ad-slot', 'social share-row'], labels
+        print(f"✅ {name}: 默认规则匹配正确 ({len(matched)} 个元素)")
+
+
+def test_custom_rules():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "rules.json"
+        path.write_text(json.dumps([{"name": "cookies", "class_contains": ["cookie"]}]), encoding='utf-8')
+        matcher = RuleMatcher(DEFAULT_REMOVAL_RULES + load_rules(path))
+
+    dom = get_backend('lxml')
+    matched = matcher.find_matches(dom, dom.parse(HTML))
+    assert 'cookie-banner' in [dom.get_attr(e, 'class') for e in matched]
+
+    for bad in [{"tags": []}, {"class_contains": ["two words"]}, {"selector": "div"}]:
+        try:
+            RuleMatcher([bad])
+        except ValueError:
+            continue
+        raise AssertionError(f"rule should be rejected: {bad}")
+    print("✅ 自定义规则加载与校验正常")
+
+
+def test():
+    test_default_rules()
+    test_custom_rules()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,72 @@
+"""测试批量调度器: 全局并发上限 + 单站点并发上限 + 请求间隔"""
+import asyncio
+import time
+from url2md.scheduler import ConversionScheduler
+
+
+async def run_jobs():
+    scheduler = ConversionScheduler(max_concurrency=3, per_host_limit=1, min_host_delay=0.2)
+    urls = [
+        "https://a.example.com/1",
+        "https://a.example.com/2",
+        "https://b.example.com/1",
+        "https://c.example.com/1",
+        "https://d.example.com/1",
+    ]
+    
+    running = {'total': 0, 'peak': 0}
+    host_running = {}
+    host_starts = {}
+    
+    async def job(url):
+        host = ConversionScheduler.host_key(url)
+        running['total'] += 1
+        running['peak'] = max(running['peak'], running['total'])
+        host_running[host] = host_running.get(host, 0) + 1
+        assert host_running[host] <= 1, f"per-host limit exceeded for {host}"
+        host_starts.setdefault(host, []).append(time.monotonic())
+        await asyncio.sleep(0.05)
+        host_running[host] -= 1
+        running['total'] -= 1
+        return url
+    
+    results = [url async for url in scheduler.map(urls, job)]
+    return urls, results, running['peak'], host_starts
+
+
+async def run_saturated():
+    """全局并发已满: 同站点任务排队等待全局名额后仍需保持请求间隔"""
+    scheduler = ConversionScheduler(max_concurrency=1, per_host_limit=2, min_host_delay=0.3)
+    urls = ["https://slow.example.com/1", "https://a.example.com/1", "https://a.example.com/2"]
+    starts = {}
+    
+    async def job(url):
+        starts[url] = time.monotonic()
+        await asyncio.sleep(0.6 if "slow" in url else 0.05)
+        return url
+    
+    [url async for url in scheduler.map(urls, job)]
+    return starts["https://a.example.com/2"] - starts["https://a.example.com/1"]
+
+
+def test():
+    urls, results, peak, host_starts = asyncio.run(run_jobs())
+    
+    a_starts = host_starts['a.example.com']
+    gap = a_starts[1] - a_starts[0]
+    
+    print(f"✓ 完成任务: {len(results)}/{len(urls)}")
+    print(f"✓ 最大并发: {peak} (上限 3)")
+    print(f"✓ 同站点请求间隔: {gap:.2f}s (最小 0.2s)")
+    
+    assert sorted(results) == sorted(urls)
+    assert peak <= 3
+    assert gap >= 0.2
+    
+    gap = asyncio.run(run_saturated())
+    print(f"✓ 全局并发已满时同站点请求间隔: {gap:.2f}s (最小 0.3s)")
+    assert gap >= 0.3
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,88 @@
+"""测试翻译缓存: 命中后不再请求 API, 设置变化时失效, 按最近使用淘汰, refresh/bypass 模式"""
+import asyncio
+import tempfile
+from pathlib import Path
+from url2md.cache import TranslationCache
+from url2md.translator import TranslationAgent, TranslationConfig
+
+
+class CountingAgent(TranslationAgent):
+    """记录发出的 API 请求"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = 0
+
+    async def _call_openai_api(self, prompt: str) -> str:
+        self.calls += 1
+        return prompt.rsplit("\n\n", 1)[-1].upper()
+
+
+def translate(tmp: Path, content: str, **options) -> CountingAgent:
+    config = TranslationConfig(provider="openai", chunk_size=40,
+                               cache_path=str(tmp / "translations.sqlite3"), **options)
+    agent = CountingAgent(config)
+    path = tmp / "article.md"
+    path.write_text(content, encoding='utf-8')
+    asyncio.run(agent.translate_file(path))
+    return agent
+
+
+def test_agent_cache():
+    lines = [f"line {i:02d} of the article" for i in range(12)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        first = translate(tmp, '\n'.join(lines))
+        assert first.calls > 1
+        assert translate(tmp, '\n'.join(lines)).calls == 0
+
+        # 只改动最后一行: 只有最后一个分块重新翻译
+        edited = lines[:-1] + ["line 11 was edited"]
+        assert translate(tmp, '\n'.join(edited)).calls == 1
+
+        # 设置不同 (目标语言) 时不复用; refresh 重新翻译; bypass 不读不写
+        assert translate(tmp, '\n'.join(lines), target_language="Japanese").calls == first.calls
+        # 同名模型由不同端点提供时不共用缓存
+        assert translate(tmp, '\n'.join(lines), api_base="http://localhost:8000/v1").calls == first.calls
+        assert translate(tmp, '\n'.join(lines), cache_mode="refresh").calls == first.calls
+        assert translate(tmp, '\n'.join(lines), cache_mode="bypass").calls == first.calls
+    print(f"✅ 翻译缓存命中/失效正确 (首次 {first.calls} 次请求)")
+
+
+def test_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TranslationCache(Path(tmp) / "t.sqlite3", max_bytes=250)
+        keys = [TranslationCache.key(f"chunk {i}", model="m") for i in range(4)]
+        for key in keys[:2]:
+            cache.put(key, "x" * 100)
+        assert cache.get(keys[0]) is not None  # 最近使用过, 不会被淘汰
+        cache.put(keys[2], "y" * 100)
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == "x" * 100 and cache.get(keys[2]) == "y" * 100
+
+        # 总大小随写入/覆盖/删除维护, 写入时不再扫描整张表
+        statements = []
+        cache._connect().set_trace_callback(statements.append)
+        cache.put(keys[0], "z" * 50)
+        cache.put(keys[3], "w" * 150)
+        assert not any("SUM" in sql for sql in statements), statements
+        assert cache.get(keys[2]) is None and cache.get(keys[0]) == "z" * 50
+        total = cache._connect().execute("SELECT SUM(size) FROM translations").fetchone()[0]
+        assert cache._total_bytes == total == 200
+        cache.close()
+
+        # 重新打开时测量一次
+        cache._connect()
+        assert cache._total_bytes == 200
+        cache.close()
+        assert TranslationCache.key("a", model="m") != TranslationCache.key("a", model="n")
+    print("✅ 超出容量时按最近使用淘汰")
+
+
+def test():
+    test_agent_cache()
+    test_eviction()
+
+
+if __name__ == "__main__":
+    test()
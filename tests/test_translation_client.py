@@ -0,0 +1,60 @@
+"""测试翻译 HTTP 客户端: 一个文件的所有分块共用一个连接池, 批量时可跨文件共享"""
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+import httpx
+from url2md.translator import TranslationAgent, TranslationConfig, translate_markdown_file
+
+
+def make_transport(requests: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        prompt = json.loads(request.content)["messages"][0]["content"]
+        chunk = prompt.rsplit("\n\n", 1)[-1]
+        return httpx.Response(200, json={"choices": [{"message": {"content": chunk.upper()}}]})
+    return httpx.MockTransport(handler)
+
+
+async def run(tmp: Path):
+    config = TranslationConfig(provider="openai", api_key="test", chunk_size=40, cache_mode="bypass")
+    content = '\n'.join(f"line {i:02d} of the article" for i in range(12))
+    paths = []
+    for name in ["a.md", "b.md"]:
+        path = tmp / name
+        path.write_text(content, encoding='utf-8')
+        paths.append(path)
+
+    # 共享客户端: 两个文件的请求都经过它, 翻译后由调用方关闭
+    requests = []
+    async with httpx.AsyncClient(transport=make_transport(requests)) as client:
+        for path in paths:
+            await translate_markdown_file(path, config, auto_translate=True, http_client=client)
+        assert not client.is_closed
+    chunks = TranslationAgent(config)._split_content(content)
+    assert len(requests) == 2 * len(chunks)
+    assert (tmp / "a_zh.md").read_text(encoding='utf-8') == '\n\n'.join(c.upper() for c in chunks)
+
+    # 代理自己创建的客户端在文件翻译结束后关闭
+    agent = TranslationAgent(config)
+    opened = []
+    original_start = agent.start
+
+    async def start():
+        await original_start()
+        opened.append(agent._http_client)
+    agent.start = start
+    agent._call_openai_api = lambda prompt: asyncio.sleep(0, result="ok")
+    await agent.translate_file(paths[0], tmp / "out.md")
+    assert len(opened) == 1 and opened[0].is_closed and agent._http_client is None
+    return len(chunks)
+
+
+def test():
+    with tempfile.TemporaryDirectory() as tmp:
+        chunk_count = asyncio.run(run(Path(tmp)))
+    print(f"✅ 共享连接池翻译 2 个文件 ({chunk_count} 个分块/文件), 自有客户端已关闭")
+
+
+if __name__ == "__main__":
+    test()
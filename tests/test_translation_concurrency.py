@@ -0,0 +1,94 @@
+"""测试分块并发翻译: 并发数不超过 max_concurrency, 结果按原顺序拼接, 失败时其他分块先结束再关闭客户端"""
+import asyncio
+import random
+import tempfile
+from pathlib import Path
+from url2md.translator import TranslationAgent, TranslationConfig
+
+
+class FakeAPIAgent(TranslationAgent):
+    """用随机延迟模拟 API, 记录同时进行的请求数"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.running = 0
+        self.peak = 0
+
+    async def _call_openai_api(self, prompt: str) -> str:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(random.uniform(0.01, 0.05))
+        self.running -= 1
+        chunk = prompt.rsplit("\n\n", 1)[-1]
+        return chunk.upper()
+
+
+class FailingAgent(TranslationAgent):
+    """第一个分块直接失败, 其他分块一直等待; 记录关闭客户端时仍未结束的分块数"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.pending = 0
+        self.pending_at_close = None
+
+    async def _translate_chunk(self, chunk: str, chunk_num: int, total_chunks: int) -> str:
+        if chunk_num == 1:
+            await asyncio.sleep(0.01)
+            raise Exception("chunk 1 failed")
+        self.pending += 1
+        try:
+            await asyncio.sleep(10)
+        finally:
+            await asyncio.sleep(0)  # 取消后的清理 (如关闭进行中的请求)
+            self.pending -= 1
+        return chunk
+
+    async def close(self):
+        self.pending_at_close = self.pending
+        await super().close()
+
+
+def test_concurrency():
+    config = TranslationConfig(provider="openai", chunk_size=40, max_concurrency=3, cache_mode="bypass")
+    lines = [f"line {i:02d} of the article" for i in range(30)]
+    content = '\n'.join(lines)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "article.md"
+        input_path.write_text(content, encoding='utf-8')
+        agent = FakeAPIAgent(config)
+        chunks = agent._split_content(content)
+        output_path = asyncio.run(agent.translate_file(input_path))
+        translated = output_path.read_text(encoding='utf-8')
+
+    assert translated == '\n\n'.join(chunk.upper() for chunk in chunks)
+    assert 1 < agent.peak <= 3, agent.peak
+    assert TranslationConfig(provider="ollama").max_concurrency == 1
+    print(f"✅ {len(chunks)} 个分块并发翻译 (峰值 {agent.peak}), 按原顺序拼接")
+
+
+def test_failure():
+    config = TranslationConfig(provider="openai", chunk_size=40, max_concurrency=4, cache_mode="bypass")
+    content = '\n'.join(f"line {i:02d} of the article" for i in range(12))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "article.md"
+        input_path.write_text(content, encoding='utf-8')
+        agent = FailingAgent(config)
+        try:
+            asyncio.run(agent.translate_file(input_path))
+            assert False, "chunk failure swallowed"
+        except Exception as e:
+            assert "chunk 1 failed" in str(e)
+    # 其他分块被取消并结束后才关闭共享客户端
+    assert agent.pending_at_close == 0, agent.pending_at_close
+    print("✅ 分块失败时其他分块被取消并等待结束, 然后才关闭客户端")
+
+
+def test():
+    test_concurrency()
+    test_failure()
+
+
+if __name__ == "__main__":
+    test()
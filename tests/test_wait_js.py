@@ -0,0 +1,120 @@
+"""测试页面等待脚本: 参数校验, none/fixed/上限策略生成的脚本, 以及在 crawl4ai 的 async IIFE 包装中可执行"""
+import shutil
+import asyncio
+import subprocess
+from types import SimpleNamespace
+from crawl4ai import CacheMode
+from url2md.converter import build_wait_js, URL2MDConverter
+
+
+# crawl4ai (AsyncPlaywrightCrawlerStrategy.robust_execute_user_script) runs js_code like this
+CRAWL4AI_WRAPPER = """
+(async () => {{
+    try {{
+        return await (async () => {{
+            {script}
+        }})();
+    }} catch (err) {{
+        return {{ success: false, error: err.toString(), stack: err.stack }};
+    }}
+}})();
+"""
+
+# Minimal browser globals for running the script under node
+BROWSER_STUBS = """
+globalThis.window = {};
+globalThis.document = {readyState: 'complete', documentElement: {}};
+globalThis.MutationObserver = class { observe() {} disconnect() {} };
+"""
+
+
+def run_in_node(script: str) -> str:
+    """Run the wrapped script with node; returns the printed {ms, result} JSON"""
+    program = BROWSER_STUBS + "const started = Date.now();\n" + CRAWL4AI_WRAPPER.format(script=script).strip().rstrip(';') + \
+        ".then(result => console.log(JSON.stringify({ms: Date.now() - started, result: result === undefined ? null : result})));"
+    return subprocess.run(["node", "-e", program], capture_output=True, text=True, check=True, timeout=30).stdout.strip()
+
+
+def test_strategies():
+    for strategy in ("bogus", ""):
+        try:
+            build_wait_js(strategy, 2.0, 0.2)
+            assert False, f"invalid strategy accepted: {strategy!r}"
+        except ValueError as e:
+            assert "Unknown wait strategy" in str(e)
+    try:
+        URL2MDConverter(wait_strategy="sleep", clean_log="off")
+        assert False, "converter accepted an invalid strategy"
+    except ValueError:
+        pass
+
+    assert build_wait_js("none", 2.0, 0.2) is None
+    assert build_wait_js("adaptive", 0, 0.2) is None  # 上限为 0 时不等待
+    assert build_wait_js("fixed", 1.5, 0.2) == "await new Promise(resolve => setTimeout(resolve, 1500));"
+
+    for strategy, dom, network in [("adaptive", "true", "true"), ("dom_idle", "true", "false"),
+                                   ("network_idle", "false", "true")]:
+        script = build_wait_js(strategy, 2.5, 0.3)
+        assert "quietMs = 300, ceilingMs = 2500" in script
+        assert f"watchDom = {dom}, watchNetwork = {network}" in script
+        assert script.startswith("await ") and script.rstrip().endswith(";")
+    print("✅ 等待策略: 非法策略被拒绝, none/fixed/adaptive 脚本正确")
+
+
+def test_runs_in_crawl4ai_wrapper():
+    if shutil.which("node") is None:
+        print("⚠️ 未找到 node, 跳过脚本执行测试")
+        return
+
+    # 静默时间长于上限: 在上限 (0.3s) 时结束, 包装后的脚本没有语法或运行错误
+    output = run_in_node(build_wait_js("adaptive", 0.3, 5.0))
+    assert '"result":null' in output, output
+    elapsed = int(output.split('"ms":')[1].split(',')[0])
+    assert 250 <= elapsed < 1500, output
+
+    # 没有任何活动: 静默 0.1s 后结束, 不必等到上限
+    output = run_in_node(build_wait_js("dom_idle", 5.0, 0.1))
+    elapsed = int(output.split('"ms":')[1].split(',')[0])
+    assert elapsed < 1000, output
+
+    output = run_in_node(build_wait_js("fixed", 0.2, 0.1))
+    elapsed = int(output.split('"ms":')[1].split(',')[0])
+    assert 150 <= elapsed < 1000, output
+    print("✅ 等待脚本在 crawl4ai 的 async IIFE 包装中正常执行并按上限结束")
+
+
+class StubCrawler:
+    """记录 arun 收到的参数, 不启动浏览器"""
+
+    def __init__(self):
+        self.crawler_strategy = SimpleNamespace(set_hook=lambda name, hook: None)
+        self.calls = []
+
+    async def arun(self, url, config=None, **kwargs):
+        self.calls.append((url, config, kwargs))
+        return SimpleNamespace(success=True, html="<html></html>", markdown="text", response_headers={})
+
+
+def test_crawl_passes_config():
+    for strategy in ("adaptive", "fixed", "none"):
+        converter = URL2MDConverter(wait_strategy=strategy, wait_ceiling=2.0, clean_log="off")
+        crawler = StubCrawler()
+        asyncio.run(converter._crawl(crawler, "https://site.example/"))
+        (url, config, kwargs), = crawler.calls
+        # 等待脚本必须放在 CrawlerRunConfig 中, crawl4ai 忽略 arun 的旧式关键字参数
+        assert url == "https://site.example/" and kwargs == {}
+        assert config.js_code == build_wait_js(strategy, 2.0, converter.wait_quiet), strategy
+        assert config.wait_for == "css:body"
+        # 只使用 FetchCache, crawl4ai 自己的缓存始终绕过
+        assert config.cache_mode == CacheMode.BYPASS
+    print("✅ _crawl 通过 CrawlerRunConfig 把等待脚本传给 crawl4ai, 并绕过其缓存")
+
+
+def test():
+    test_strategies()
+    test_runs_in_crawl4ai_wrapper()
+    test_crawl_passes_config()
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,318 @@
+"""Persistent on-disk caches for fetched pages and translated chunks"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Mapping
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# use: serve fresh entries and revalidate stale ones; refresh: always refetch
+# and overwrite; bypass: neither read nor write
+CACHE_MODES = ("use", "refresh", "bypass")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings share a cache entry
+
+    Lowercases scheme and host, drops default ports and the fragment, uses
+    "/" for an empty path and sorts query parameters.
+
+    Args:
+        url: URL to normalize
+
+    Returns:
+        Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def cache_validators(headers: Optional[Mapping[str, str]]) -> dict:
+    """Pick ETag / Last-Modified out of response headers (case-insensitive)
+
+    Args:
+        headers: Response headers, or None
+
+    Returns:
+        Dict with 'etag' and 'last_modified' (values may be None)
+    """
+    validators = {'etag': None, 'last_modified': None}
+    for name, value in (headers or {}).items():
+        lower = name.lower()
+        if lower == 'etag':
+            validators['etag'] = value
+        elif lower == 'last-modified':
+            validators['last_modified'] = value
+    return validators
+
+
+class FetchCache:
+    """Raw HTML and markdown of fetched pages, stored one JSON file per URL
+
+    Entry files are touched whenever they are served, so their modification
+    time is their last use; once the directory outgrows max_bytes the least
+    recently used files are deleted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = Path("cache") / "fetch",
+        ttl: float = 24 * 3600,
+        max_bytes: int = 500 * 1024 * 1024,
+    ):
+        """Initialize fetch cache
+
+        Args:
+            cache_dir: Directory holding cache entries
+            ttl: Seconds an entry is served without revalidation
+            max_bytes: Total size of entry files kept before the least
+                recently used are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._total_bytes = None  # size of all entries, measured on first write
+
+    def _entry_path(self, url: str) -> Path:
+        """File that stores the entry for a URL"""
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, url: str) -> Optional[dict]:
+        """Load the cached entry for a URL
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Entry dict with keys url, html, markdown, etag, last_modified,
+            final_url, fetched_at; or None if missing or unreadable
+        """
+        path = self._entry_path(url)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: dict) -> bool:
+        """Whether an entry is younger than the TTL"""
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    @staticmethod
+    def has_validators(entry: dict) -> bool:
+        """Whether an entry can be revalidated with a conditional request"""
+        return bool(entry.get('etag') or entry.get('last_modified'))
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        """Request headers that revalidate an entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        markdown: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        final_url: Optional[str] = None,
+    ):
+        """Store a freshly fetched page
+
+        Args:
+            url: Page URL
+            html: Raw HTML
+            markdown: Markdown produced at fetch time, or None if it is
+                rendered from the HTML later
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+            final_url: URL the HTML was served from, after redirects
+        """
+        self._write(url, {
+            'url': normalize_url(url),
+            'html': html,
+            'markdown': markdown,
+            'etag': etag,
+            'last_modified': last_modified,
+            'final_url': final_url,
+            'fetched_at': time.time(),
+        })
+
+    def touch(self, url: str, entry: dict):
+        """Mark an entry as fresh again after a successful revalidation"""
+        entry['fetched_at'] = time.time()
+        self._write(url, entry)
+
+    def _write(self, url: str, entry: dict):
+        """Write an entry atomically so concurrent readers never see a partial file"""
+        path = self._entry_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{id(entry)}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        size = tmp_path.stat().st_size
+        try:
+            replaced_size = path.stat().st_size
+        except OSError:
+            replaced_size = 0
+        os.replace(tmp_path, path)
+
+        if self._total_bytes is None:
+            self._evict()
+        else:
+            self._total_bytes += size - replaced_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the total fits max_bytes
+
+        Also re-measures the directory, which other processes may share.
+        """
+        entries = []
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+
+class TranslationCache:
+    """Translated chunks in a SQLite file, evicting least recently used entries
+
+    Entries are keyed by a hash of the chunk text and every setting that
+    changes the translation (see `key`). The database is opened on first use
+    and can be closed between files; close() is cheap and get/put reopen it.
+    Database errors are treated as cache misses, so a broken cache never
+    stops a translation.
+    """
+
+    def __init__(self, path: Path = Path("cache") / "translations.sqlite3", max_bytes: int = 100 * 1024 * 1024):
+        """Initialize translation cache
+
+        Args:
+            path: SQLite database file
+            max_bytes: Total size of stored translations (UTF-8) kept before
+                the least recently used entries are evicted
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._db = None
+        self._total_bytes = None  # size of all translations, measured on connect
+
+    @staticmethod
+    def key(chunk: str, **settings) -> str:
+        """Cache key of a chunk translated with the given settings
+
+        Args:
+            chunk: Source text
+            **settings: Everything the translation depends on (provider,
+                model, target language, temperature, prompt version, ...)
+
+        Returns:
+            Hex digest identifying the entry
+        """
+        settings['chunk_sha256'] = hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+        payload = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+            self._total_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+            self._db = db
+        return self._db
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached translation for a key, or None (marks the entry as recently used)"""
+        try:
+            db = self._connect()
+            row = db.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with db:
+                db.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+        except sqlite3.Error:
+            return None
+
+    def put(self, key: str, translation: str):
+        """Store a translation, then evict old entries beyond max_bytes"""
+        try:
+            db = self._connect()
+            size = len(translation.encode('utf-8'))
+            with db:
+                row = db.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO translations (key, translation, size, last_used) VALUES (?, ?, ?, ?)",
+                    (key, translation, size, time.time()),
+                )
+                total = self._total_bytes + size - (row[0] if row else 0)
+                if total > self.max_bytes:
+                    total = self._evict(db, total)
+            # Only count what was committed
+            self._total_bytes = total
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, db: sqlite3.Connection, total: int) -> int:
+        """Delete least recently used entries until the total fits max_bytes
+
+        Returns:
+            Total size after eviction
+        """
+        stale = []
+        rows = db.execute("SELECT key, size FROM translations ORDER BY last_used")
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        rows.close()
+        db.executemany("DELETE FROM translations WHERE key = ?", stale)
+        return total
+
+    def close(self):
+        """Close the database (reopened on next use)"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            self._total_bytes = None
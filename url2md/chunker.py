@@ -0,0 +1,162 @@
+"""Split markdown into translation chunks along its block structure
+
+The document is read as blocks: headings, fenced code blocks, tables and
+paragraphs/lists (runs of lines up to a blank line). Chunks are packed from
+whole blocks, so a chunk never ends inside a code fence or a table, and a
+heading always travels with the block after it. A block that is larger than
+a chunk on its own is split safely: code is re-fenced around each piece,
+tables repeat their header row, and other blocks are cut between lines.
+"""
+
+import re
+
+
+_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_HEADING_RE = re.compile(r'^ {0,3}#{1,6}(\s|$)')
+_TABLE_SEPARATOR_RE = re.compile(r'^\s*\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$')
+
+
+def _is_table_start(lines: list, i: int) -> bool:
+    """Whether a table starts at line i (pipe rows, or a header row plus separator)"""
+    stripped = lines[i].strip()
+    if stripped.startswith('|'):
+        return True
+    return ('|' in stripped and i + 1 < len(lines)
+            and '|' in lines[i + 1] and bool(_TABLE_SEPARATOR_RE.match(lines[i + 1])))
+
+
+def _closing_fence(lines: list, i: int) -> int:
+    """Index of the line closing the fence opened at line i (last line if unclosed)"""
+    fence = _FENCE_RE.match(lines[i]).group(1)
+    for j in range(i + 1, len(lines)):
+        stripped = lines[j].strip()
+        if stripped.startswith(fence[0] * len(fence)) and not stripped.lstrip(fence[0]):
+            return j
+    return len(lines) - 1
+
+
+def split_blocks(lines: list) -> list[tuple[str, int, int]]:
+    """Markdown blocks as (kind, first line, line after the last), in order
+
+    Kinds are "heading", "code", "table" and "text" (paragraphs, lists,
+    quotes). Blank lines between blocks belong to no block.
+    """
+    blocks = []
+    i = 0
+    while i < len(lines):
+        if not lines[i].strip():
+            i += 1
+            continue
+        if _FENCE_RE.match(lines[i]):
+            end = _closing_fence(lines, i) + 1
+            blocks.append(('code', i, end))
+        elif _HEADING_RE.match(lines[i]):
+            end = i + 1
+            blocks.append(('heading', i, end))
+        elif _is_table_start(lines, i):
+            end = i + 1
+            while end < len(lines) and lines[end].strip() and '|' in lines[end]:
+                end += 1
+            blocks.append(('table', i, end))
+        else:
+            end = i + 1
+            while (end < len(lines) and lines[end].strip()
+                   and not _FENCE_RE.match(lines[end]) and not _HEADING_RE.match(lines[end])
+                   and not _is_table_start(lines, end)):
+                end += 1
+            blocks.append(('text', i, end))
+        i = end
+    return blocks
+
+
+def _pack_lines(lines: list, budget: int) -> list[list]:
+    """Greedily group lines so each group's joined length fits the budget
+
+    A line longer than the budget gets a group of its own.
+    """
+    groups = []
+    current = []
+    length = 0
+    for line in lines:
+        line_length = len(line) + 1
+        if current and length + line_length > budget:
+            groups.append(current)
+            current = []
+            length = 0
+        current.append(line)
+        length += line_length
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _split_block(kind: str, lines: list, chunk_size: int) -> list[str]:
+    """Pieces of a block too large for one chunk, each valid markdown on its own"""
+    if kind == 'code':
+        opening = lines[0]
+        fence = _FENCE_RE.match(opening).group(1)
+        has_close = len(lines) > 1 and lines[-1].strip().startswith(fence[0] * len(fence))
+        closing = lines[-1] if has_close else opening.strip()[:len(fence)]
+        body = lines[1:-1] if has_close else lines[1:]
+        budget = chunk_size - len(opening) - len(closing) - 2
+        return ['\n'.join([opening] + group + [closing]) for group in _pack_lines(body, budget)]
+
+    if kind == 'table':
+        has_header = len(lines) > 1 and _TABLE_SEPARATOR_RE.match(lines[1])
+        header = lines[:2] if has_header else []
+        rows = lines[2:] if has_header else lines
+        budget = chunk_size - sum(len(line) + 1 for line in header)
+        return ['\n'.join(header + group) for group in _pack_lines(rows, budget)]
+
+    return ['\n'.join(group) for group in _pack_lines(lines, chunk_size)]
+
+
+def chunk_markdown(content: str, chunk_size: int) -> list[str]:
+    """Split markdown into chunks of about chunk_size characters
+
+    Args:
+        content: Markdown content
+        chunk_size: Target characters per chunk
+
+    Returns:
+        Chunks in document order; joined with blank lines they read as the
+        original document
+    """
+    if len(content) <= chunk_size:
+        return [content]
+
+    lines = content.split('\n')
+    # Start offset of every line, so any line range's length is a subtraction
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+
+    def span_length(start: int, end: int) -> int:
+        return offsets[end] - offsets[start] - 1
+
+    chunks = []
+    current = []  # blocks packed into the chunk being built
+
+    def flush(keep_headings: bool = True):
+        """Emit the current chunk; trailing headings move on to the next one"""
+        carry = []
+        while keep_headings and current and current[-1][0] == 'heading':
+            carry.insert(0, current.pop())
+        if current:
+            chunks.append('\n'.join(lines[current[0][1]:current[-1][2]]))
+        current[:] = carry
+
+    for block in split_blocks(lines):
+        kind, start, end = block
+        if current and span_length(current[0][1], end) > chunk_size:
+            flush()
+        if current and span_length(current[0][1], end) > chunk_size:
+            # Only headings were carried over, and they don't fit with this block
+            flush(keep_headings=False)
+        if not current and span_length(start, end) > chunk_size:
+            chunks.extend(_split_block(kind, lines[start:end], chunk_size))
+            continue
+        current.append(block)
+    flush(keep_headings=False)
+
+    return chunks
@@ -0,0 +1,66 @@
+"""Per-page log of the markdown cleaning heuristics"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+
+# off: nothing recorded; text: readable log written once at the end;
+# debug: readable log flushed line by line; jsonl: one decision record per line
+LOG_MODES = ("off", "text", "debug", "jsonl")
+
+
+class CleanLog:
+    """Log of one cross_validate_clean call
+
+    Messages use %-style arguments and are only formatted when the readable
+    log is on, so a disabled log costs one attribute check per call. Decision
+    records (`event`) are only kept in jsonl mode. Except in debug mode,
+    everything is buffered and written with a single write on close().
+    """
+
+    def __init__(self, path: Optional[Path] = None, mode: str = "off"):
+        """Initialize clean log
+
+        Args:
+            path: File to write (required unless mode is "off")
+            mode: One of LOG_MODES
+        """
+        if mode not in LOG_MODES:
+            raise ValueError(f"Unknown clean log mode: {mode} (expected one of {', '.join(LOG_MODES)})")
+        self.path = path
+        self.mode = mode
+        self.text_enabled = mode in ("text", "debug")
+        self.trace_enabled = mode == "jsonl"
+        self._buffer = []
+        self._file = None
+        if mode == "debug":
+            self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, message: str, *args):
+        """Log a readable line (message % args)"""
+        if not self.text_enabled:
+            return
+        if args:
+            message = message % args
+        if self._file is not None:
+            self._file.write(message + "\n")
+            self._file.flush()
+        else:
+            self._buffer.append(message)
+
+    def event(self, event: str, **fields):
+        """Record a cleaning decision (jsonl mode only)"""
+        if self.trace_enabled:
+            fields = {'event': event, **fields}
+            self._buffer.append(json.dumps(fields, ensure_ascii=False))
+
+    def close(self):
+        """Write out the buffered log"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elif self.mode != "off":
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write("".join(line + "\n" for line in self._buffer))
+        self._buffer = []
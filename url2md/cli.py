@@ -7,8 +7,25 @@ import json
 import asyncio
 from pathlib import Path
 from datetime import datetime
-from .converter import URL2MDConverter
-from .translator import TranslationConfig, translate_markdown_file
+from typing import TYPE_CHECKING
+from .converter import (
+    URL2MDConverter,
+    WAIT_STRATEGIES,
+    FETCH_MODES,
+    DEFAULT_BLOCKED_RESOURCE_TYPES,
+    DEFAULT_BLOCKED_DOMAINS,
+    format_fetch_stats,
+)
+from .scheduler import ConversionScheduler
+from .cache import CACHE_MODES
+from .parsers import BACKENDS
+from .rules import DEFAULT_REMOVAL_RULES, load_rules
+from .markers import load_markers
+from .cleanlog import LOG_MODES
+
+if TYPE_CHECKING:
+    # Imported when a translation runs (pulls in httpx)
+    from .translator import TranslationConfig
 
 
 def sanitize_filename(filename: str, max_length: int = 100) -> str:
@@ -39,7 +56,7 @@ def sanitize_filename(filename: str, max_length: int = 100) -> str:
     return filename.strip()
 
 
-def _load_translation_config(args) -> TranslationConfig:
+def _load_translation_config(args) -> "TranslationConfig":
     """Load translation configuration from args or config file
     
     Args:
@@ -48,6 +65,8 @@ def _load_translation_config(args) -> TranslationConfig:
     Returns:
         TranslationConfig object
     """
+    from .translator import TranslationConfig
+    
     # If config file is provided, load from it
     if args.translation_config:
         config_path = Path(args.translation_config)
@@ -58,6 +77,8 @@ def _load_translation_config(args) -> TranslationConfig:
             try:
                 with open(config_path, 'r', encoding='utf-8') as f:
                     config_dict = json.load(f)
+                if args.translation_cache:
+                    config_dict['cache_mode'] = args.translation_cache
                 return TranslationConfig(**config_dict)
             except Exception as e:
                 print(f"Warning: Failed to load config file: {e}", file=sys.stderr)
@@ -75,10 +96,165 @@ def _load_translation_config(args) -> TranslationConfig:
     if args.model:
         config_kwargs['model'] = args.model
     
+    if args.translation_cache:
+        config_kwargs['cache_mode'] = args.translation_cache
+    
     return TranslationConfig(**config_kwargs)
 
 
+def _split_list(value: str) -> list[str]:
+    """Split a comma-separated option value, dropping empty items"""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _create_converter(args) -> URL2MDConverter:
+    """Create a converter configured from command line arguments"""
+    block_domains = [] if args.allow_trackers else list(DEFAULT_BLOCKED_DOMAINS)
+    block_domains += _split_list(args.block_domains)
+    
+    return URL2MDConverter(
+        fetch_mode=args.fetch_mode,
+        block_resource_types=_split_list(args.block_types),
+        block_domains=block_domains,
+        cache_mode=args.cache,
+        cache_ttl=args.cache_ttl * 3600,
+        cache_max_mb=args.cache_max_mb,
+        wait_strategy=args.wait_strategy,
+        wait_ceiling=args.wait_ceiling,
+        parser_backend=args.parser,
+        removal_rules=DEFAULT_REMOVAL_RULES + args.extra_rules,
+        extra_markers=args.extra_markers,
+        clean_workers=args.clean_workers,
+        clean_log=args.clean_log,
+    )
+
+
+def _read_url_list(input_path: str) -> list[str]:
+    """Read URLs from a text file (one per line; lines starting with '#' are comments)
+    
+    A '#' inside a line is kept, since it is part of the URL (a fragment).
+    
+    Args:
+        input_path: Path to the URL list file
+        
+    Returns:
+        List of URLs in file order
+    """
+    urls = []
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                urls.append(line)
+    return urls
+
 
+def _unique_path(path: Path) -> Path:
+    """Return path, or a numbered variant if the file already exists"""
+    candidate = path
+    counter = 2
+    while candidate.exists():
+        candidate = path.with_name(f"{path.stem}_{counter}{path.suffix}")
+        counter += 1
+    return candidate
+
+
+def _save_markdown(markdown_content: str, page_title: str, output_dir: Path) -> Path:
+    """Save markdown to a timestamped file named after the page title
+    
+    Args:
+        markdown_content: Markdown to save
+        page_title: Page title used in the filename
+        output_dir: Output directory
+        
+    Returns:
+        Path of the saved file
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    title_part = sanitize_filename(page_title, max_length=50)
+    final_output_path = _unique_path(output_dir / f"{timestamp}_{title_part}.md")
+    final_output_path.write_text(markdown_content, encoding='utf-8')
+    return final_output_path
+
+
+async def _translate_saved_file(path: Path, args, translation_config: "TranslationConfig", http_client=None):
+    """Run the translation workflow for a saved markdown file"""
+    from .translator import translate_markdown_file
+    
+    try:
+        translated_path = await translate_markdown_file(
+            input_path=path,
+            config=translation_config,
+            auto_translate=args.auto_translate,
+            http_client=http_client,
+        )
+        
+        if translated_path:
+            print(f"✓ Translation completed: {translated_path.absolute()}")
+            
+    except Exception as e:
+        print(f"✗ Translation failed: {e}", file=sys.stderr)
+        if args.verbose:
+            import traceback
+            traceback.print_exc()
+        # Don't exit on translation failure, original file is still saved
+
+
+async def _run_batch(urls: list[str], output_dir: Path, args) -> int:
+    """Convert a list of URLs with one shared browser, saving each as it finishes
+    
+    Args:
+        urls: URLs to convert
+        output_dir: Output directory
+        args: Command line arguments
+        
+    Returns:
+        Number of failed conversions
+    """
+    translate = args.translate or args.auto_translate
+    translation_config = _load_translation_config(args) if translate else None
+    
+    scheduler = ConversionScheduler(
+        max_concurrency=args.concurrency,
+        per_host_limit=args.per_host,
+        min_host_delay=args.host_delay,
+    )
+    
+    converter = _create_converter(args)
+    failed = 0
+    done = 0
+    
+    # One pooled API client for every file translated in the batch
+    translation_client = None
+    if translate:
+        from .translator import create_http_client
+        translation_client = create_http_client(translation_config)
+    
+    try:
+        async for result in converter.convert_many_async(urls, scheduler):
+            done += 1
+            if not result.success:
+                failed += 1
+                print(f"✗ [{done}/{len(urls)}] {result.url}: {result.error}", file=sys.stderr)
+                continue
+            
+            final_output_path = _save_markdown(result.markdown, result.title, output_dir)
+            converter.log_final_output(str(final_output_path.absolute()), result.log_path)
+            print(f"✓ [{done}/{len(urls)}] {result.url} -> {final_output_path.absolute()}")
+            
+            if args.verbose:
+                print(f"  Page title: {result.title}")
+                print(f"  Content length: {len(result.markdown)} characters")
+                print(f"  Fetch: {format_fetch_stats(result.fetch_stats)}")
+            
+            if translate:
+                await _translate_saved_file(final_output_path, args, translation_config, translation_client)
+    finally:
+        if translation_client is not None:
+            await translation_client.aclose()
+    
+    print(f"\nConverted {done - failed}/{len(urls)} URLs ({failed} failed)")
+    return failed
 
 
 def main():
@@ -93,26 +269,154 @@ Examples:
   url2md https://example.com/article --translate
   url2md https://example.com/article --auto-translate --provider ollama
   url2md https://example.com/article --translation-config config.json
+  url2md --input urls.txt --output batch_output
         """
     )
     
     parser.add_argument(
         'url',
+        nargs='?',
         help='URL of the web page to convert'
     )
     
+    parser.add_argument(
+        '-i', '--input',
+        type=str,
+        help='Text file with one URL per line; converts all of them with a single browser'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='Batch mode: maximum pages converted at once (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--per-host',
+        type=int,
+        default=2,
+        help='Batch mode: maximum pages fetched at once from one host (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--host-delay',
+        type=float,
+        default=0.5,
+        help='Batch mode: minimum seconds between requests to one host (default: 0.5)'
+    )
+    
+    parser.add_argument(
+        '--clean-workers',
+        type=int,
+        default=0,
+        help='Batch mode: processes that clean fetched pages in parallel (default: 0, clean in the main process)'
+    )
+    
     parser.add_argument(
         '-o', '--output',
         default='outputs',
         help='Output directory (default: outputs)'
     )
     
+    parser.add_argument(
+        '--clean-log',
+        choices=list(LOG_MODES),
+        default='text',
+        help='Per-page log of cleaning decisions in log/: text (default, written once per page), '
+             'debug (flushed line by line), jsonl (machine-readable decision trace) or off'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
         help='Enable verbose output'
     )
     
+    parser.add_argument(
+        '--fetch-mode',
+        choices=FETCH_MODES,
+        default='auto',
+        help='auto: plain HTTP first, browser only for JavaScript-rendered pages; '
+             'browser: always use the browser; http: never launch a browser (default: auto)'
+    )
+    
+    parser.add_argument(
+        '--block-types',
+        type=str,
+        default=','.join(DEFAULT_BLOCKED_RESOURCE_TYPES),
+        help='Comma-separated browser resource types to block, e.g. image,media,font,stylesheet '
+             '(default: %(default)s; pass "" to load everything)'
+    )
+    
+    parser.add_argument(
+        '--block-domains',
+        type=str,
+        default='',
+        help='Comma-separated extra domains to block in the browser (subdomains included)'
+    )
+    
+    parser.add_argument(
+        '--allow-trackers',
+        action='store_true',
+        help='Do not block the built-in list of analytics/ad/tracker domains'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        choices=CACHE_MODES,
+        default='use',
+        help='Fetch cache: use cached pages (revalidating stale ones), refresh them, '
+             'or bypass the cache entirely (default: use)'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=24.0,
+        help='Hours a cached page is reused without revalidation (default: 24)'
+    )
+    
+    parser.add_argument(
+        '--cache-max-mb',
+        type=float,
+        default=500.0,
+        help='Size of the fetch cache before least recently used pages are evicted (default: 500)'
+    )
+    
+    parser.add_argument(
+        '--wait-strategy',
+        choices=WAIT_STRATEGIES,
+        default='adaptive',
+        help='How to decide a page has finished rendering (default: adaptive = DOM and network idle)'
+    )
+    
+    parser.add_argument(
+        '--wait-ceiling',
+        type=float,
+        default=2.0,
+        help='Maximum seconds to wait for dynamic content (default: 2.0)'
+    )
+    
+    parser.add_argument(
+        '--parser',
+        choices=list(BACKENDS),
+        default='bs4',
+        help='HTML engine for content cleaning (default: bs4; lxml is faster)'
+    )
+    
+    parser.add_argument(
+        '--rules',
+        type=str,
+        help='JSON file with extra element removal rules (added to the built-in ones)'
+    )
+    
+    parser.add_argument(
+        '--markers',
+        type=str,
+        help='JSON file with extra footer/promo heading keywords per category (added to the built-in ones)'
+    )
+    
     parser.add_argument(
         '-t', '--translate',
         action='store_true',
@@ -158,36 +462,86 @@ Examples:
         help='Model name for translation (e.g., gpt-4o-mini, gemini-2.0-flash-exp, llama3.2)'
     )
     
+    parser.add_argument(
+        '--translation-cache',
+        choices=CACHE_MODES,
+        help='Translated-chunk cache: use cached chunks, refresh them, or bypass the cache '
+             '(default: use, or cache_mode from --translation-config)'
+    )
+    
     args = parser.parse_args()
     
-    # Validate URL
-    url = args.url.strip()
-    if not url.startswith(('http://', 'https://')):
-        print(f"Error: Invalid URL. Must start with http:// or https://", file=sys.stderr)
-        sys.exit(1)
+    if args.url and args.input:
+        parser.error("Provide either a URL or --input, not both")
+    if not args.url and not args.input:
+        parser.error("A URL or --input file is required")
+    if args.concurrency < 1 or args.per_host < 1 or args.host_delay < 0:
+        parser.error("--concurrency and --per-host must be >= 1, --host-delay must be >= 0")
+    if args.wait_ceiling < 0:
+        parser.error("--wait-ceiling must be >= 0")
+    if args.cache_ttl < 0:
+        parser.error("--cache-ttl must be >= 0")
+    if args.cache_max_mb <= 0:
+        parser.error("--cache-max-mb must be > 0")
+    if args.clean_workers < 0:
+        parser.error("--clean-workers must be >= 0")
+    
+    args.extra_rules = []
+    if args.rules:
+        try:
+            args.extra_rules = load_rules(args.rules)
+        except (OSError, ValueError) as e:
+            parser.error(f"Invalid --rules file: {e}")
+    
+    args.extra_markers = {}
+    if args.markers:
+        try:
+            args.extra_markers = load_markers(args.markers)
+        except (OSError, ValueError) as e:
+            parser.error(f"Invalid --markers file: {e}")
+    
+    # Collect URLs to convert
+    if args.input:
+        try:
+            urls = _read_url_list(args.input)
+        except OSError as e:
+            print(f"Error: Cannot read input file: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        urls = [args.url.strip()]
+    
+    # Validate URLs
+    for url in urls:
+        if not url.startswith(('http://', 'https://')):
+            print(f"Error: Invalid URL '{url}'. Must start with http:// or https://", file=sys.stderr)
+            sys.exit(1)
     
     # Create output directory
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    if args.input:
+        try:
+            failed = asyncio.run(_run_batch(urls, output_dir, args))
+        except KeyboardInterrupt:
+            print("\n\nOperation cancelled by user", file=sys.stderr)
+            sys.exit(130)
+        sys.exit(1 if failed else 0)
+    
+    url = urls[0]
+    
     if args.verbose:
         print(f"Fetching content from: {url}")
     
     try:
         # Create converter
-        converter = URL2MDConverter()
+        converter = _create_converter(args)
         
         # Convert URL to Markdown (without output_path for now)
         markdown_content, page_title = converter.convert(url)
         
-        # Generate final filename with actual page title
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        title_part = sanitize_filename(page_title, max_length=50)
-        final_filename = f"{timestamp}_{title_part}.md"
-        final_output_path = output_dir / final_filename
-        
-        # Save to file with final name
-        final_output_path.write_text(markdown_content, encoding='utf-8')
+        # Save to file named after the actual page title
+        final_output_path = _save_markdown(markdown_content, page_title, output_dir)
         
         # Now append the final path to the log file
         converter.log_final_output(str(final_output_path.absolute()))
@@ -198,6 +552,7 @@ Examples:
         if args.verbose:
             print(f"\nPage title: {page_title}")
             print(f"Content length: {len(markdown_content)} characters")
+            print(f"Fetch: {format_fetch_stats(converter.fetch_stats.get(url))}")
         
         # Translation workflow
         if args.translate or args.auto_translate:
@@ -209,24 +564,7 @@ Examples:
             translation_config = _load_translation_config(args)
             
             # Translate the file
-            try:
-                translated_path = asyncio.run(
-                    translate_markdown_file(
-                        input_path=final_output_path,
-                        config=translation_config,
-                        auto_translate=args.auto_translate,
-                    )
-                )
-                
-                if translated_path:
-                    print(f"✓ Translation completed: {translated_path.absolute()}")
-                    
-            except Exception as e:
-                print(f"✗ Translation failed: {e}", file=sys.stderr)
-                if args.verbose:
-                    import traceback
-                    traceback.print_exc()
-                # Don't exit on translation failure, original file is still saved
+            asyncio.run(_translate_saved_file(final_output_path, args, translation_config))
         
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user", file=sys.stderr)
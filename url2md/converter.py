@@ -1,20 +1,358 @@
-"""Core functionality for converting web pages to Markdown"""
+"""Core functionality for converting web pages to Markdown
 
-from crawl4ai import AsyncWebCrawler
-from bs4 import BeautifulSoup
-import html2text
-from typing import Optional
+crawl4ai (browser), httpx (plain HTTP) and html2text are imported by the
+stages that use them, so importing this module (e.g. for `url2md --help`)
+doesn't load them.
+"""
+
+from typing import TYPE_CHECKING, Optional, Iterable, AsyncIterator, Callable, Union
 import asyncio
+import json
 import re
 from pathlib import Path
+from urllib.parse import urlsplit
 from datetime import datetime
+from .scheduler import ConversionScheduler
+from .cache import FetchCache, CACHE_MODES, cache_validators
+from .document import ParsedDocument, MarkdownDocument, MARKDOWN_LINK_RE
+from .parsers import get_backend, subtree_stats, remove_with_stats
+from .rules import RuleMatcher, DEFAULT_REMOVAL_RULES
+from .markers import MarkerSet
+from .cleanlog import CleanLog, LOG_MODES
+
+if TYPE_CHECKING:
+    import httpx
+    from concurrent.futures import ProcessPoolExecutor
+    from crawl4ai import AsyncWebCrawler
+
+
+# Page-readiness strategies for browser fetches
+WAIT_STRATEGIES = ("adaptive", "dom_idle", "network_idle", "fixed", "none")
+
+# How pages are fetched: plain HTTP first with browser fallback, browser only, or HTTP only
+FETCH_MODES = ("auto", "browser", "http")
+
+# Browser requests that never affect the DOM text we extract
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+
+# Analytics/ads/tracking hosts (subdomains are blocked too). Only domains
+# that serve nothing but tracking are listed whole; for vendors whose own
+# sites live on the same domain, only their tracking hosts are
+DEFAULT_BLOCKED_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com",
+    "doubleclick.net", "googleadservices.com", "adservice.google.com",
+    "connect.facebook.net", "static.hotjar.com", "script.hotjar.com",
+    "cdn.segment.com", "api.segment.io", "cdn.mxpnl.com", "api-js.mixpanel.com",
+    "cdn.amplitude.com", "api2.amplitude.com", "edge.fullstory.com", "rs.fullstory.com",
+    "clarity.ms", "widget.intercom.io", "js.intercomcdn.com",
+    "hs-analytics.net", "hs-scripts.com", "hsadspixel.net", "track.hubspot.com",
+    "cdn.optimizely.com", "logx.optimizely.com", "js-agent.newrelic.com", "nr-data.net",
+    "scorecardresearch.com", "quantserve.com", "cdn.taboola.com", "trc.taboola.com",
+    "widgets.outbrain.com", "odb.outbrain.com", "adsrvr.org", "criteo.net",
+    "px.ads.linkedin.com", "ads-twitter.com",
+)
+
+# Two-label public suffixes, so registrable_domain("blog.example.co.uk") is
+# "example.co.uk" rather than "co.uk" (common cases, not the full public
+# suffix list)
+_SECOND_LEVEL_SUFFIXES = frozenset([
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "me.uk", "com.au", "net.au", "org.au",
+    "co.nz", "co.jp", "ne.jp", "or.jp", "co.kr", "co.in", "com.br", "com.cn",
+    "net.cn", "org.cn", "com.hk", "com.tw", "com.sg", "com.mx", "co.za", "com.tr",
+])
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+# Cheap regex checks for "is the article already in the raw HTML?"
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_BODY_RE = re.compile(r'<body\b[^>]*>(.*)</body\s*>', re.IGNORECASE | re.DOTALL)
+_EMPTY_APP_ROOT_RE = re.compile(
+    r'<(div|main)\b[^>]*\bid=["\']?(root|app|__next|__nuxt|svelte|ember-app)["\']?[^>]*>\s*</\1\s*>',
+    re.IGNORECASE,
+)
+_NOSCRIPT_JS_WARNING_RE = re.compile(
+    r'<noscript\b[^>]*>(?:(?!</noscript).){0,500}?(enable|requires?|turn on)\s+javascript',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def format_fetch_stats(stats: Optional[dict]) -> str:
+    """Render fetch statistics as a one-line summary for verbose output
+    
+    Args:
+        stats: Entry from URL2MDConverter.fetch_stats
+        
+    Returns:
+        Human-readable summary
+    """
+    if not stats:
+        return "unknown"
+    
+    summary = stats['source']
+    if 'transferred_bytes' in stats:
+        summary += f", {stats['transferred_bytes'] / 1024:.1f} KB transferred"
+    if 'blocked_requests' in stats:
+        by_type = ', '.join(f"{t}: {n}" for t, n in sorted(stats['blocked_by_type'].items()))
+        summary += f", {stats['blocked_requests']} requests blocked"
+        if by_type:
+            summary += f" ({by_type})"
+    return summary
+
+
+def registrable_domain(host: str) -> str:
+    """The domain a host belongs to, e.g. "blog.hubspot.com" -> "hubspot.com"
+    
+    Args:
+        host: Host name
+        
+    Returns:
+        The host's last two labels, or three under a known two-label
+        public suffix such as "co.uk"
+    """
+    labels = host.lower().rstrip('.').split('.')
+    if len(labels) > 2 and '.'.join(labels[-2:]) in _SECOND_LEVEL_SUFFIXES:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def looks_complete(html: str, min_text_length: int = 500) -> bool:
+    """Guess whether raw HTML already contains the page content
+    
+    Pages that render their content with JavaScript typically ship an empty
+    app mount point, a "please enable JavaScript" notice, or hardly any
+    visible text outside of scripts.
+    
+    Args:
+        html: Raw HTML from a plain HTTP request
+        min_text_length: Minimum visible body text (characters) to accept
+        
+    Returns:
+        True if the HTML can be converted without running JavaScript
+    """
+    if _EMPTY_APP_ROOT_RE.search(html):
+        return False
+    
+    body_match = _BODY_RE.search(html)
+    body = body_match.group(1) if body_match else html
+    text = _TAG_RE.sub(' ', _SCRIPT_STYLE_RE.sub(' ', body))
+    text_length = len(_WHITESPACE_RE.sub(' ', text).strip())
+    
+    if text_length < min_text_length:
+        return False
+    
+    # A JavaScript notice on a page with little text means the real content is missing
+    if text_length < min_text_length * 4 and _NOSCRIPT_JS_WARNING_RE.search(html):
+        return False
+    
+    return True
+
+
+def build_wait_js(strategy: str, ceiling: float, quiet: float) -> Optional[str]:
+    """Build the JavaScript snippet that waits until a page is ready
+    
+    "dom_idle" waits until the DOM has stopped mutating for `quiet` seconds,
+    "network_idle" until the page has loaded and no resource has finished
+    loading for `quiet` seconds, and "adaptive" requires both. All of them
+    give up after `ceiling` seconds. "fixed" always sleeps `ceiling` seconds
+    and "none" does not wait at all.
+    
+    Args:
+        strategy: One of WAIT_STRATEGIES
+        ceiling: Maximum seconds to wait
+        quiet: Seconds without activity that count as settled
+        
+    Returns:
+        JavaScript code for crawl4ai's js_code, or None for no wait
+    """
+    if strategy not in WAIT_STRATEGIES:
+        raise ValueError(f"Unknown wait strategy: {strategy} (expected one of {', '.join(WAIT_STRATEGIES)})")
+    
+    ceiling_ms = int(ceiling * 1000)
+    quiet_ms = int(quiet * 1000)
+    
+    if strategy == "none" or ceiling_ms <= 0:
+        return None
+    if strategy == "fixed":
+        return f"await new Promise(resolve => setTimeout(resolve, {ceiling_ms}));"
+    
+    watch_dom = "true" if strategy in ("adaptive", "dom_idle") else "false"
+    watch_network = "true" if strategy in ("adaptive", "network_idle") else "false"
+    
+    return f"""await new Promise(resolve => {{
+    const quietMs = {quiet_ms}, ceilingMs = {ceiling_ms};
+    const watchDom = {watch_dom}, watchNetwork = {watch_network};
+    const start = performance.now();
+    let last = start;
+    const bump = () => {{ last = performance.now(); }};
+    let domObserver = null, netObserver = null;
+    if (watchDom) {{
+        domObserver = new MutationObserver(bump);
+        domObserver.observe(document.documentElement, {{childList: true, subtree: true, characterData: true}});
+    }}
+    if (watchNetwork && window.PerformanceObserver) {{
+        try {{
+            netObserver = new PerformanceObserver(bump);
+            netObserver.observe({{type: 'resource'}});
+        }} catch (e) {{}}
+    }}
+    const timer = setInterval(() => {{
+        const now = performance.now();
+        const loaded = !watchNetwork || document.readyState === 'complete';
+        if ((loaded && now - last >= quietMs) || now - start >= ceilingMs) {{
+            clearInterval(timer);
+            if (domObserver) domObserver.disconnect();
+            if (netObserver) netObserver.disconnect();
+            resolve();
+        }}
+    }}, 50);
+}});"""
+
+
+class ConversionResult:
+    """Outcome of converting a single URL in batch mode"""
+    
+    def __init__(
+        self,
+        url: str,
+        markdown: Optional[str] = None,
+        title: Optional[str] = None,
+        error: Optional[Exception] = None,
+        log_path: Optional[Path] = None,
+        fetch_stats: Optional[dict] = None,
+    ):
+        """Initialize conversion result
+        
+        Args:
+            url: The URL that was converted
+            markdown: Converted markdown content (None on failure)
+            title: Page title (None on failure)
+            error: Exception raised during conversion, if any
+            log_path: Clean log written for this conversion, if any
+            fetch_stats: How the page was fetched (source, blocked requests, bytes)
+        """
+        self.url = url
+        self.markdown = markdown
+        self.title = title
+        self.error = error
+        self.log_path = log_path
+        self.fetch_stats = fetch_stats
+    
+    @property
+    def success(self) -> bool:
+        """Whether the conversion succeeded"""
+        return self.error is None
 
 
 class URL2MDConverter:
     """Convert web page content to Markdown format"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        wait_strategy: str = "adaptive",
+        wait_ceiling: float = 2.0,
+        wait_quiet: float = 0.2,
+        fetch_mode: str = "auto",
+        http_timeout: float = 15.0,
+        block_resource_types: Iterable[str] = DEFAULT_BLOCKED_RESOURCE_TYPES,
+        block_domains: Iterable[str] = DEFAULT_BLOCKED_DOMAINS,
+        cache_mode: str = "bypass",
+        cache_dir: Path = Path("cache") / "fetch",
+        cache_ttl: float = 24 * 3600,
+        cache_max_mb: float = 500,
+        parser_backend: str = "bs4",
+        removal_rules: Optional[Iterable[dict]] = None,
+        extra_markers: Optional[dict] = None,
+        clean_workers: int = 0,
+        clean_log: str = "text",
+    ):
+        """Initialize converter
+        
+        Args:
+            wait_strategy: How to decide a fetched page is ready (see WAIT_STRATEGIES)
+            wait_ceiling: Maximum seconds to wait for dynamic content
+            wait_quiet: Seconds without DOM/network activity that count as settled
+            fetch_mode: "auto" tries a plain HTTP GET and falls back to the browser
+                when the page looks JavaScript-rendered; "browser" always uses the
+                browser; "http" never launches one
+            http_timeout: Timeout in seconds for plain HTTP fetches
+            block_resource_types: Browser resource types to abort (Playwright names,
+                e.g. "image", "media", "font", "stylesheet", "script")
+            block_domains: Hosts whose requests are aborted in the browser
+                (subdomains included), except hosts on the page's own
+                registrable domain
+            cache_mode: Fetch cache policy: "use" serves cached pages (revalidating
+                stale ones), "refresh" refetches and overwrites, "bypass" (the
+                default; the CLI opts in with "use") disables it
+            cache_dir: Directory for the fetch cache
+            cache_ttl: Seconds a cached page is served without revalidation
+            cache_max_mb: Size of the fetch cache before the least recently
+                used pages are evicted
+            parser_backend: HTML engine for the DOM cleaning stages: "bs4"
+                (BeautifulSoup) or "lxml" (raw lxml trees, faster)
+            removal_rules: Rules for elements dropped from the main content
+                (see rules.py; default: DEFAULT_REMOVAL_RULES)
+            extra_markers: Additional footer/promo keywords per category, added
+                to the built-in vocabularies (see markers.DEFAULT_MARKERS)
+            clean_workers: Processes that run the cleaning stages during a
+                session (start()/close()), so pages are cleaned on several
+                cores while others are fetched; 0 cleans in this process
+            clean_log: Log of the cleaning decisions written per page to log/
+                (see cleanlog.LOG_MODES): "text" (buffered, written once per
+                page), "debug" (flushed line by line), "jsonl" (decision
+                records) or "off"
+        """
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode: {fetch_mode} (expected one of {', '.join(FETCH_MODES)})")
+        self.fetch_mode = fetch_mode
+        self.http_timeout = http_timeout
+        
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {cache_mode} (expected one of {', '.join(CACHE_MODES)})")
+        self.cache_mode = cache_mode
+        self.fetch_cache = FetchCache(cache_dir, cache_ttl, int(cache_max_mb * 1024 * 1024))
+        
+        # DOM engine shared by every page this converter parses
+        self.parser = get_backend(parser_backend)
+        self.removal_rules = RuleMatcher(DEFAULT_REMOVAL_RULES if removal_rules is None else removal_rules)
+        self.markers = MarkerSet(extra_markers)
+        
+        # Cleaning process pool (created by start()); workers rebuild the
+        # cleaning setup from these picklable options
+        if clean_workers < 0:
+            raise ValueError(f"clean_workers must be >= 0, got {clean_workers}")
+        self.clean_workers = clean_workers
+        self._clean_options = {
+            'parser_backend': parser_backend,
+            'removal_rules': list(DEFAULT_REMOVAL_RULES if removal_rules is None else removal_rules),
+            'extra_markers': extra_markers,
+            'clean_log': clean_log,
+        }
+        self._clean_pool = None
+        
+        # Browser request filtering
+        self.block_resource_types = frozenset(t.lower() for t in block_resource_types)
+        self.block_domains = tuple(d.lower().lstrip('.') for d in block_domains if d)
+        
+        # Per-URL fetch statistics (source, blocked requests, transferred bytes);
+        # batches pop each entry onto its result, convert() keeps only the last
+        self.fetch_stats = {}
+        
+        # Page readiness (validated up front so bad options fail before any fetch)
+        self.wait_strategy = wait_strategy
+        self.wait_ceiling = wait_ceiling
+        self.wait_quiet = wait_quiet
+        self._wait_js = build_wait_js(wait_strategy, wait_ceiling, wait_quiet)
+        
         # Configure html2text
+        import html2text
         self.h2t = html2text.HTML2Text()
         self.h2t.ignore_links = False
         self.h2t.ignore_images = False
@@ -23,16 +361,106 @@ class URL2MDConverter:
         self.h2t.single_line_break = False
         
         # Setup logging
+        if clean_log not in LOG_MODES:
+            raise ValueError(f"Unknown clean log mode: {clean_log} (expected one of {', '.join(LOG_MODES)})")
+        self.clean_log = clean_log
         self.log_dir = Path("log")
-        self.log_dir.mkdir(exist_ok=True)
-        self.log_file = None
+        if clean_log != "off":
+            self.log_dir.mkdir(exist_ok=True)
+        self._clean_log = CleanLog()
         self.log_path = None  # Track current log file path
+        
+        # Shared clients for batch mode (between start() and close());
+        # outside a session each fetch opens and closes its own
+        self._session_open = False
+        self._crawler = None
+        self._crawler_lock = None
+        self._http_client = None
+    
+    async def start(self):
+        """Open a session whose HTTP client and browser are reused until close()
+        
+        The browser is launched lazily, on the first page that needs it.
+        """
+        if self._session_open:
+            return
+        self._session_open = True
+        self._crawler_lock = asyncio.Lock()
+        if self.fetch_mode != "browser":
+            self._http_client = self._create_http_client()
+        if self.clean_workers > 0:
+            self._clean_pool = self._create_clean_pool()
+    
+    async def close(self):
+        """Shut down the HTTP client, browser and cleaning workers opened during the session"""
+        self._session_open = False
+        if self._clean_pool is not None:
+            pool = self._clean_pool
+            self._clean_pool = None
+            await asyncio.to_thread(pool.shutdown)
+        if self._http_client is not None:
+            client = self._http_client
+            self._http_client = None
+            await client.aclose()
+        if self._crawler is not None:
+            crawler = self._crawler
+            self._crawler = None
+            await crawler.__aexit__(None, None, None)
+    
+    def _create_clean_pool(self) -> "ProcessPoolExecutor":
+        """Start the cleaning worker processes
+        
+        Workers are spawned rather than forked so they don't inherit the event
+        loop, browser or HTTP client. Each one is sent a no-op task right away,
+        so the html2text/bs4/lxml imports run while the first pages are still
+        being fetched instead of delaying the first cleaned page.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(
+            max_workers=self.clean_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_clean_worker,
+            initargs=(self._clean_options,),
+        )
+        for _ in range(self.clean_workers):
+            pool.submit(_warm_up_clean_worker)
+        return pool
+    
+    def _create_http_client(self) -> "httpx.AsyncClient":
+        """Create a pooled HTTP client for the static fetch path"""
+        import httpx
+        return httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=self.http_timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        )
+    
+    async def _get_shared_crawler(self) -> "AsyncWebCrawler":
+        """Return the session's browser, launching it on first use"""
+        from crawl4ai import AsyncWebCrawler
+        async with self._crawler_lock:
+            if self._crawler is None:
+                crawler = AsyncWebCrawler(verbose=False)
+                await crawler.__aenter__()
+                self._crawler = crawler
+        return self._crawler
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _log(self, message: str, *args):
+        """Write log message (message % args, formatted only if logging is on)"""
+        self._clean_log.write(message, *args)
     
-    def _log(self, message: str):
-        """Write log message to file"""
-        if self.log_file:
-            self.log_file.write(message + "\n")
-            self.log_file.flush()
+    def _trace(self, event: str, **fields):
+        """Record a cleaning decision in the JSONL trace"""
+        self._clean_log.event(event, **fields)
     
     def _calculate_text_length_without_links(self, text: str) -> tuple[int, int]:
         """Calculate text length excluding link text, and count links
@@ -44,8 +472,7 @@ class URL2MDConverter:
             Tuple of (text_length_without_links, link_count)
         """
         # Find all markdown links: [text](url)
-        link_pattern = r'\[([^\]]+)\]\([^\)]+\)'
-        links = re.findall(link_pattern, text)
+        links = MARKDOWN_LINK_RE.findall(text)
         link_count = len(links)
         
         # Calculate total link text length
@@ -57,18 +484,20 @@ class URL2MDConverter:
         
         return max(1, text_without_links_length), link_count
     
-    def _extract_title_from_markdown(self, markdown: str) -> str:
+    def _extract_title_from_markdown(self, markdown: Union[str, MarkdownDocument]) -> str:
         """Extract page title from markdown content (prefer H1 heading)
         
         Args:
-            markdown: Markdown content
+            markdown: Markdown content (text or MarkdownDocument)
             
         Returns:
             Extracted title or 'Untitled'
         """
-        lines = markdown.split('\n')
-        for line in lines[:50]:  # Check first 50 lines
-            stripped = line.strip()
+        if isinstance(markdown, MarkdownDocument):
+            first_lines = markdown.stripped[:50]
+        else:
+            first_lines = [line.strip() for line in markdown.split('\n', 50)[:50]]
+        for stripped in first_lines:  # Check first 50 lines
             # Look for H1 heading (# Title, not ## or ###)
             if stripped.startswith('# ') and not stripped.startswith('## '):
                 title = stripped[2:].strip()
@@ -78,47 +507,268 @@ class URL2MDConverter:
                 return title if title else 'Untitled'
         return 'Untitled'
     
-    async def fetch_url(self, url: str) -> tuple[str, str]:
-        """Fetch content from URL using crawl4ai
+    async def fetch_url(self, url: str) -> tuple[str, Optional[str]]:
+        """Fetch content from URL, using a plain HTTP GET when JavaScript is not needed
+        
+        With the fetch cache enabled, fresh entries are served without any
+        request and stale ones are revalidated with ETag / Last-Modified.
+        
+        Pages fetched over plain HTTP come back without markdown (None):
+        process_page renders it from the HTML, in a cleaning worker when
+        clean_workers is set, against fetch_stats[url]['final_url'].
         
         Args:
             url: The URL to fetch
             
         Returns:
-            Tuple of (HTML content, markdown content from crawl4ai)
+            Tuple of (HTML content, markdown content or None)
             
         Raises:
             Exception: If the fetch fails
         """
-        async with AsyncWebCrawler(verbose=False) as crawler:
-            result = await crawler.arun(
-                url=url,
-                # Wait for page to load completely
-                wait_for="body",
-                # Use JavaScript to wait for dynamic content
-                js_code="await new Promise(resolve => setTimeout(resolve, 2000));",
-                # Extract markdown directly
-                bypass_cache=True
-            )
+        cached = None
+        if self.cache_mode == "use":
+            cached = self.fetch_cache.get(url)
+            if cached and self.fetch_cache.is_fresh(cached):
+                self.fetch_stats[url] = {'source': 'cache', 'final_url': cached.get('final_url') or url}
+                return cached['html'], cached['markdown']
+            if cached and not self.fetch_cache.has_validators(cached):
+                cached = None
+        
+        html = None
+        markdown = None
+        final_url = None
+        validators = {}
+        
+        # Plain HTTP: fast path, and/or conditional revalidation of a stale entry
+        if self.fetch_mode != "browser" or cached:
+            request_headers = self.fetch_cache.conditional_headers(cached) if cached else None
+            response = await self._http_get(url, request_headers)
+            
+            if response is not None and response.status_code == 304:
+                self.fetch_cache.touch(url, cached)
+                self.fetch_stats[url] = {
+                    'source': 'cache (revalidated)',
+                    'final_url': cached.get('final_url') or url,
+                }
+                return cached['html'], cached['markdown']
+            
+            if response is not None:
+                validators = cache_validators(response.headers)
+                if self.fetch_mode != "browser":
+                    html = self._usable_static_html(response)
+                    if html is not None:
+                        final_url = str(response.url)
+                        self.fetch_stats[url] = {
+                            'source': 'http',
+                            'final_url': final_url,
+                            'transferred_bytes': len(response.content),
+                        }
+        
+        if html is None:
+            # Reuse the warm browser in batch mode, otherwise launch one for this URL
+            if self._session_open:
+                html, markdown, response_headers = await self._crawl(await self._get_shared_crawler(), url)
+            else:
+                from crawl4ai import AsyncWebCrawler
+                async with AsyncWebCrawler(verbose=False) as crawler:
+                    html, markdown, response_headers = await self._crawl(crawler, url)
+            if not validators:
+                validators = cache_validators(response_headers)
+        
+        if self.cache_mode != "bypass":
+            self.fetch_cache.put(url, html, markdown, final_url=final_url, **validators)
+        
+        return html, markdown
+    
+    def render_markdown(self, html: str, url: str) -> str:
+        """Convert raw HTML to markdown the way crawl4ai does after a browser fetch
+        
+        Runs crawl4ai's default scraping strategy and markdown generator
+        without a browser, so a page fetched over plain HTTP reaches
+        cross_validate_clean in the same form as one rendered by the browser.
+        
+        Args:
+            html: Raw HTML of the page
+            url: Final page URL (base for relative links)
+            
+        Returns:
+            Markdown content
+        """
+        from crawl4ai import CrawlerRunConfig
+        from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+        
+        config = CrawlerRunConfig()
+        params = config.__dict__.copy()
+        params.pop("url", None)
+        scraped = config.scraping_strategy.scrap(url, html, **params)
+        
+        # Like crawl4ai, resolve relative links against <base href> if present
+        base_match = re.search(r'<base\s[^>]*href\s*=\s*["\']([^"\']+)["\']', html, re.IGNORECASE)
+        base_url = base_match.group(1) if base_match else url
+        result = DefaultMarkdownGenerator().generate_markdown(input_html=scraped.cleaned_html, base_url=base_url)
+        return result.raw_markdown
+    
+    async def _http_get(self, url: str, headers: Optional[dict] = None) -> Optional["httpx.Response"]:
+        """GET a URL over plain HTTP
+        
+        Args:
+            url: The URL to fetch
+            headers: Extra request headers (e.g. conditional headers)
+            
+        Returns:
+            Successful or 304 response, or None if the request failed
+            
+        Raises:
+            Exception: In "http" mode, if the request fails
+        """
+        import httpx
+        client = self._http_client or self._create_http_client()
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except httpx.HTTPError as e:
+            if self.fetch_mode == "http":
+                raise Exception(f"Failed to fetch URL: {e}")
+            return None
+        finally:
+            if client is not self._http_client:
+                await client.aclose()
+    
+    def _usable_static_html(self, response: "httpx.Response") -> Optional[str]:
+        """Return the response HTML if it can be converted without a browser
+        
+        Args:
+            response: Successful plain HTTP response
             
-            if not result.success:
-                error_msg = getattr(result, 'error_message', 'Unknown error')
-                raise Exception(f"Failed to crawl URL: {error_msg}")
+        Returns:
+            HTML if it looks complete, or None if the browser is needed
+            (always the HTML in "http" mode)
+        """
+        if self.fetch_mode == "http":
+            return response.text
+        
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type:
+            return None
+        
+        html = response.text
+        return html if looks_complete(html) else None
+    
+    def _is_blocked_host(self, host: str, page_host: Optional[str] = None) -> bool:
+        """Whether a request host matches the domain blocklist
+        
+        Args:
+            host: Host of the request
+            page_host: Host of the page being converted; hosts on the same
+                registrable domain are first-party and never blocked
+        """
+        host = host.lower()
+        if page_host and registrable_domain(host) == registrable_domain(page_host):
+            return False
+        return any(host == domain or host.endswith('.' + domain) for domain in self.block_domains)
+    
+    async def _before_goto(self, page, context=None, url=None, **kwargs):
+        """crawl4ai hook: install request filtering and byte accounting on a new page"""
+        stats = {
+            'source': 'browser',
+            'blocked_requests': 0,
+            'blocked_by_type': {},
+            'transferred_bytes': 0,
+        }
+        if url:
+            self.fetch_stats[url] = stats
+        
+        async def on_response(response):
+            # Encoded body plus headers as received, so chunked and compressed
+            # responses count too; Content-Length only if the sizes are gone
+            try:
+                sizes = await response.request.sizes()
+                stats['transferred_bytes'] += sizes['responseBodySize'] + sizes['responseHeadersSize']
+            except Exception:
+                length = response.headers.get('content-length')
+                if length and length.isdigit():
+                    stats['transferred_bytes'] += int(length)
+        
+        page.on('response', on_response)
+        
+        if not self.block_resource_types and not self.block_domains:
+            return page
+        
+        page_host = urlsplit(url).hostname if url else None
+        
+        async def handle_route(route):
+            request = route.request
+            resource_type = request.resource_type
+            try:
+                # Never block the page itself
+                is_main_document = request.is_navigation_request() and request.frame == page.main_frame
+            except Exception:
+                # Service worker requests have no frame: never leave a route hanging
+                await route.continue_()
+                return
+            blocked = not is_main_document and (
+                resource_type in self.block_resource_types or
+                self._is_blocked_host(urlsplit(request.url).hostname or '', page_host)
+            )
+            if blocked:
+                stats['blocked_requests'] += 1
+                stats['blocked_by_type'][resource_type] = stats['blocked_by_type'].get(resource_type, 0) + 1
+                await route.abort()
+            else:
+                await route.continue_()
+        
+        await page.route("**/*", handle_route)
+        return page
+    
+    async def _crawl(self, crawler: "AsyncWebCrawler", url: str) -> tuple[str, str, dict]:
+        """Run a single crawl on an already-open crawler
+        
+        Args:
+            crawler: Open AsyncWebCrawler instance
+            url: The URL to fetch
             
-            # Return both HTML and extracted markdown
-            return result.html, result.markdown if hasattr(result, 'markdown') else ""
+        Returns:
+            Tuple of (HTML content, markdown content from crawl4ai, response headers)
+        """
+        from crawl4ai import CacheMode, CrawlerRunConfig
+        
+        crawler.crawler_strategy.set_hook('before_goto', self._before_goto)
+        
+        # crawl4ai only reads run options from the config (keyword arguments
+        # to arun() are ignored)
+        config = CrawlerRunConfig(
+            # Wait for page to load completely
+            wait_for="css:body",
+            # Use JavaScript to wait for dynamic content to settle
+            js_code=self._wait_js,
+            # Caching is handled by FetchCache, whatever crawl4ai's default
+            cache_mode=CacheMode.BYPASS,
+        )
+        result = await crawler.arun(url=url, config=config)
+        
+        if not result.success:
+            error_msg = getattr(result, 'error_message', 'Unknown error')
+            raise Exception(f"Failed to crawl URL: {error_msg}")
+        
+        # Return both HTML and extracted markdown
+        markdown = str(result.markdown) if getattr(result, 'markdown', None) else ""
+        return result.html, markdown, getattr(result, 'response_headers', None) or {}
     
-    def extract_main_content(self, html: str, url: str) -> str:
+    def extract_main_content(self, html: Union[str, ParsedDocument], url: str) -> str:
         """Extract main article content from HTML using DOM structure
         
         Args:
-            html: Raw HTML content
+            html: Raw HTML content, or the page's shared ParsedDocument
             url: Original URL (for reference)
             
         Returns:
             Extracted main content as HTML
         """
-        soup = BeautifulSoup(html, 'lxml')
+        document = ParsedDocument.of(html, self.parser)
+        dom = document.backend
         
         # Strategy 1: Find the article/main container first
         main_content = None
@@ -140,75 +790,50 @@ class URL2MDConverter:
         ]
         
         for selector in content_selectors:
-            main_content = soup.select_one(selector)
-            if main_content:
-                # Make a copy to work with
-                main_content = BeautifulSoup(str(main_content), 'lxml')
+            main_content = dom.select_one(document.root, selector)
+            if main_content is not None:
+                # Work on a copy in a document of its own (the shared tree must
+                # stay intact); the container itself is then checked by the
+                # removal rules and link-density pruning below, like its contents
+                main_content = dom.copy_as_document(main_content)
                 break
         
-        # If no main content found, use body
-        if not main_content:
-            main_content = soup
+        # If no main content found, use (a copy of) the whole document
+        if main_content is None:
+            main_content = dom.copy_as_document(document.root)
         
         # Strategy 2: Remove elements by their semantic role and position
         # Remove from the COPY, not the original
         
-        # 1. Remove script, style, iframe (always unwanted)
-        for tag in ['script', 'style', 'iframe']:
-            for element in main_content.find_all(tag):
-                element.decompose()
-        
-        # 2. Remove semantic navigation/header/footer elements
-        for tag in ['nav', 'header', 'footer', 'aside']:
-            for element in main_content.find_all(tag):
-                element.decompose()
-        
-        # 3. Remove by common non-content classes/ids
-        unwanted_patterns = [
-            # Navigation
-            lambda tag: tag.name in ['div', 'section'] and tag.get('class') and 
-                       any('nav' in c.lower() for c in tag.get('class', [])),
-            lambda tag: tag.name in ['div', 'section'] and tag.get('id') and 
-                       'nav' in tag.get('id', '').lower(),
-            # Sidebar
-            lambda tag: tag.get('class') and any('sidebar' in c.lower() for c in tag.get('class', [])),
-            lambda tag: tag.get('id') and 'sidebar' in tag.get('id', '').lower(),
-            # Comments
-            lambda tag: tag.get('class') and any('comment' in c.lower() for c in tag.get('class', [])),
-            lambda tag: tag.get('id') and 'comment' in tag.get('id', '').lower(),
-            # Ads and promotions
-            lambda tag: tag.get('class') and any(p in str(tag.get('class')).lower() 
-                       for p in ['advertisement', 'ad-', 'promo']),
-            # Social sharing
-            lambda tag: tag.get('class') and any('share' in c.lower() for c in tag.get('class', [])),
-        ]
-        
-        for pattern in unwanted_patterns:
-            for element in main_content.find_all(pattern):
-                element.decompose()
+        # 1-3. Remove scripts, semantic navigation/header/footer elements and
+        # common non-content classes/ids (see rules.py), all in one traversal
+        for element in self.removal_rules.find_matches(dom, main_content):
+            dom.remove(element)
         
         # 4. Smart detection: Remove sections that are link-heavy
         # Strategy: Find all sections/divs recursively and check from bottom up
-        body = main_content.find('body') if main_content.find('body') else main_content
+        body = dom.find_first(main_content, 'body')
+        if body is None:
+            body = main_content
+        
+        # Text/link totals and document position for every element, computed
+        # in one pass (totals are kept up to date as sections are removed below)
+        container_tags = ['section', 'div', 'footer']
+        stats = subtree_stats(dom, body, container_tags)
         
         # Find ALL sections/divs/footer elements (not just direct children)
-        all_sections = body.find_all(['section', 'div', 'footer'], recursive=True)
+        all_sections = dom.find_all(body, container_tags)
         
         # Filter to get "container-level" elements (not deeply nested ones)
         # We want elements that don't contain other sections
         candidate_elements = []
         for element in all_sections:
-            # Check if this element contains other section-like elements
-            nested_sections = element.find_all(['section', 'div', 'footer'], recursive=True)
             # If it has fewer than 3 nested sections, it's a leaf/near-leaf container
-            if len(nested_sections) < 3:
+            if stats[dom.node_key(element)]['containers'] < 3:
                 candidate_elements.append(element)
         
-        # Sort by position in document (using string position as proxy)
-        try:
-            candidate_elements.sort(key=lambda x: str(body).find(str(x)[:100]))
-        except:
-            pass  # If sorting fails, proceed with original order
+        # Sort by position in document
+        candidate_elements.sort(key=lambda x: stats[dom.node_key(x)]['order'])
         
         # Check from the end backwards for navigation/footer sections
         removed_count = 0
@@ -217,17 +842,16 @@ class URL2MDConverter:
             if removed_count > 5:
                 break
                 
-            text_content = element.get_text(strip=True)
-            links = element.find_all('a')
+            element_stats = stats[dom.node_key(element)]
             
-            # Skip empty elements
-            if not text_content or len(text_content) < 10:
+            # Skip empty elements (and ones already removed with an ancestor)
+            if element_stats['removed'] or element_stats['text_length'] < 10:
                 continue
             
             # Calculate metrics
-            link_count = len(links)
-            total_text_length = len(text_content)
-            link_text_length = sum(len(link.get_text(strip=True)) for link in links)
+            link_count = element_stats['link_count']
+            total_text_length = element_stats['text_length']
+            link_text_length = element_stats['link_text_length']
             link_density = link_text_length / total_text_length if total_text_length > 0 else 0
             
             # Calculate average text per link (indicator of navigation lists)
@@ -246,7 +870,7 @@ class URL2MDConverter:
             )
             
             if is_navigation:
-                element.decompose()
+                remove_with_stats(dom, element, stats, container_tags)
                 removed_count += 1
             else:
                 # Once we hit substantial content (not navigation), stop removing
@@ -254,8 +878,45 @@ class URL2MDConverter:
                 if total_text_length > 500 and link_density < 0.3:
                     break
         
-        result = str(body) if body else str(main_content)
-        return result if result else html
+        result = dom.to_html(body)
+        return result if result else document.html
+    
+    def _in_link_heavy_container(self, dom, element, stats: dict) -> bool:
+        """Check whether the section/div around an element is link-heavy in the HTML
+        
+        Args:
+            dom: Parser backend of the document
+            element: Element holding a section heading
+            stats: subtree_stats() of the whole document
+            
+        Returns:
+            True if the container has >1.5 links per 100 chars or >8 links
+        """
+        # Get parent container (go up to find section/div)
+        parent = dom.parent(element)
+        if parent is None:
+            parent = element
+        
+        # Try to find a better container
+        for _ in range(3):  # Go up max 3 levels
+            if parent is not None and dom.tag_name(parent) in ['section', 'div', 'footer']:
+                break
+            if parent is not None:
+                parent = dom.parent(parent)
+        
+        if parent is None:
+            return False
+        
+        # Calculate link density in HTML
+        parent_stats = stats[dom.node_key(parent)]
+        if parent_stats['text_length'] > 50:  # Valid section
+            html_link_count = parent_stats['link_count']
+            html_text_length = parent_stats['text_length']
+            html_links_per_100 = html_link_count / max(1, html_text_length / 100)
+            
+            # High link density in HTML (>1.5 links per 100 chars OR >8 links total)
+            return html_links_per_100 > 1.5 or html_link_count > 8
+        return False
     
     def html_to_markdown(self, html: str) -> str:
         """Convert HTML to Markdown
@@ -300,39 +961,87 @@ class URL2MDConverter:
         try:
             # Fetch HTML content and crawl4ai's markdown
             html, crawl4ai_markdown = await self.fetch_url(url)
+            base_url = (self.fetch_stats.get(url) or {}).get('final_url')
             
-            # Strategy: Use crawl4ai markdown with cross-validation cleaning
-            if crawl4ai_markdown and len(crawl4ai_markdown.strip()) > 100:
-                # Use crawl4ai's markdown
-                markdown = crawl4ai_markdown
-                
-                # Cross-validate with HTML to identify footer sections
-                markdown: str = self.cross_validate_clean(markdown, html, output_path)
-            else:
-                # Fallback: If crawl4ai didn't produce good markdown, use our HTML method
-                main_html = self.extract_main_content(html, url)
-                markdown = self.html_to_markdown(main_html)
-                markdown = self.clean_markdown(markdown)
-            
-            # Extract page title from cleaned markdown (prefer H1) or HTML <title>
-            page_title = self._extract_title_from_markdown(markdown)
-            if not page_title or page_title == 'Untitled':
-                # Fallback to HTML <title>
-                soup = BeautifulSoup(html, 'lxml')
-                title = soup.find('title')
-                page_title = title.get_text().strip() if title else 'Untitled'
-            
-            # Add metadata header
-            header = f"# {page_title}\n\n"
-            header += f"**Source:** {url}\n\n"
-            header += "---\n\n"
-            
-            return header + markdown, page_title
+            if self._clean_pool is not None:
+                loop = asyncio.get_running_loop()
+                markdown, page_title, log_path = await loop.run_in_executor(
+                    self._clean_pool, _clean_in_worker, url, html, crawl4ai_markdown, output_path, base_url
+                )
+                # Set after the last await, so batch jobs read their own log path
+                self.log_path = log_path
+                return markdown, page_title
+            
+            markdown, page_title, _ = self.process_page(url, html, crawl4ai_markdown, output_path, base_url)
+            return markdown, page_title
             
         except Exception as e:
             raise Exception(f"Failed to convert content: {e}")
     
-    def cross_validate_clean(self, markdown: str, html: str, output_path: Optional[str] = None) -> str:
+    def process_page(
+        self,
+        url: str,
+        html: str,
+        crawl4ai_markdown: Optional[str],
+        output_path: Optional[str] = None,
+        base_url: Optional[str] = None,
+    ) -> tuple[str, str, Optional[Path]]:
+        """Clean a fetched page into markdown (the CPU-bound part of a conversion)
+        
+        Args:
+            url: The page URL
+            html: Raw HTML of the page
+            crawl4ai_markdown: Markdown produced by crawl4ai, "" if it
+                produced none, or None to render it here from the HTML
+                (pages fetched over plain HTTP)
+            output_path: Optional output file path for logging
+            base_url: URL the HTML was served from, for rendering (defaults to url)
+            
+        Returns:
+            Tuple of (markdown_content, page_title, clean log path or None)
+        """
+        # Everything below runs without awaiting, so per-conversion state
+        # like log_path stays consistent even when batches run concurrently
+        self.log_path = None
+        
+        # Parsed lazily, at most once, and shared by every stage below
+        document = ParsedDocument(html, self.parser)
+        
+        if crawl4ai_markdown is None:
+            crawl4ai_markdown = self.render_markdown(html, base_url or url)
+        
+        # Strategy: Use crawl4ai markdown with cross-validation cleaning
+        if crawl4ai_markdown and len(crawl4ai_markdown.strip()) > 100:
+            # Use crawl4ai's markdown
+            markdown = crawl4ai_markdown
+            
+            # Cross-validate with HTML to identify footer sections
+            markdown: str = self.cross_validate_clean(markdown, document, output_path)
+        else:
+            # Fallback: If crawl4ai didn't produce good markdown, use our HTML method
+            main_html = self.extract_main_content(document, url)
+            markdown = self.html_to_markdown(main_html)
+            markdown = self.clean_markdown(markdown)
+        
+        # Extract page title from cleaned markdown (prefer H1) or HTML <title>
+        page_title = self._extract_title_from_markdown(markdown)
+        if not page_title or page_title == 'Untitled':
+            # Fallback to HTML <title>
+            page_title = document.title or 'Untitled'
+        
+        # Add metadata header
+        header = f"# {page_title}\n\n"
+        header += f"**Source:** {url}\n\n"
+        header += "---\n\n"
+        
+        return header + markdown, page_title, self.log_path
+    
+    def cross_validate_clean(
+        self,
+        markdown: Union[str, MarkdownDocument],
+        html: Union[str, ParsedDocument],
+        output_path: Optional[str] = None,
+    ) -> str:
         """Cross-validate markdown sections with HTML to remove footer/navigation
         
         Strategy:
@@ -343,94 +1052,116 @@ class URL2MDConverter:
         5. Remove all footer sections from the end
         
         Args:
-            markdown: Markdown content from crawl4ai
-            html: Original HTML content
+            markdown: Markdown content from crawl4ai (text or MarkdownDocument)
+            html: Original HTML content, or the page's shared ParsedDocument
             output_path: Optional output file path for logging
             
         Returns:
             Cleaned markdown with footer removed
         """
-        # Start logging
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_path = self.log_dir / f"clean_{timestamp}.log"
-        self.log_file = open(self.log_path, "w", encoding="utf-8")
-        
-        # Print log file location to console (with flush to ensure immediate output)
-        print("\n" + "="*80, flush=True)
-        print(f"📋 日志文件: {self.log_path.absolute()}", flush=True)
-        print("="*80 + "\n", flush=True)
+        document = ParsedDocument.of(html, self.parser)
+        
+        # Start logging (microseconds keep pages cleaned in parallel apart)
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        if self.clean_log == "off":
+            self.log_path = None
+            self._clean_log = CleanLog()
+        else:
+            suffix = ".jsonl" if self.clean_log == "jsonl" else ".log"
+            self.log_path = self.log_dir / f"clean_{timestamp}_{now:%f}{suffix}"
+            self._clean_log = CleanLog(self.log_path, self.clean_log)
         
         self._log("="*80)
         self._log("DEBUG: cross_validate_clean() started")
         self._log("="*80)
-        self._log(f"Timestamp: {timestamp}")
-        self._log(f"Log file: {self.log_path.absolute()}")
+        self._log("Timestamp: %s", timestamp)
+        if self._clean_log.text_enabled:
+            self._log("Log file: %s", self.log_path.absolute())
         self._log("")
         
-        lines = markdown.split('\n')
+        # Close the log even if cleaning fails, so the file is written out
+        try:
+            return self._cross_validate_clean(markdown, document, output_path)
+        except Exception as e:
+            self._log("ERROR: cleaning failed: %s", e)
+            self._trace("error", error=str(e))
+            raise
+        finally:
+            self._clean_log.close()
+            if self.log_path is not None:
+                # Print log file location once it is written (flush for immediate output)
+                print("\n" + "="*80, flush=True)
+                print(f"📋 日志文件: {self.log_path.absolute()}", flush=True)
+                print("="*80 + "\n", flush=True)
+    
+    def _cross_validate_clean(
+        self,
+        markdown: Union[str, MarkdownDocument],
+        document: ParsedDocument,
+        output_path: Optional[str],
+    ) -> str:
+        """Body of cross_validate_clean, run with the clean log open"""
+        # Split into lines once; later passes cut line ranges out of it
+        doc = MarkdownDocument.of(markdown)
+        self._trace("start", lines=len(doc), output_path=output_path)
         
         # Debug: Show first 60 lines of markdown
-        self._log("\n--- First 60 lines of input markdown:")
-        for i, line in enumerate(lines[:60]):
-            preview = line[:100] if len(line) <= 100 else line[:97] + "..."
-            self._log(f"  {i:3d}: {preview}")
+        if self._clean_log.text_enabled:
+            self._log("\n--- First 60 lines of input markdown:")
+            for i, line in enumerate(doc.lines[:60]):
+                preview = line[:100] if len(line) <= 100 else line[:97] + "..."
+                self._log("  %3d: %s", i, preview)
         
         # STEP 0: Detect and remove header navigation (before article content)
         # Strategy: Find H1 title (article start) or first H2, and remove everything before it
         
         # First, look for H1 title (most reliable article start marker)
-        h1_line = None
         first_h2_line = None
-        
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if stripped.startswith('# ') and not stripped.startswith('## '):
-                h1_line = i
-                self._log(f"\n--- Found H1 title at line {i}: {stripped[:50]}...")
-                break
+        h1_line = doc.first_heading(1)
+        if h1_line is not None:
+            self._log("\n--- Found H1 title at line %s: %s...", h1_line, doc.stripped[h1_line][:50])
         
         # If no H1, find first H2
         if h1_line is None:
-            for i, line in enumerate(lines):
-                if line.strip().startswith('## '):
-                    first_h2_line = i
-                    self._log(f"\n--- First ## heading found at line {i}: {line.strip()[:50]}...")
-                    break
+            first_h2_line = doc.first_heading(2)
+            if first_h2_line is not None:
+                self._log("\n--- First ## heading found at line %s: %s...", first_h2_line, doc.stripped[first_h2_line][:50])
         
         # Determine content start: prefer H1, fallback to H2
         article_start_line = h1_line if h1_line is not None else first_h2_line
         
         if article_start_line is not None and article_start_line > 10:
-            self._log(f"\n--- Analyzing header region (lines 0-{article_start_line})...")
-            self._log(f"    Article content starts at line {article_start_line}")
-            
-            # Parse HTML to verify
-            soup = BeautifulSoup(html, 'lxml')
-            main_article = None
-            main_selectors = ['article', '[role="main"]', 'main', '.post-content', 
-                            '.article-content', '.blog-content', '.entry-content']
-            for selector in main_selectors:
-                main_article = soup.select_one(selector)
-                if main_article:
-                    self._log(f"    Found main article container: {selector}")
-                    break
+            self._log("\n--- Analyzing header region (lines 0-%s)...", article_start_line)
+            self._log("    Article content starts at line %s", article_start_line)
+            
+            # Check the (shared) HTML tree to verify (only reported in the log)
+            if self._clean_log.text_enabled:
+                dom = document.backend
+                main_article = None
+                main_selectors = ['article', '[role="main"]', 'main', '.post-content', 
+                                '.article-content', '.blog-content', '.entry-content']
+                for selector in main_selectors:
+                    main_article = dom.select_one(document.root, selector)
+                    if main_article is not None:
+                        self._log("    Found main article container: %s", selector)
+                        break
             
             # Count navigation content before article start
-            header_lines = lines[:article_start_line]
-            header_text = '\n'.join(header_lines)
-            header_link_count = header_text.count('](')
-            header_non_empty = [l for l in header_lines if l.strip()]
+            header_link_count = doc.link_mark_count(0, article_start_line)
+            header_non_empty = doc.non_empty_count(0, article_start_line)
             
-            self._log(f"\n--- Header region (lines 0-{article_start_line}):")
-            self._log(f"    Non-empty lines: {len(header_non_empty)}, Links: {header_link_count}")
+            self._log("\n--- Header region (lines 0-%s):", article_start_line)
+            self._log("    Non-empty lines: %s, Links: %s", header_non_empty, header_link_count)
             
             # Show preview
-            self._log(f"    Content preview (first 10 non-empty lines):")
-            shown = 0
-            for i, line in enumerate(header_lines):
-                if line.strip() and shown < 10:
-                    self._log(f"      {i}: {line.strip()[:80]}")
-                    shown += 1
+            if self._clean_log.text_enabled:
+                self._log("    Content preview (first 10 non-empty lines):")
+                shown = 0
+                for i, stripped in enumerate(doc.stripped[:article_start_line]):
+                    if stripped and shown < 10:
+                        self._log("      %s: %s", i, stripped[:80])
+                        shown += 1
             
             # Decision: Remove header if it has navigation-like characteristics
             # OR if we found a clear H1 article title
@@ -440,97 +1171,75 @@ class URL2MDConverter:
                 # If we found H1 title, everything before it is header/nav
                 should_remove = True
                 reason = "H1 article title found"
-            elif header_link_count > 15 or len(header_non_empty) > 20:
+            elif header_link_count > 15 or header_non_empty > 20:
                 # Many links or many lines suggest navigation
                 should_remove = True  
                 reason = "High navigation content"
             
+            self._trace("header", start_line=article_start_line, links=header_link_count,
+                        non_empty_lines=header_non_empty, removed=should_remove,
+                        reason=reason if should_remove else None)
             if should_remove:
-                self._log(f"    >>> REMOVING header navigation ({reason})")
-                markdown = '\n'.join(lines[article_start_line:])
-                lines = markdown.split('\n')
+                self._log("    >>> REMOVING header navigation (%s)", reason)
+                doc = doc.slice(article_start_line)
             else:
-                self._log(f"    -> Keeping header (low navigation content)")
+                self._log("    -> Keeping header (low navigation content)")
         
         # STEP 1: Remove Table of Contents sections (may appear multiple times)
         # Look for "Contents" or "Table of contents" followed by many links
-        toc_removed_count = 0
-        lines = markdown.split('\n')
-        
-        # Keep removing TOCs until we don't find any more
-        max_iterations = 5  # Prevent infinite loop
-        for iteration in range(max_iterations):
-            found_toc = False
-            for i, line in enumerate(lines):
-                stripped = line.strip().lower()
-                # Look for various TOC patterns
-                is_toc_heading = (
-                    stripped == 'contents' or
-                    stripped == 'table of contents' or
-                    'table of contents' in stripped
-                )
-                
-                if is_toc_heading:
-                    # Check next 50 lines for link density
-                    window_end = min(i + 50, len(lines))
-                    window_lines = lines[i:window_end]
-                    window_text = '\n'.join(window_lines)
-                    link_count = window_text.count('](')
-                    non_empty = sum(1 for l in window_lines if l.strip())
-                    
-                    if link_count > 8 and non_empty > 5:
-                        # This is a TOC, find where it ends
-                        # TOC ends when we hit a ## heading (not ###) or substantial paragraph
-                        toc_end = i
-                        for j in range(i + 1, window_end):
-                            line_j = lines[j].strip()
-                            # End of TOC: H2 heading (article content starts)
-                            if line_j.startswith('## ') and not line_j.startswith('### '):
-                                toc_end = j
-                                self._log(f"\n--- Detected TOC at line {i}, ends at line {j}")
-                                self._log(f"    Removed {j-i} lines of table of contents")
-                                toc_removed_count += 1
-                                break
-                        
-                        # Remove TOC lines
-                        if toc_end > i:
-                            markdown = '\n'.join(lines[:i] + lines[toc_end:])
-                            lines = markdown.split('\n')
-                            found_toc = True
-                            break
-            
-            if not found_toc:
-                break
+        toc_ranges = self._find_toc_ranges(doc)
+        toc_removed_count = len(toc_ranges)
+        if toc_ranges:
+            self._trace("toc", ranges=toc_ranges)
+            doc = doc.without(toc_ranges)
         
         # Extract sections from markdown
-        sections = self.extract_markdown_sections(markdown)
+        sections = self.extract_markdown_sections(doc)
         
-        self._log(f"\nDEBUG: Found {len(sections)} sections (TOCs removed: {toc_removed_count})")
+        self._log("\nDEBUG: Found %s sections (TOCs removed: %s)", len(sections), toc_removed_count)
         
         if not sections:
             # No sections found, use simple cleaning
             self._log("DEBUG: No sections found, using clean_markdown fallback")
-            self.log_file.close()
-            return self.clean_markdown(markdown)
-        
-        # Parse HTML for cross-validation
-        soup = BeautifulSoup(html, 'lxml')
+            self._trace("fallback", reason="no sections")
+            return self.clean_markdown(doc)
+        
+        # HTML tree for cross-validation (parsed once per page, shared); text and
+        # link totals per element are computed on first use, and each element's
+        # verdict is remembered since headings often repeat or share containers
+        dom = document.backend
+        heading_index = document.heading_index
+        container_stats = None
+        element_verdicts = {}
+        
+        def in_link_heavy_container(element) -> bool:
+            nonlocal container_stats
+            verdict = element_verdicts.get(dom.node_key(element))
+            if verdict is None:
+                if container_stats is None:
+                    container_stats = subtree_stats(dom, document.root, ['section', 'div', 'footer'])
+                verdict = self._in_link_heavy_container(dom, element, container_stats)
+                element_verdicts[dom.node_key(element)] = verdict
+            return verdict
         
         # Mark sections as footer or content
         for idx, section in enumerate(sections):
             heading_text = section['heading'].lstrip('#').strip()
             
             # Calculate link metrics in markdown - CORRECTLY without link text
-            content = section['content']
-            lines_in_section = content.split('\n')
-            non_empty_lines = [l for l in lines_in_section if l.strip()]
-            link_lines = [l for l in non_empty_lines if '](' in l]
+            # (one scan of the document serves every section)
+            section_start, section_end = section['start_line'], section['end_line'] + 1
+            metrics = doc.span_metrics(section_start, section_end)
+            line_count = metrics['lines']
+            non_empty_count = metrics['non_empty_lines']
+            link_line_count = metrics['link_lines']
             
             # NEW: Calculate text length EXCLUDING link text
-            text_length_no_links, link_count = self._calculate_text_length_without_links(content)
+            text_length_no_links = metrics['text_length_no_links']
+            link_count = metrics['link_count']
             
             # Link density metrics
-            link_ratio = len(link_lines) / max(1, len(non_empty_lines))  # ratio of lines with links
+            link_ratio = link_line_count / max(1, non_empty_count)  # ratio of lines with links
             links_per_100_chars = link_count / max(1, text_length_no_links / 100)
             
             # Markdown detection: HIGH link density patterns
@@ -546,51 +1255,19 @@ class URL2MDConverter:
             
             # Search for heading text in HTML
             if heading_text:
-                # Find all elements containing this heading text
-                matching_elements = soup.find_all(
-                    ['h2', 'h3', 'h4', 'div', 'section'],
-                    string=lambda text: text and heading_text.lower() in text.lower()
+                # Elements whose text is exactly the heading are checked first; only
+                # if none of them decides it, look at every element containing it
+                html_high_links = (
+                    any(in_link_heavy_container(e) for e in heading_index.exact(heading_text)) or
+                    any(in_link_heavy_container(e) for e in heading_index.containing(heading_text))
                 )
-                
-                for element in matching_elements:
-                    # Get parent container (go up to find section/div)
-                    parent = element.parent if element.parent else element
-                    
-                    # Try to find a better container
-                    for _ in range(3):  # Go up max 3 levels
-                        if parent and parent.name in ['section', 'div', 'footer']:
-                            break
-                        if parent:
-                            parent = parent.parent
-                    
-                    if not parent:
-                        continue
-                    
-                    # Calculate link density in HTML
-                    parent_text = parent.get_text(strip=True)
-                    parent_links = parent.find_all('a')
-                    
-                    if parent_text and len(parent_text) > 50:  # Valid section
-                        html_link_count = len(parent_links)
-                        html_text_length = len(parent_text)
-                        html_links_per_100 = html_link_count / max(1, html_text_length / 100)
-                        
-                        # High link density in HTML (>1.5 links per 100 chars OR >8 links total)
-                        if html_links_per_100 > 1.5 or html_link_count > 8:
-                            html_high_links = True
-                            break
             
             # Calculate additional metrics
             avg_chars_per_link = text_length_no_links / link_count if link_count > 0 else float('inf')
             
             # Check if section heading suggests it's navigation/promotional
             heading_lower = heading_text.lower()
-            is_promo_heading = any(keyword in heading_lower for keyword in [
-                'training more people', 'get your team', 'for business',
-                'develop ai applications', 'start upskilling', 'learn more',
-                'related', 'recommended', 'you might also like',
-                'see more', 'browse courses', 'grow your'
-            ])
+            is_promo_heading = self.markers.matches('promo_heading', heading_lower)
             
             is_footer = (
                 # Pattern 1: Extremely high link density (>3 links per 100 chars non-link text)
@@ -633,26 +1310,33 @@ class URL2MDConverter:
             section['link_count'] = link_count
             
             # Debug output
-            self._log(f"\n--- Section {idx}: {heading_text[:50]}...")
-            self._log(f"    Lines: {len(lines_in_section)}, Non-empty: {len(non_empty_lines)}, Link lines: {len(link_lines)}")
-            self._log(f"    Link count: {link_count}, Text length (no links): {text_length_no_links}")
-            self._log(f"    Link ratio: {link_ratio:.2f}, Links/100chars: {links_per_100_chars:.2f}")
-            self._log(f"    Avg chars per link: {avg_chars_per_link:.1f}")
-            self._log(f"    MD high links: {md_high_links}, HTML high links: {html_high_links}")
+            self._log("\n--- Section %s: %s...", idx, heading_text[:50])
+            self._log("    Lines: %s, Non-empty: %s, Link lines: %s", line_count, non_empty_count, link_line_count)
+            self._log("    Link count: %s, Text length (no links): %s", link_count, text_length_no_links)
+            self._log("    Link ratio: %.2f, Links/100chars: %.2f", link_ratio, links_per_100_chars)
+            self._log("    Avg chars per link: %.1f", avg_chars_per_link)
+            self._log("    MD high links: %s, HTML high links: %s", md_high_links, html_high_links)
             
             # Debug: Show found links if suspiciously high count
-            if link_count > 10:
-                found_links = re.findall(r'\[([^\]]+)\]\([^\)]+\)', content)
-                self._log(f"    DEBUG: Found {len(found_links)} links:")
+            if link_count > 10 and self._clean_log.text_enabled:
+                found_links = doc.link_texts(section_start, section_end)
+                self._log("    DEBUG: Found %s links:", len(found_links))
                 for i, link_text in enumerate(found_links[:15]):  # Show first 15
-                    self._log(f"      {i+1}. [{link_text[:50]}...]")
+                    self._log("      %s. [%s...]", i+1, link_text[:50])
                 if len(found_links) > 15:
-                    self._log(f"      ... and {len(found_links) - 15} more")
+                    self._log("      ... and %s more", len(found_links) - 15)
             
-            self._log(f"    >>> IS_FOOTER: {is_footer}")
+            self._log("    >>> IS_FOOTER: %s", is_footer)
+            self._trace("section", index=idx, heading=heading_text, start_line=section_start,
+                        end_line=section['end_line'], link_count=link_count,
+                        text_length_no_links=text_length_no_links,
+                        link_ratio=round(link_ratio, 3),
+                        links_per_100_chars=round(links_per_100_chars, 3),
+                        md_high_links=md_high_links, html_high_links=html_high_links,
+                        promo_heading=is_promo_heading, is_footer=is_footer)
         
         # Post-processing: Detect footer cascade
-        self._log(f"\n--- Post-processing: Detecting footer cascade...")
+        self._log("\n--- Post-processing: Detecting footer cascade...")
         
         # Strategy: Find continuous footer sections at the END
         # Scan backwards to find where the footer cascade starts
@@ -681,8 +1365,8 @@ class URL2MDConverter:
                 
                 if is_substantial:
                     # Hit substantial content, stop cascade detection
-                    self._log(f"  Hit substantial content at section {i}: {section['heading'][:50]}...")
-                    self._log(f"  Text length: {section['text_length_no_links']}, Links/100chars: {section['links_per_100_chars']:.2f}")
+                    self._log("  Hit substantial content at section %s: %s...", i, section['heading'][:50])
+                    self._log("  Text length: %s, Links/100chars: %.2f", section['text_length_no_links'], section['links_per_100_chars'])
                     break
                 elif consecutive_footer_count > 0:
                     # Non-substantial, non-footer section between content and footer
@@ -692,15 +1376,16 @@ class URL2MDConverter:
         # Only mark sections as footer if we found 2+ consecutive link-rich sections at the end
         # IMPORTANT: Also mark them as in_footer_cascade to distinguish from isolated footer-like sections
         if consecutive_footer_count >= 2:
-            self._log(f"  Found {consecutive_footer_count} consecutive footer sections starting at {footer_cascade_start}")
-            self._log(f"  Marking sections {footer_cascade_start} to {len(sections) - 1} as footer cascade")
+            self._log("  Found %s consecutive footer sections starting at %s", consecutive_footer_count, footer_cascade_start)
+            self._log("  Marking sections %s to %s as footer cascade", footer_cascade_start, len(sections) - 1)
+            self._trace("footer_cascade", start_section=footer_cascade_start, sections=consecutive_footer_count)
             for i in range(footer_cascade_start, len(sections)):
                 sections[i]['in_footer_cascade'] = True
                 if not sections[i]['is_footer']:
                     sections[i]['is_footer'] = True
-                    self._log(f"    Marked section {i} as footer: {sections[i]['heading'][:40]}...")
+                    self._log("    Marked section %s as footer: %s...", i, sections[i]['heading'][:40])
         else:
-            self._log(f"  No significant footer cascade detected (only {consecutive_footer_count} consecutive)")
+            self._log("  No significant footer cascade detected (only %s consecutive)", consecutive_footer_count)
             # Mark all sections as NOT in cascade
             for section in sections:
                 section['in_footer_cascade'] = False
@@ -710,29 +1395,24 @@ class URL2MDConverter:
         # 2. Find article start (look for H1 title or first non-footer section)
         
         content_start_line = 0
-        content_end_line = len(markdown.split('\n'))
-        lines = markdown.split('\n')
+        content_end_line = len(doc)
         
-        self._log(f"\n--- Finding content boundaries...")
+        self._log("\n--- Finding content boundaries...")
         
         # Strategy for finding content start:
         # 1. Look for H1 title (# ...) - this marks the true article start
         # 2. If found, start from there
         # 3. If not found, use first non-footer section
         
-        article_title_line = None
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            # Look for H1 heading (article title)
-            if stripped.startswith('# ') and not stripped.startswith('## '):
-                article_title_line = i
-                self._log(f"Found H1 title at line {i}: {stripped[:50]}...")
-                break
+        # Look for H1 heading (article title)
+        article_title_line = doc.first_heading(1)
+        if article_title_line is not None:
+            self._log("Found H1 title at line %s: %s...", article_title_line, doc.stripped[article_title_line][:50])
         
         if article_title_line is not None:
             # Start from the H1 title
             content_start_line = article_title_line
-            self._log(f"Content starts at line {content_start_line} (H1 title)")
+            self._log("Content starts at line %s (H1 title)", content_start_line)
         else:
             # Fallback: use first non-footer section
             first_real_section_idx = None
@@ -743,24 +1423,24 @@ class URL2MDConverter:
             
             if first_real_section_idx is not None:
                 content_start_line = sections[first_real_section_idx]['start_line']
-                self._log(f"Content starts at line {content_start_line} (first non-footer section)")
+                self._log("Content starts at line %s (first non-footer section)", content_start_line)
             else:
-                self._log(f"WARNING: No non-footer sections found!")
+                self._log("WARNING: No non-footer sections found!")
                 content_start_line = 0
         
         # Find content end (remove bottom navigation)
         # IMPORTANT: Only remove sections that are BOTH is_footer=True AND in_footer_cascade=True
         # This prevents removing isolated link-rich sections that have substantial content
-        self._log(f"--- Finding content end (scanning backwards)...")
+        self._log("--- Finding content end (scanning backwards)...")
         for i in range(len(sections) - 1, -1, -1):
             in_cascade = sections[i].get('in_footer_cascade', False)
-            self._log(f"Section {i}: is_footer={sections[i]['is_footer']}, in_cascade={in_cascade}, heading={sections[i]['heading'][:40]}...")
+            self._log("Section %s: is_footer=%s, in_cascade=%s, heading=%s...", i, sections[i]['is_footer'], in_cascade, sections[i]['heading'][:40])
             if sections[i]['is_footer'] and in_cascade:
                 content_end_line = sections[i]['start_line']
-                self._log(f"  -> Set end cutoff to line {content_end_line}")
+                self._log("  -> Set end cutoff to line %s", content_end_line)
             else:
                 # Stop at first section that's not in footer cascade
-                self._log(f"  -> Hit non-cascade section, stopping")
+                self._log("  -> Hit non-cascade section, stopping")
                 break
         
         # ADDITIONAL CHECK: Look for footer markers within sections
@@ -781,7 +1461,7 @@ class URL2MDConverter:
                     sections_to_check.append(idx)
             
             sections_to_check.sort()  # Process in order
-            self._log(f"  Checking sections for footer markers: {sections_to_check}")
+            self._log("  Checking sections for footer markers: %s", sections_to_check)
             
             for section_idx in sections_to_check:
                 section = sections[section_idx]
@@ -790,10 +1470,11 @@ class URL2MDConverter:
                 if section.get('in_footer_cascade', False):
                     continue
                 
-                section_lines = lines[section['start_line']:section['end_line']+1]
+                section_start = section['start_line']
+                section_length = section['end_line'] + 1 - section_start
                 
-                for offset, line in enumerate(section_lines):
-                    stripped = line.strip()
+                for offset in range(section_length):
+                    stripped = doc.stripped[section_start + offset]
                     found_footer_marker = False
                     marker_description = ""
                     
@@ -813,46 +1494,14 @@ class URL2MDConverter:
                             heading_text = stripped[3:].lower()
                             heading_level = 'H2'
                         
-                        # H4 markers (article-level footer)
-                        h4_footer_markers = [
-                            'related post', 'related article', 'related content',
-                            'stay updated', 'subscribe', 'newsletter',
-                            'more from', 'you might also like', 'recommended',
-                            'about the author', 'follow us', 'learn more about'
-                        ]
-                        
-                        # H3 markers (site navigation footer categories)
-                        h3_footer_markers = [
-                            '产品', 'product', 'products',
-                            '资源', 'resource', 'resources',
-                            '社区', 'community',
-                            '公司', 'company', 'about',
-                            '下载', 'download', 'downloads',
-                            '比较', 'compare', 'comparison',
-                            '联系', 'contact', 'contact us',
-                            '支持', 'support',
-                            '法律', 'legal',
-                            '关注', 'follow', 'follow us',
-                            'get started', 'quick links',
-                            '服务', 'service', 'services'
-                        ]
-                        
-                        # H2 markers (marketing/product slogans)
-                        h2_footer_markers = [
-                            'less structure', 'more intelligence',
-                            'get started', 'start free',
-                            'ready to', 'join us',
-                            'try', 'free trial'
-                        ]
-                        
                         # Check if heading matches footer patterns
-                        if heading_level == 'H4' and any(marker in heading_text for marker in h4_footer_markers):
+                        if heading_level == 'H4' and self.markers.matches('h4_footer', heading_text):
                             found_footer_marker = True
                             marker_description = f"H4 heading: {stripped[:60]}"
-                        elif heading_level == 'H3' and any(marker == heading_text for marker in h3_footer_markers):
+                        elif heading_level == 'H3' and self.markers.matches('h3_footer', heading_text):
                             found_footer_marker = True
                             marker_description = f"H3 footer category: {stripped[:60]}"
-                        elif heading_level == 'H2' and any(marker in heading_text for marker in h2_footer_markers):
+                        elif heading_level == 'H2' and self.markers.matches('h2_footer', heading_text):
                             found_footer_marker = True
                             marker_description = f"H2 footer slogan: {stripped[:60]}"
                     
@@ -860,26 +1509,25 @@ class URL2MDConverter:
                     # Look for "* * *" or "---" followed by "Author" or author image
                     if stripped in ['* * *', '---', '***', '* * * *']:
                         # Check next few lines for author indicators
-                        for next_offset in range(offset + 1, min(offset + 5, len(section_lines))):
-                            next_line = section_lines[next_offset].strip().lower()
-                            if any(indicator in next_line for indicator in ['author', '![', 'topics', 'categories']):
+                        for next_offset in range(offset + 1, min(offset + 5, section_length)):
+                            next_line = doc.stripped[section_start + next_offset].lower()
+                            if self.markers.matches('author_info', next_line):
                                 found_footer_marker = True
                                 marker_description = f"Divider + author info at offset {offset}"
                                 break
                     
                     # Pattern 3: Standalone "Author" or "Topics" line (common in blog posts)
-                    if stripped.lower() in ['author', 'topics', 'categories', 'tags', 'share this']:
+                    if self.markers.matches('footer_label', stripped.lower()):
                         found_footer_marker = True
                         marker_description = f"Footer label: {stripped}"
                     
                     if found_footer_marker:
                         footer_start_line = section['start_line'] + offset
-                        self._log(f"\n  -> Found footer marker in section {section_idx} at line {footer_start_line}: {marker_description}")
+                        self._log("\n  -> Found footer marker in section %s at line %s: %s", section_idx, footer_start_line, marker_description)
                         
                         # Verify this is actually footer content (check remaining content)
-                        remaining_lines = section_lines[offset:]
-                        remaining_text = '\n'.join(remaining_lines)
-                        remaining_text_no_links, remaining_links = self._calculate_text_length_without_links(remaining_text)
+                        remaining = doc.span_metrics(footer_start_line, section_start + section_length)
+                        remaining_links = remaining['link_count']
                         
                         # For author/topics markers, be more lenient
                         is_definitely_footer = (
@@ -889,102 +1537,151 @@ class URL2MDConverter:
                             'divider' in marker_description.lower()
                         )
                         
+                        self._trace("footer_marker", section=section_idx, line=footer_start_line,
+                                    marker=marker_description, remaining_links=remaining_links,
+                                    cut=bool(is_definitely_footer))
                         if is_definitely_footer:
                             content_end_line = footer_start_line
-                            self._log(f"     >>> Cutting at footer marker (line {footer_start_line})")
+                            self._log("     >>> Cutting at footer marker (line %s)", footer_start_line)
                             # Stop checking once we found and cut
                             break
                 
                 # If we found a marker and cut, stop checking other sections
-                if content_end_line < len(lines):
+                if content_end_line < len(doc):
                     break
         
-        self._log(f"\nContent range: lines {content_start_line} to {content_end_line}")
+        self._log("\nContent range: lines %s to %s", content_start_line, content_end_line)
         
-        # Extract content between start and end
-        lines = markdown.split('\n')
-        result_lines = lines[content_start_line:content_end_line]
-        
-        # Clean up trailing empty lines
-        while result_lines and not result_lines[-1].strip():
-            result_lines.pop()
+        # Extract content between start and end, without trailing empty lines
+        result_end = content_end_line
+        while result_end > content_start_line and not doc.stripped[result_end - 1]:
+            result_end -= 1
         
-        self._log(f"Result lines: {len(result_lines)} (from {len(lines)})")
+        self._log("Result lines: %s (from %s)", max(0, result_end - content_start_line), len(doc))
         self._log("="*80 + "\n")
+        self._trace("result", start_line=content_start_line, end_line=result_end, lines_before=len(doc))
+        
+        return doc.text(content_start_line, result_end)
+    
+    def _find_toc_ranges(self, doc: MarkdownDocument) -> list[tuple[int, int]]:
+        """Find every table of contents in one forward scan
+        
+        A TOC is a "Contents" / "Table of contents" line followed, within 50
+        lines, by more than 8 links on more than 5 non-empty lines. It runs
+        up to the next H2 heading; without one it is left alone.
         
-        # Close log file
-        self.log_file.close()
+        Args:
+            doc: Markdown document
+            
+        Returns:
+            (start, end) line ranges of the TOCs, end exclusive, in order
+        """
+        toc_ranges = []
+        i = 0
+        while i < len(doc):
+            stripped = doc.stripped[i].lower()
+            # Look for various TOC patterns
+            is_toc_heading = (
+                stripped == 'contents' or
+                'table of contents' in stripped
+            )
+            
+            if is_toc_heading:
+                # Check next 50 lines for link density
+                window_end = min(i + 50, len(doc))
+                link_count = doc.link_mark_count(i, window_end)
+                non_empty = doc.non_empty_count(i, window_end)
+                
+                if link_count > 8 and non_empty > 5:
+                    # This is a TOC, find where it ends
+                    # TOC ends when we hit a ## heading (not ###) or substantial paragraph
+                    toc_end = None
+                    for j in range(i + 1, window_end):
+                        line_j = doc.stripped[j]
+                        # End of TOC: H2 heading (article content starts)
+                        if line_j.startswith('## ') and not line_j.startswith('### '):
+                            toc_end = j
+                            self._log("\n--- Detected TOC at line %s, ends at line %s", i, j)
+                            self._log("    Removed %s lines of table of contents", j-i)
+                            break
+                    
+                    if toc_end is not None:
+                        toc_ranges.append((i, toc_end))
+                        # Continue after the TOC (its closing heading may start another one)
+                        i = toc_end
+                        continue
+            i += 1
         
-        return '\n'.join(result_lines)
+        return toc_ranges
     
-    def extract_markdown_sections(self, markdown: str) -> list[dict]:
+    def extract_markdown_sections(self, markdown: Union[str, MarkdownDocument]) -> list[dict]:
         """Extract sections from markdown with their metadata
         
         Args:
-            markdown: Markdown content
+            markdown: Markdown content (text or MarkdownDocument)
             
         Returns:
             List of section dicts with keys: start_line, end_line, heading, content, link_count
         """
-        lines = markdown.split('\n')
+        doc = MarkdownDocument.of(markdown)
         sections = []
         current_section = None
         
-        for i, line in enumerate(lines):
-            stripped = line.strip()
+        # Detect H2/H3 headings
+        for i, level in doc.headings:
+            if level not in (2, 3):
+                continue
             
-            # Detect H2/H3 headings
-            if stripped.startswith('## ') or stripped.startswith('### '):
-                # Save previous section
-                if current_section:
-                    current_section['end_line'] = i - 1
-                    current_section['content'] = '\n'.join(lines[current_section['start_line']:i])
-                    sections.append(current_section)
-                
-                # Start new section
-                current_section = {
-                    'start_line': i,
-                    'end_line': len(lines) - 1,
-                    'heading': stripped,
-                    'level': 2 if stripped.startswith('## ') else 3
-                }
+            # Save previous section
+            if current_section:
+                current_section['end_line'] = i - 1
+                sections.append(current_section)
+            
+            # Start new section
+            current_section = {
+                'start_line': i,
+                'end_line': len(doc) - 1,
+                'heading': doc.stripped[i],
+                'level': level
+            }
         
         # Save last section
         if current_section:
-            current_section['end_line'] = len(lines) - 1
-            current_section['content'] = '\n'.join(lines[current_section['start_line']:])
+            current_section['end_line'] = len(doc) - 1
             sections.append(current_section)
         
         # Calculate link density for each section (link_count will be calculated separately)
         for section in sections:
-            content = section['content']
+            start, end = section['start_line'], section['end_line'] + 1
+            section['content'] = doc.text(start, end)
             # Basic link count (will be recalculated more accurately in cross_validate_clean)
-            section['link_count'] = content.count('](')
-            section['text_length'] = len(content.strip())  # Keep for now for compatibility
+            section['link_count'] = doc.link_mark_count(start, end)
+            section['text_length'] = doc.stripped_length(start, end)  # Keep for now for compatibility
             section['link_density'] = section['link_count'] / max(1, section['text_length'] / 100)
             
         return sections
     
-    def clean_markdown(self, markdown: str) -> str:
+    def clean_markdown(self, markdown: Union[str, MarkdownDocument]) -> str:
         """Clean up markdown content by removing navigation and unwanted elements
         
         Focus on markdown-level patterns to remove footer/navigation sections.
         
         Args:
-            markdown: Raw markdown content
+            markdown: Raw markdown content (text or MarkdownDocument)
             
         Returns:
             Cleaned markdown
         """
-        lines = markdown.split('\n')
+        doc = MarkdownDocument.of(markdown)
+        lines = doc.lines
+        stripped = doc.stripped
+        link_marks = doc.link_marks
         
         # Step 1: Find content start (remove top navigation if present)
         content_start_idx = 0
         found_content = False
         
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
-            
+        for i, line_stripped in enumerate(stripped):
             if not line_stripped:
                 continue
             
@@ -992,11 +1689,11 @@ class URL2MDConverter:
             if (len(line_stripped) > 150 and 
                 not line_stripped.startswith('[') and 
                 not line_stripped.startswith('*') and
-                line_stripped.count('](') < 3):
+                link_marks[i] < 3):
                 
                 lookback = min(30, i)
                 short_count = sum(1 for j in range(max(0, i-lookback), i) 
-                                 if lines[j].strip() and len(lines[j].strip()) < 100)
+                                 if stripped[j] and len(stripped[j]) < 100)
                 
                 if short_count >= 10:
                     content_start_idx = i
@@ -1006,10 +1703,10 @@ class URL2MDConverter:
             # Or heading + paragraph pattern
             if line_stripped.startswith('#'):
                 for j in range(i+1, min(i+10, len(lines))):
-                    if len(lines[j].strip()) > 150 and lines[j].strip().count('](') < 3:
+                    if len(stripped[j]) > 150 and link_marks[j] < 3:
                         lookback = min(30, i)
                         short_count = sum(1 for k in range(max(0, i-lookback), i)
-                                         if lines[k].strip() and len(lines[k].strip()) < 100)
+                                         if stripped[k] and len(stripped[k]) < 100)
                         if short_count >= 10:
                             content_start_idx = i
                             found_content = True
@@ -1023,18 +1720,17 @@ class URL2MDConverter:
         # Scan backwards to find footer start
         # Look for characteristic patterns of footer sections
         for i in range(len(lines) - 1, max(content_start_idx + 20, 0), -1):
-            line = lines[i].strip()
+            line = stripped[i]
             
             # Pattern 1: H2/H3 heading followed by many links in next lines
             if line.startswith('##'):
                 # Check the next 25 lines for link density
                 window_end = min(i + 25, len(lines))
-                window_lines = lines[i:window_end]
                 
                 # Count lines with links
-                link_lines = sum(1 for l in window_lines if l.strip() and '](' in l)
-                heading_lines = sum(1 for l in window_lines if l.strip().startswith('###'))
-                non_empty = sum(1 for l in window_lines if l.strip())
+                link_lines = sum(1 for j in range(i, window_end) if link_marks[j])
+                heading_lines = sum(1 for j in range(i, window_end) if stripped[j].startswith('###'))
+                non_empty = doc.non_empty_count(i, window_end)
                 
                 # Footer pattern: multiple headings + many link lines
                 # If >40% are link lines AND we have multiple sub-headings
@@ -1049,12 +1745,10 @@ class URL2MDConverter:
             if i > content_start_idx + 30:
                 # Look at 10-line window
                 window_start = max(content_start_idx, i - 10)
-                window_lines = lines[window_start:i+1]
                 
                 # Count lines with 2+ links (navigation list pattern)
-                multi_link_lines = sum(1 for l in window_lines 
-                                      if l.strip() and l.count('](') >= 2)
-                non_empty = sum(1 for l in window_lines if l.strip())
+                multi_link_lines = sum(1 for j in range(window_start, i + 1) if link_marks[j] >= 2)
+                non_empty = doc.non_empty_count(window_start, i + 1)
                 
                 # If >70% of lines have multiple links, it's likely footer
                 if non_empty > 5 and multi_link_lines / non_empty > 0.7:
@@ -1068,19 +1762,18 @@ class URL2MDConverter:
             # Look back from cut point to see if there's real content
             check_back = 10
             for i in range(max(content_end_idx - check_back, content_start_idx), content_end_idx):
-                line = lines[i].strip()
+                line = stripped[i]
                 # If we find a substantial paragraph (>200 chars, few links)
                 # before the cut point, we might be cutting real content
-                if len(line) > 200 and line.count('](') <= 1:
+                if len(line) > 200 and link_marks[i] <= 1:
                     # This looks like article content, be more conservative
                     # Re-scan forward to find a better cut point
                     for j in range(i + 1, min(i + 30, len(lines))):
-                        check_line = lines[j].strip()
+                        check_line = stripped[j]
                         # Look for clear footer markers
                         if (check_line.startswith('##') and 
                             j + 5 < len(lines) and
-                            sum(1 for k in range(j, min(j+10, len(lines))) 
-                                if lines[k].strip() and '](' in lines[k]) >= 5):
+                            sum(1 for k in range(j, min(j+10, len(lines))) if link_marks[k]) >= 5):
                             content_end_idx = j
                             break
                     break
@@ -1092,7 +1785,7 @@ class URL2MDConverter:
         for i in range(content_start_idx, content_end_idx):
             line = lines[i]
             
-            if not line.strip():
+            if not stripped[i]:
                 empty_count += 1
                 if empty_count <= 2:  # Max 2 consecutive empty lines
                     result_lines.append(line)
@@ -1102,27 +1795,34 @@ class URL2MDConverter:
         
         return '\n'.join(result_lines).strip()
     
-    def log_final_output(self, output_path: str):
-        """Prepend the final output file path to the log file
+    def log_final_output(self, output_path: str, log_path: Optional[Path] = None):
+        """Append the final output file path to the log file
+        
+        The record is appended, so it costs the same however long the log is;
+        it closes the log (text) or is its last record (jsonl).
         
         Args:
             output_path: The final saved markdown file path
+            log_path: Log file to update (defaults to the most recent one)
         """
-        if self.log_path and self.log_path.exists():
-            # Read existing log content
-            with open(self.log_path, "r", encoding="utf-8") as f:
-                existing_content = f.read()
-            
-            # Write the output path at the beginning, then append existing content
-            with open(self.log_path, "w", encoding="utf-8") as f:
-                f.write("="*80 + "\n")
-                f.write(f"Saved to: {output_path}\n")
-                f.write("="*80 + "\n\n")
-                f.write(existing_content)
+        log_path = log_path or self.log_path
+        if not log_path or not log_path.exists():
+            return
+        
+        if log_path.suffix == ".jsonl":
+            record = json.dumps({'event': 'saved', 'output_path': output_path}, ensure_ascii=False) + "\n"
+        else:
+            record = "="*80 + "\n" + f"Saved to: {output_path}\n" + "="*80 + "\n"
+        
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(record)
     
     def convert(self, url: str, output_path: Optional[str] = None) -> tuple[str, str]:
         """Convert URL to Markdown (sync wrapper)
         
+        fetch_stats only holds this URL's entry afterwards, so a long-lived
+        converter does not accumulate statistics.
+        
         Args:
             url: The URL to convert
             output_path: Optional output file path for logging
@@ -1133,5 +1833,104 @@ class URL2MDConverter:
         Raises:
             Exception: If conversion fails
         """
+        self.fetch_stats.clear()
+        
         # Run the async conversion
         return asyncio.run(self.convert_async(url, output_path))
+    
+    async def convert_many_async(
+        self,
+        urls: Iterable[str],
+        scheduler: Optional[ConversionScheduler] = None,
+    ) -> AsyncIterator[ConversionResult]:
+        """Convert many URLs with one shared browser, yielding each result as it finishes
+        
+        Pages are fetched concurrently under the scheduler's global and per-host
+        limits. Failures are reported on the yielded result instead of aborting
+        the batch.
+        
+        Args:
+            urls: URLs to convert
+            scheduler: Concurrency/politeness limits (default: ConversionScheduler())
+            
+        Yields:
+            ConversionResult for each URL, in completion order
+        """
+        if scheduler is None:
+            scheduler = ConversionScheduler()
+        
+        async def job(url: str) -> ConversionResult:
+            try:
+                markdown, title = await self.convert_async(url)
+                # Read right after convert_async returns, before yielding to the loop
+                return ConversionResult(
+                    url, markdown, title,
+                    log_path=self.log_path,
+                    fetch_stats=self.fetch_stats.pop(url, None),
+                )
+            except Exception as e:
+                return ConversionResult(url, error=e, fetch_stats=self.fetch_stats.pop(url, None))
+        
+        owns_session = not self._session_open
+        if owns_session:
+            await self.start()
+        
+        try:
+            async for result in scheduler.map(urls, job):
+                yield result
+        finally:
+            if owns_session:
+                await self.close()
+    
+    def convert_many(
+        self,
+        urls: Iterable[str],
+        on_result: Optional[Callable[[ConversionResult], None]] = None,
+        scheduler: Optional[ConversionScheduler] = None,
+    ) -> list[ConversionResult]:
+        """Convert many URLs with one shared browser (sync wrapper)
+        
+        Args:
+            urls: URLs to convert
+            on_result: Optional callback invoked as soon as each URL finishes
+            scheduler: Concurrency/politeness limits (default: ConversionScheduler())
+            
+        Returns:
+            List of ConversionResult in completion order
+        """
+        async def run() -> list[ConversionResult]:
+            results = []
+            async for result in self.convert_many_async(urls, scheduler):
+                if on_result:
+                    on_result(result)
+                results.append(result)
+            return results
+        
+        return asyncio.run(run())
+
+
+# Cleaning worker processes (see URL2MDConverter.clean_workers). Each worker
+# builds one converter with the parent's cleaning options and reuses it.
+_worker_converter = None
+
+
+def _init_clean_worker(options: dict):
+    """Process pool initializer: build the worker's converter"""
+    global _worker_converter
+    _worker_converter = URL2MDConverter(**options)
+
+
+def _warm_up_clean_worker():
+    """No-op task that makes the pool start a worker (and run its initializer)"""
+    return None
+
+
+def _clean_in_worker(
+    url: str,
+    html: str,
+    crawl4ai_markdown: Optional[str],
+    output_path: Optional[str],
+    base_url: Optional[str] = None,
+):
+    """Run URL2MDConverter.process_page in a worker process"""
+    return _worker_converter.process_page(url, html, crawl4ai_markdown, output_path, base_url)
@@ -0,0 +1,327 @@
+"""Per-conversion document models shared by the pipeline stages"""
+
+import re
+from bisect import bisect_left, bisect_right
+from typing import Optional, Union
+
+from .parsers import ParserBackend, get_backend
+
+
+# Markdown link: [text](url); the text and url may span lines
+MARKDOWN_LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+
+
+class ParsedDocument:
+    """HTML of one page, parsed at most once and shared by every stage
+
+    The tree is built lazily on first access, so stages that never need the
+    DOM don't pay for parsing. Stages must treat `root` as read-only; those
+    that prune elements work on a copy (`backend.copy`).
+    """
+
+    def __init__(self, html: str, backend: Optional[ParserBackend] = None):
+        """Initialize parsed document
+
+        Args:
+            html: Raw HTML content
+            backend: Parser backend that builds and queries the tree (default: bs4)
+        """
+        self.html = html
+        self.backend = backend or get_backend("bs4")
+        self._root = None
+        self._title = None
+        self._title_loaded = False
+        self._heading_index = None
+
+    @classmethod
+    def of(
+        cls,
+        html: Union[str, "ParsedDocument"],
+        backend: Optional[ParserBackend] = None,
+    ) -> "ParsedDocument":
+        """Wrap raw HTML, or return an existing document unchanged"""
+        return html if isinstance(html, ParsedDocument) else cls(html, backend)
+
+    @property
+    def root(self):
+        """The parsed tree (built on first access)"""
+        if self._root is None:
+            self._root = self.backend.parse(self.html)
+        return self._root
+
+    @property
+    def title(self) -> Optional[str]:
+        """Text of the <title> element, or None if there is none"""
+        if not self._title_loaded:
+            title = self.backend.find_first(self.root, 'title')
+            self._title = self.backend.text(title) if title is not None else None
+            self._title_loaded = True
+        return self._title
+
+    @property
+    def heading_index(self) -> "HeadingIndex":
+        """Index of elements by their own text (built on first access)"""
+        if self._heading_index is None:
+            self._heading_index = HeadingIndex(self.backend, self.root)
+        return self._heading_index
+
+
+class HeadingIndex:
+    """Elements whose own string may hold a markdown section heading
+
+    Covers h2/h3/h4/div/section elements with a single string (Tag.string),
+    indexed by that string lowercased and stripped. A heading found in the
+    index is contained in those strings by construction; headings that only
+    appear inside a longer string are found by `containing`.
+    """
+
+    ELEMENT_NAMES = ('h2', 'h3', 'h4', 'div', 'section')
+
+    def __init__(self, backend, root):
+        """Build the index in one traversal
+
+        Args:
+            backend: Parser backend that built the tree
+            root: Document root
+        """
+        self.entries = []  # (lowercased string, element) in document order
+        self.by_text = {}
+        for element in backend.find_all(root, self.ELEMENT_NAMES):
+            text = backend.own_string(element)
+            if text:
+                lower = text.lower()
+                self.entries.append((lower, element))
+                self.by_text.setdefault(lower.strip(), []).append(element)
+
+    def exact(self, heading: str) -> list:
+        """Elements whose string is the heading (case-insensitive, ignoring surrounding space)"""
+        return self.by_text.get(heading.lower().strip(), [])
+
+    def containing(self, heading: str) -> list:
+        """Elements whose string contains the heading (case-insensitive), in document order"""
+        heading = heading.lower()
+        return [element for lower, element in self.entries if heading in lower]
+
+
+class MarkdownDocument:
+    """Markdown split into lines once, with the per-line facts the cleaning passes use
+
+    Lines are never re-split: `without` drops line ranges and returns a new
+    document that reuses the already computed lines, and `text` only joins
+    strings when the requested lines are not contiguous in the source.
+    """
+
+    def __init__(self, markdown: str):
+        """Split markdown into lines and precompute per-line data
+
+        Args:
+            markdown: Markdown content
+        """
+        lines = markdown.split('\n')
+        self._init(markdown, lines, [line.strip() for line in lines],
+                   [line.count('](') for line in lines], None)
+
+    def _init(self, source: str, lines: list, stripped: list, link_marks: list, source_offsets: Optional[list]):
+        self.source = source
+        self.lines = lines
+        self.stripped = stripped          # line.strip() of every line
+        self.link_marks = link_marks      # occurrences of '](' per line
+
+        # Start of every line in this document's text, and in the source text
+        # (the same until line ranges are cut out)
+        self.offsets = []
+        offset = 0
+        for line in lines:
+            self.offsets.append(offset)
+            offset += len(line) + 1
+        self._source_offsets = self.offsets if source_offsets is None else source_offsets
+        self._headings = None
+        self._links = None
+
+    @classmethod
+    def of(cls, markdown: Union[str, "MarkdownDocument"]) -> "MarkdownDocument":
+        """Wrap markdown text, or return an existing document unchanged"""
+        return markdown if isinstance(markdown, MarkdownDocument) else cls(markdown)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @property
+    def headings(self) -> list:
+        """(line index, level) of every ATX heading line ('#'*level + ' ...')"""
+        if self._headings is None:
+            self._headings = []
+            for i, stripped in enumerate(self.stripped):
+                if stripped.startswith('#'):
+                    level = len(stripped) - len(stripped.lstrip('#'))
+                    if stripped[level:level + 1] == ' ':
+                        self._headings.append((i, level))
+        return self._headings
+
+    def first_heading(self, level: int) -> Optional[int]:
+        """Line index of the first heading of exactly this level, or None"""
+        for i, heading_level in self.headings:
+            if heading_level == level:
+                return i
+        return None
+
+    def _is_contiguous(self, start: int, end: int) -> bool:
+        """Whether lines [start, end) are adjacent in the source text"""
+        # A cut between two lines makes them further apart in the source
+        source_span = self._source_offsets[end - 1] - self._source_offsets[start]
+        return source_span == self.offsets[end - 1] - self.offsets[start]
+
+    def text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """Text of lines [start, end) joined with newlines"""
+        end = len(self.lines) if end is None else min(end, len(self.lines))
+        if end <= start:
+            return ''
+        if self._is_contiguous(start, end):
+            first = self._source_offsets[start]
+            return self.source[first:self._source_offsets[end - 1] + len(self.lines[end - 1])]
+        return '\n'.join(self.lines[start:end])
+
+    def stripped_length(self, start: int = 0, end: Optional[int] = None) -> int:
+        """len(self.text(start, end).strip()) without building the text"""
+        end = len(self.lines) if end is None else min(end, len(self.lines))
+        first = next((i for i in range(start, end) if self.stripped[i]), None)
+        if first is None:
+            return 0
+        last = next(i for i in range(end - 1, first - 1, -1) if self.stripped[i])
+        if first == last:
+            return len(self.stripped[first])
+        leading = len(self.lines[first]) - len(self.lines[first].lstrip())
+        trailing = len(self.lines[last]) - len(self.lines[last].rstrip())
+        return (self.offsets[last] + len(self.lines[last]) - trailing) - (self.offsets[first] + leading)
+
+    def non_empty_count(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Number of non-blank lines in [start, end)"""
+        return sum(1 for stripped in self.stripped[start:end] if stripped)
+
+    def link_mark_count(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Occurrences of '](' in lines [start, end)"""
+        return sum(self.link_marks[start:end])
+
+    def _scan_links(self):
+        """Find every markdown link in one pass over the text
+
+        Links are stored as (first line, last line, link text) in order, with
+        running totals of the links that fit on one line, so the metrics of
+        any line range are two subtractions.
+        """
+        self._links = []
+        self._multiline_links = []
+        link_count_before = [0] * (len(self.lines) + 1)
+        link_text_before = [0] * (len(self.lines) + 1)
+        for match in MARKDOWN_LINK_RE.finditer(self.text()):
+            first = bisect_right(self.offsets, match.start()) - 1
+            last = bisect_right(self.offsets, match.end() - 1) - 1
+            link = (first, last, match.group(1))
+            self._links.append(link)
+            if first == last:
+                link_count_before[first + 1] += 1
+                link_text_before[first + 1] += len(link[2])
+            else:
+                self._multiline_links.append(link)
+        for i in range(1, len(self.lines) + 1):
+            link_count_before[i] += link_count_before[i - 1]
+            link_text_before[i] += link_text_before[i - 1]
+        self._link_count_before = link_count_before
+        self._link_text_before = link_text_before
+
+    def _span_links_cached(self, start: int, end: int) -> bool:
+        """Whether the cached links of [start, end) are what a scan of its text finds
+
+        Only a link crossing one of the range's edges makes them differ.
+        """
+        return not any(first < edge <= last
+                       for first, last, _ in self._multiline_links
+                       for edge in (start, end))
+
+    def link_texts(self, start: int = 0, end: Optional[int] = None) -> list:
+        """Text of every markdown link in lines [start, end)"""
+        end = len(self.lines) if end is None else min(end, len(self.lines))
+        if end <= start:
+            return []
+        if self._links is None:
+            self._scan_links()
+        if not self._span_links_cached(start, end):
+            return MARKDOWN_LINK_RE.findall(self.text(start, end))
+        first_link = bisect_left(self._links, (start,))
+        last_link = bisect_left(self._links, (end,))
+        return [text for _, last, text in self._links[first_link:last_link] if last < end]
+
+    def span_metrics(self, start: int = 0, end: Optional[int] = None) -> dict:
+        """Line and link statistics of lines [start, end)
+
+        Args:
+            start: First line
+            end: Line after the last one (default: end of document)
+
+        Returns:
+            Dict with lines, non_empty_lines, link_lines (lines containing
+            '](' ), link_count, link_text_length, text_length (of the
+            stripped text) and text_length_no_links (text_length minus link
+            text, at least 1)
+        """
+        end = len(self.lines) if end is None else min(end, len(self.lines))
+        start = min(start, end)
+        if self._links is None:
+            self._scan_links()
+
+        if self._span_links_cached(start, end):
+            link_count = self._link_count_before[end] - self._link_count_before[start]
+            link_text_length = self._link_text_before[end] - self._link_text_before[start]
+            for first, last, text in self._multiline_links:
+                if first >= start and last < end:
+                    link_count += 1
+                    link_text_length += len(text)
+        else:
+            links = MARKDOWN_LINK_RE.findall(self.text(start, end))
+            link_count = len(links)
+            link_text_length = sum(len(text) for text in links)
+
+        text_length = self.stripped_length(start, end)
+        return {
+            'lines': end - start,
+            'non_empty_lines': self.non_empty_count(start, end),
+            'link_lines': sum(1 for marks in self.link_marks[start:end] if marks),
+            'link_count': link_count,
+            'link_text_length': link_text_length,
+            'text_length': text_length,
+            'text_length_no_links': max(1, text_length - link_text_length),
+        }
+
+    def without(self, ranges) -> "MarkdownDocument":
+        """Document with the given line ranges removed
+
+        Args:
+            ranges: (start, end) line ranges to drop, end exclusive
+
+        Returns:
+            New MarkdownDocument sharing this one's source and line data
+        """
+        drop = sorted((max(0, start), min(end, len(self.lines))) for start, end in ranges if end > start)
+        keep = []
+        position = 0
+        for start, end in drop:
+            if start > position:
+                keep.append((position, start))
+            position = max(position, end)
+        if position < len(self.lines):
+            keep.append((position, len(self.lines)))
+
+        def take(values: list) -> list:
+            if len(keep) == 1:
+                return values[keep[0][0]:keep[0][1]]
+            return [value for start, end in keep for value in values[start:end]]
+
+        document = MarkdownDocument.__new__(MarkdownDocument)
+        document._init(self.source, take(self.lines), take(self.stripped),
+                       take(self.link_marks), take(self._source_offsets))
+        return document
+
+    def slice(self, start: int, end: Optional[int] = None) -> "MarkdownDocument":
+        """Document of lines [start, end) only"""
+        end = len(self.lines) if end is None else end
+        return self.without([(0, start), (end, len(self.lines))])
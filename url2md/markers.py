@@ -0,0 +1,169 @@
+"""Keyword vocabularies that mark footer and promotional content in markdown
+
+Each category is matched against lowercased text, either as a substring
+(any keyword occurring anywhere) or, for the exact categories, against the
+whole text. Substring categories are compiled into an Aho-Corasick
+automaton, so a check costs one pass over the text however many keywords
+the vocabulary holds.
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Mapping, Optional
+
+
+DEFAULT_MARKERS = {
+    # H2 headings: marketing/product slogans (substring)
+    'h2_footer': [
+        'less structure', 'more intelligence',
+        'get started', 'start free',
+        'ready to', 'join us',
+        'try', 'free trial',
+    ],
+    # H3 headings: site navigation footer categories (whole heading)
+    'h3_footer': [
+        '产品', 'product', 'products',
+        '资源', 'resource', 'resources',
+        '社区', 'community',
+        '公司', 'company', 'about',
+        '下载', 'download', 'downloads',
+        '比较', 'compare', 'comparison',
+        '联系', 'contact', 'contact us',
+        '支持', 'support',
+        '法律', 'legal',
+        '关注', 'follow', 'follow us',
+        'get started', 'quick links',
+        '服务', 'service', 'services',
+    ],
+    # H4 headings: article-level footers (substring)
+    'h4_footer': [
+        'related post', 'related article', 'related content',
+        'stay updated', 'subscribe', 'newsletter',
+        'more from', 'you might also like', 'recommended',
+        'about the author', 'follow us', 'learn more about',
+    ],
+    # Section headings that suggest navigation/promotion (substring)
+    'promo_heading': [
+        'training more people', 'get your team', 'for business',
+        'develop ai applications', 'start upskilling', 'learn more',
+        'related', 'recommended', 'you might also like',
+        'see more', 'browse courses', 'grow your',
+    ],
+    # Lines after a divider that show author info follows (substring)
+    'author_info': ['author', '![', 'topics', 'categories'],
+    # Standalone footer labels (whole line)
+    'footer_label': ['author', 'topics', 'categories', 'tags', 'share this'],
+}
+
+# Categories matched against the whole text instead of as substrings
+EXACT_CATEGORIES = frozenset(['h3_footer', 'footer_label'])
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton answering "does any keyword occur in this text?" """
+
+    def __init__(self, keywords: Iterable[str]):
+        """Build the automaton
+
+        Args:
+            keywords: Keywords to search for (empty strings are ignored)
+        """
+        # Trie: transitions per state, and whether a keyword ends in the state
+        # (directly or through its failure chain)
+        self._goto = [{}]
+        self._terminal = [False]
+        for keyword in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._terminal.append(False)
+                state = next_state
+            self._terminal[state] = True
+
+        # Failure links, breadth-first so shorter suffixes are resolved first
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._terminal[next_state] = self._terminal[next_state] or self._terminal[self._fail[next_state]]
+                queue.append(next_state)
+
+    def search(self, text: str) -> bool:
+        """Whether any keyword occurs in text"""
+        goto, fail, terminal = self._goto, self._fail, self._terminal
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if terminal[state]:
+                return True
+        return False
+
+
+def load_markers(path) -> dict:
+    """Load extra marker keywords from a JSON file
+
+    Args:
+        path: JSON file mapping category names to lists of keywords
+
+    Returns:
+        Dict of category -> keywords (validated)
+    """
+    with open(Path(path), 'r', encoding='utf-8') as f:
+        markers = json.load(f)
+    _validate(markers, path)
+    return markers
+
+
+def _validate(markers, source):
+    """Raise ValueError unless markers maps known categories to keyword lists"""
+    if not isinstance(markers, dict):
+        raise ValueError(f"Markers must be a JSON object of category -> keywords: {source}")
+    for category, keywords in markers.items():
+        if category not in DEFAULT_MARKERS:
+            raise ValueError(f"Unknown marker category: {category} (expected one of {', '.join(DEFAULT_MARKERS)})")
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            raise ValueError(f"Markers for {category} must be a list of strings")
+
+
+class MarkerSet:
+    """All marker vocabularies, each compiled once into its matcher"""
+
+    def __init__(self, extra: Optional[Mapping[str, Iterable[str]]] = None):
+        """Compile the default vocabularies plus extra keywords
+
+        Args:
+            extra: Additional keywords per category (see DEFAULT_MARKERS)
+        """
+        extra = extra or {}
+        _validate(extra, "extra markers")
+
+        self.vocabularies = {}
+        self._matchers = {}
+        for category, keywords in DEFAULT_MARKERS.items():
+            vocabulary = [k.lower() for k in list(keywords) + list(extra.get(category, []))]
+            self.vocabularies[category] = vocabulary
+            if category in EXACT_CATEGORIES:
+                self._matchers[category] = frozenset(vocabulary)
+            else:
+                self._matchers[category] = KeywordAutomaton(vocabulary)
+
+    def matches(self, category: str, text: str) -> bool:
+        """Whether lowercased text matches the category's vocabulary"""
+        matcher = self._matchers[category]
+        if category in EXACT_CATEGORIES:
+            return text in matcher
+        return matcher.search(text)
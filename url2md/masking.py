@@ -0,0 +1,105 @@
+"""Mask markdown spans that must not be translated
+
+Code blocks, inline code, link/image URLs, raw HTML and bare URLs come back
+from the model unchanged, so sending them only costs tokens and latency.
+`mask_spans` swaps each of them for a short placeholder (⟦0⟧, ⟦1⟧, ...),
+merging placeholders that end up next to each other, and `unmask_spans`
+puts the original text back into the translation.
+"""
+
+import re
+
+
+_PLACEHOLDER_RE = re.compile(r'⟦(\d+)⟧')
+_PLACEHOLDER_RUN_RE = re.compile(r'(?:⟦\d+⟧){2,}')
+
+# Applied in order; the "span" group (or the whole match) is masked. Spans
+# masked earlier are placeholders by the time later patterns run, so a URL
+# inside a code block is never seen on its own.
+_SPAN_PATTERNS = [
+    # Fenced code blocks, fences included
+    re.compile(r'^ {0,3}(`{3,}|~{3,})[^\n]*\n.*?^ {0,3}\1[`~]*[ \t]*$', re.M | re.S),
+    # HTML comments and elements whose content is not prose
+    re.compile(r'<!--.*?-->', re.S),
+    re.compile(r'<(script|style|pre|code|svg)\b[^>]*>.*?</\1\s*>', re.S | re.I),
+    # Inline code
+    re.compile(r'(`+)(?!`).+?(?<!`)\1(?!`)'),
+    # Link and image destinations (with title): [text](url "title")
+    re.compile(r'(?<=\]\()(?P<span>(?:[^()\s]|\([^()\s]*\))+(?:\s+"[^"\n]*")?)(?=\))'),
+    # Reference definitions: [id]: url "title"
+    re.compile(r'^ {0,3}\[[^\]\n]+\]:[ \t]*(?P<span>\S.*)$', re.M),
+    # Autolinks and HTML tags
+    re.compile(r'<(?:https?|mailto):[^>\s]+>'),
+    re.compile(r'</?[A-Za-z][\w-]*(?:\s[^<>]*)?/?>'),
+    # Bare URLs (trailing punctuation stays with the sentence)
+    re.compile(r'https?://[^\s<>()\[\]`]*[^\s<>()\[\]`.,;:!?\'"]'),
+]
+
+
+def mask_spans(text: str) -> tuple[str, list[str]]:
+    """Replace non-translatable spans with placeholders
+
+    Args:
+        text: Markdown text
+
+    Returns:
+        (masked text, spans) where placeholder ⟦i⟧ stands for spans[i]. Text
+        that already contains placeholder-like markers is returned unmasked
+        with no spans.
+    """
+    if _PLACEHOLDER_RE.search(text):
+        return text, []
+
+    spans = []
+
+    def placeholder(span: str) -> str:
+        spans.append(span)
+        return f'⟦{len(spans) - 1}⟧'
+
+    def mask(match: re.Match) -> str:
+        if 'span' not in match.re.groupindex:
+            return placeholder(match.group(0))
+        start, end = match.span('span')
+        offset = match.start()
+        whole = match.group(0)
+        return whole[:start - offset] + placeholder(match.group('span')) + whole[end - offset:]
+
+    for pattern in _SPAN_PATTERNS:
+        text = pattern.sub(mask, text)
+
+    # One placeholder for a run of adjacent ones (e.g. nested HTML tags)
+    text = _PLACEHOLDER_RUN_RE.sub(lambda m: placeholder(m.group(0)), text)
+    return text, spans
+
+
+def unmask_spans(text: str, spans: list[str]) -> str:
+    """Restore the spans masked by mask_spans
+
+    Args:
+        text: Masked text (typically its translation)
+        spans: Spans returned by mask_spans
+
+    Returns:
+        Text with every placeholder replaced by its original span
+
+    Raises:
+        ValueError: If placeholders of the masked text are missing from text
+    """
+    if not spans:
+        return text
+
+    # Placeholders nested in other spans come back with them; every other
+    # one must be in the text
+    nested = {int(i) for span in spans for i in _PLACEHOLDER_RE.findall(span)}
+    expected = set(range(len(spans))) - nested
+    missing = expected - {int(i) for i in _PLACEHOLDER_RE.findall(text)}
+    if missing:
+        raise ValueError(f"Translation lost {len(missing)} of {len(expected)} placeholders")
+
+    def restore(match: re.Match) -> str:
+        index = int(match.group(1))
+        if index >= len(spans):
+            return match.group(0)
+        return _PLACEHOLDER_RE.sub(restore, spans[index])
+
+    return _PLACEHOLDER_RE.sub(restore, text)
@@ -0,0 +1,507 @@
+"""HTML parser backends used by the DOM-based cleaning stages
+
+The cleaning code in converter.py talks to the DOM only through a small
+backend interface, so the same heuristics run on either engine:
+
+- "bs4":  BeautifulSoup with the lxml tree builder (the original engine)
+- "lxml": raw lxml.html element trees (C-backed, several times faster)
+
+Both backends follow BeautifulSoup's semantics where the heuristics depend
+on them: text() matches get_text(strip=True) (script/style/template
+contents, ruby annotations and comments are skipped), own_string()
+matches Tag.string and
+remove() keeps the text that follows the removed element.
+
+BeautifulSoup and lxml are imported when a backend is first created, so
+importing this module (and the CLI) stays cheap.
+"""
+
+import copy
+import re
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+# Bound by _import_bs4() / _import_lxml() when a backend is created
+BeautifulSoup = Tag = NavigableString = CData = None
+lxml = etree = None
+
+
+def _import_bs4():
+    global BeautifulSoup, Tag, NavigableString, CData
+    from bs4 import BeautifulSoup, Tag, NavigableString, CData
+
+
+def _import_lxml():
+    global lxml, etree
+    import lxml.html
+    from lxml import etree
+
+
+# Elements whose text content is not page text (BeautifulSoup skips them in get_text)
+NON_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+_SIMPLE_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][a-zA-Z0-9-]*)?'
+    r'(?:\.(?P<cls>[\w-]+))?'
+    r'(?:\[(?P<attr>[\w-]+)(?P<op>\*?=)"(?P<value>[^"]*)"\])?$'
+)
+
+
+def compile_selector(selector: str):
+    """Compile a simple CSS selector into a predicate over (backend, element)
+
+    Supports the forms used by the content selectors: `tag`, `.class`,
+    `tag.class`, `[attr="value"]` and `[attr*="value"]`.
+
+    Args:
+        selector: CSS selector
+
+    Returns:
+        Function (backend, element) -> bool
+    """
+    match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+    if not match or not any(match.group('tag', 'cls', 'attr')):
+        raise ValueError(f"Unsupported selector: {selector}")
+
+    tag = match.group('tag')
+    cls = match.group('cls')
+    attr = match.group('attr')
+    op = match.group('op')
+    value = match.group('value')
+
+    def matches(backend, element) -> bool:
+        if tag and backend.tag_name(element) != tag.lower():
+            return False
+        if cls and cls not in backend.get_classes(element):
+            return False
+        if attr:
+            actual = backend.get_attr(element, attr)
+            if actual is None:
+                return False
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and (not value or value not in actual):
+                return False
+        return True
+
+    return matches
+
+
+class ParserBackend(ABC):
+    """Interface of a DOM engine (see module docstring for semantics)
+
+    Engines implement every abstract method; an incomplete one fails when
+    it is instantiated.
+    """
+
+    name = None
+
+    @abstractmethod
+    def parse(self, html: str):
+        """Parse HTML and return the document root"""
+
+    @abstractmethod
+    def iter_descendants(self, node) -> Iterator:
+        """Yield all descendant elements of node in document order (not node itself)"""
+
+    @abstractmethod
+    def tag_name(self, element) -> str:
+        """Lowercase tag name"""
+
+    def node_key(self, node):
+        """Hashable key identifying a node for as long as its tree is alive"""
+        return id(node)
+
+    @abstractmethod
+    def get_attr(self, element, name: str) -> Optional[str]:
+        """Attribute value as a string, or None ('class' is space-joined)"""
+
+    @abstractmethod
+    def get_classes(self, element) -> list[str]:
+        """List of class names"""
+
+    @abstractmethod
+    def parent(self, element):
+        """Parent element, or None at the top of the tree"""
+
+    @abstractmethod
+    def children(self, node) -> list:
+        """Child elements in document order"""
+
+    @abstractmethod
+    def text(self, element) -> str:
+        """Concatenated stripped text (BeautifulSoup get_text(strip=True))"""
+
+    @abstractmethod
+    def own_text_length(self, element) -> int:
+        """Length of the stripped strings directly inside element (not inside child elements)"""
+
+    @abstractmethod
+    def own_string(self, element) -> Optional[str]:
+        """The element's single string child, followed down single-child chains (Tag.string)"""
+
+    @abstractmethod
+    def remove(self, element):
+        """Remove element and its subtree, keeping the text that follows it"""
+
+    @abstractmethod
+    def copy_as_document(self, node):
+        """Deep copy of a document, or of an element as the only child of a new document's <body>
+
+        Same tree as parsing the serialized element on its own, so the
+        element itself is a descendant of the returned document.
+        """
+
+    @abstractmethod
+    def to_html(self, node) -> str:
+        """Serialize an element or document"""
+
+    def find_first(self, node, name: str):
+        """First descendant element with the given tag name, or None"""
+        for element in self.iter_descendants(node):
+            if self.tag_name(element) == name:
+                return element
+        return None
+
+    def select_one(self, node, selector: str):
+        """First descendant matching a simple CSS selector, or None"""
+        matches = compile_selector(selector)
+        for element in self.iter_descendants(node):
+            if matches(self, element):
+                return element
+        return None
+
+    def find_all(self, node, names) -> list:
+        """All descendant elements whose tag name is in names"""
+        names = frozenset(names)
+        return [e for e in self.iter_descendants(node) if self.tag_name(e) in names]
+
+
+class BeautifulSoupBackend(ParserBackend):
+    """BeautifulSoup tree built with lxml (original engine)"""
+
+    name = "bs4"
+
+    def __init__(self):
+        _import_bs4()
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, 'lxml')
+
+    def iter_descendants(self, node) -> Iterator:
+        for element in node.descendants:
+            if isinstance(element, Tag):
+                yield element
+
+    def tag_name(self, element) -> str:
+        return element.name
+
+    def get_attr(self, element, name: str) -> Optional[str]:
+        value = element.get(name)
+        if isinstance(value, list):
+            return ' '.join(value)
+        return value
+
+    def get_classes(self, element) -> list[str]:
+        return element.get('class') or []
+
+    def parent(self, element):
+        return element.parent
+
+    def children(self, node) -> list:
+        return [child for child in node.children if isinstance(child, Tag)]
+
+    def text(self, element) -> str:
+        return element.get_text(strip=True)
+
+    def own_text_length(self, element) -> int:
+        # Same string types get_text() counts (no comments, script, ruby text...)
+        return sum(len(child.strip()) for child in element.children if type(child) in (NavigableString, CData))
+
+    def own_string(self, element) -> Optional[str]:
+        return element.string
+
+    def remove(self, element):
+        element.decompose()
+
+    def copy_as_document(self, node):
+        if isinstance(node, BeautifulSoup):
+            return copy.copy(node)
+        document = BeautifulSoup('<html><body></body></html>', 'lxml')
+        document.body.append(copy.copy(node))
+        return document
+
+    def to_html(self, node) -> str:
+        return str(node)
+
+    def select_one(self, node, selector: str):
+        # soupsieve handles full CSS; results match the simple matcher for our selectors
+        return node.select_one(selector)
+
+    def find_first(self, node, name: str):
+        return node.find(name)
+
+    def find_all(self, node, names) -> list:
+        return node.find_all(list(names))
+
+
+class LxmlBackend(ParserBackend):
+    """Raw lxml.html element tree
+
+    The document node is the lxml ElementTree, so walking up from <html>
+    reaches a document-level node just like BeautifulSoup's root object.
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        _import_lxml()
+
+    def parse(self, html: str):
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # Unicode strings with an XML encoding declaration must be parsed as bytes
+            root = lxml.html.document_fromstring(html.encode('utf-8'))
+        except etree.ParserError:
+            # Empty or whitespace-only document
+            root = lxml.html.document_fromstring('<html><body></body></html>')
+        return root.getroottree()
+
+    @staticmethod
+    def _is_document(node) -> bool:
+        return isinstance(node, etree._ElementTree)
+
+    def iter_descendants(self, node) -> Iterator:
+        if self._is_document(node):
+            node = node.getroot()
+            yield node
+        for element in node.iterdescendants():
+            if isinstance(element.tag, str):
+                yield element
+
+    def tag_name(self, element) -> str:
+        if self._is_document(element):
+            return '[document]'
+        return element.tag.lower() if isinstance(element.tag, str) else ''
+
+    def node_key(self, node):
+        # getroottree() returns a new ElementTree object on every call
+        if self._is_document(node):
+            return ('document', id(node.getroot()))
+        return id(node)
+
+    def get_attr(self, element, name: str) -> Optional[str]:
+        if self._is_document(element):
+            return None
+        value = element.get(name)
+        if value is not None and name == 'class':
+            return ' '.join(value.split())
+        return value
+
+    def get_classes(self, element) -> list[str]:
+        if self._is_document(element):
+            return []
+        return element.get('class', '').split()
+
+    def parent(self, element):
+        if self._is_document(element):
+            return None
+        parent = element.getparent()
+        if parent is None:
+            return element.getroottree()
+        return parent
+
+    def children(self, node) -> list:
+        if self._is_document(node):
+            return [node.getroot()]
+        return [child for child in node if isinstance(child.tag, str)]
+
+    def text(self, element) -> str:
+        if self._is_document(element):
+            element = element.getroot()
+        # Iterative walk: text, then each child's subtree, then the child's tail
+        if not self._has_text(element):
+            return ''
+        parts = []
+        self._append_stripped(parts, element.text)
+        stack = [(element, iter(element))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if self._has_text(child):
+                    self._append_stripped(parts, child.text)
+                    stack.append((child, iter(child)))
+                    break
+                # Comment or script/style: skip its content, keep the text after it
+                self._append_stripped(parts, child.tail)
+            else:
+                stack.pop()
+                if stack:
+                    self._append_stripped(parts, node.tail)
+        return ''.join(parts)
+
+    def own_text_length(self, element) -> int:
+        if self._is_document(element) or not self._has_text(element):
+            return 0
+        length = len(element.text.strip()) if element.text else 0
+        for child in element:
+            if child.tail:
+                length += len(child.tail.strip())
+        return length
+
+    @staticmethod
+    def _has_text(element) -> bool:
+        """Whether an element's own text counts as page text"""
+        return isinstance(element.tag, str) and element.tag.lower() not in NON_TEXT_TAGS
+
+    @staticmethod
+    def _append_stripped(parts: list, value: Optional[str]):
+        """Append value stripped of whitespace, if anything is left"""
+        if value:
+            value = value.strip()
+            if value:
+                parts.append(value)
+
+    def own_string(self, element) -> Optional[str]:
+        if self._is_document(element):
+            return None
+        children = len(element)
+        if element.text:
+            return element.text if children == 0 else None
+        if children != 1:
+            return None
+        child = element[0]
+        if child.tail:
+            return None
+        if not isinstance(child.tag, str):
+            # Comment or processing instruction: BeautifulSoup returns its text
+            return child.text
+        return self.own_string(child)
+
+    def remove(self, element):
+        if element.getparent() is None:
+            # The root element can't be detached; empty it instead
+            element.clear()
+        else:
+            element.drop_tree()
+
+    def copy_as_document(self, node):
+        if self._is_document(node):
+            return copy.deepcopy(node)
+        root = lxml.html.document_fromstring('<html><body></body></html>')
+        duplicate = copy.deepcopy(node)
+        duplicate.tail = None
+        root.find('body').append(duplicate)
+        return root.getroottree()
+
+    def to_html(self, node) -> str:
+        return lxml.html.tostring(node, encoding='unicode', method='html', with_tail=False)
+
+
+def subtree_stats(backend: ParserBackend, node, container_names) -> dict:
+    """Aggregate text and link statistics for node and every element under it
+
+    One post-order traversal; each element's numbers are the sums of its
+    children's, so nothing is rescanned per element.
+
+    Args:
+        backend: Backend that built the tree
+        node: Root of the subtree
+        container_names: Tag names counted as containers (e.g. section/div)
+
+    Returns:
+        Dict mapping backend.node_key(element) to a record with keys element, containers
+        (descendant containers), text_length (len of text()), link_count
+        (descendant <a>), link_text_length (summed text length of those <a>),
+        order (position in document order, node = 0) and removed
+    """
+    container_names = frozenset(container_names)
+    stats = {}
+    order = {}
+    # (element, children, inside a non-text element); children is None until expanded
+    stack = [(node, None, False)]
+    while stack:
+        element, children, silent = stack.pop()
+        if children is None:
+            # Pre-order visit: number elements in document order
+            order[backend.node_key(element)] = len(order)
+            children = backend.children(element)
+            silent = silent or backend.tag_name(element) in NON_TEXT_TAGS
+            stack.append((element, children, silent))
+            stack.extend((child, None, silent) for child in reversed(children))
+            continue
+
+        record = {
+            'element': element,
+            'containers': 0,
+            'text_length': 0 if silent else backend.own_text_length(element),
+            'link_count': 0,
+            'link_text_length': 0,
+            'order': order[backend.node_key(element)],
+            'removed': False,
+        }
+        for child in children:
+            child_stats = stats[backend.node_key(child)]
+            name = backend.tag_name(child)
+            record['containers'] += child_stats['containers'] + (name in container_names)
+            record['text_length'] += child_stats['text_length']
+            record['link_count'] += child_stats['link_count'] + (name == 'a')
+            record['link_text_length'] += child_stats['link_text_length']
+            if name == 'a':
+                record['link_text_length'] += child_stats['text_length']
+        stats[backend.node_key(element)] = record
+    return stats
+
+
+def remove_with_stats(backend: ParserBackend, element, stats: dict, container_names):
+    """Remove element and keep the subtree_stats() of the remaining tree exact
+
+    The element's totals are subtracted from every ancestor and the element
+    and its descendants are marked removed.
+
+    Args:
+        backend: Backend that built the tree
+        element: Element to remove
+        stats: Result of subtree_stats() for a subtree containing element
+        container_names: Same container names passed to subtree_stats()
+    """
+    removed = stats[backend.node_key(element)]
+    name = backend.tag_name(element)
+    containers = removed['containers'] + (name in container_names)
+    link_count = removed['link_count'] + (name == 'a')
+    link_text_length = removed['link_text_length'] + (removed['text_length'] if name == 'a' else 0)
+
+    ancestor = backend.parent(element)
+    while ancestor is not None and backend.node_key(ancestor) in stats:
+        ancestor_stats = stats[backend.node_key(ancestor)]
+        ancestor_stats['containers'] -= containers
+        ancestor_stats['text_length'] -= removed['text_length']
+        ancestor_stats['link_count'] -= link_count
+        ancestor_stats['link_text_length'] -= link_text_length
+        ancestor = backend.parent(ancestor)
+
+    removed['removed'] = True
+    for descendant in backend.iter_descendants(element):
+        stats[backend.node_key(descendant)]['removed'] = True
+    backend.remove(element)
+
+
+BACKENDS = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+    LxmlBackend.name: LxmlBackend,
+}
+
+
+def get_backend(name: str) -> ParserBackend:
+    """Create a parser backend by name
+
+    Args:
+        name: "bs4" or "lxml"
+
+    Returns:
+        ParserBackend instance
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,157 @@
+"""Rules for elements removed from the main content before conversion
+
+A rule is a dict with any of these keys (all given conditions must hold):
+
+    tags            list of tag names the element must have
+    class_contains  substrings; matches if any class contains any of them
+    id_contains     substrings; matches if the id contains any of them
+    name            optional label used in error messages
+
+Matching is case-insensitive. Rules can be kept in a JSON file (a list of
+rule dicts) and loaded with `load_rules`.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+RULE_KEYS = ("name", "tags", "class_contains", "id_contains")
+
+DEFAULT_REMOVAL_RULES = [
+    # Always unwanted
+    {"name": "scripts", "tags": ["script", "style", "iframe"]},
+    # Semantic navigation/header/footer elements
+    {"name": "semantic-chrome", "tags": ["nav", "header", "footer", "aside"]},
+    # Navigation
+    {"name": "nav-class", "tags": ["div", "section"], "class_contains": ["nav"]},
+    {"name": "nav-id", "tags": ["div", "section"], "id_contains": ["nav"]},
+    # Sidebar
+    {"name": "sidebar-class", "class_contains": ["sidebar"]},
+    {"name": "sidebar-id", "id_contains": ["sidebar"]},
+    # Comments
+    {"name": "comments-class", "class_contains": ["comment"]},
+    {"name": "comments-id", "id_contains": ["comment"]},
+    # Ads and promotions
+    {"name": "ads", "class_contains": ["advertisement", "ad-", "promo"]},
+    # Social sharing
+    {"name": "share", "class_contains": ["share"]},
+]
+
+
+def load_rules(path) -> list[dict]:
+    """Load removal rules from a JSON file
+
+    Args:
+        path: JSON file holding a list of rule dicts
+
+    Returns:
+        List of rules (validated)
+    """
+    with open(Path(path), 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"Rules file must contain a JSON list: {path}")
+    for rule in rules:
+        _compile_rule(rule)
+    return rules
+
+
+def _substring_re(values, field: str, label: str) -> Optional[re.Pattern]:
+    """Regex matching any of the substrings, or None if there are none"""
+    if not values:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    values = [v.lower() for v in values]
+    if any(not v or v.split() != [v] for v in values):
+        raise ValueError(f"Rule {label}: {field} entries must be non-empty and without spaces")
+    return re.compile('|'.join(re.escape(v) for v in values))
+
+
+def _compile_rule(rule: dict) -> tuple:
+    """Turn a rule dict into (tags, class regex, id regex)"""
+    if not isinstance(rule, dict):
+        raise ValueError(f"Rule must be a dict: {rule!r}")
+    label = rule.get("name") or repr(rule)
+    unknown = set(rule) - set(RULE_KEYS)
+    if unknown:
+        raise ValueError(f"Rule {label}: unknown keys {', '.join(sorted(unknown))}")
+
+    tags = rule.get("tags")
+    if isinstance(tags, str):
+        tags = [tags]
+    tags = frozenset(t.lower() for t in tags) if tags else None
+    class_re = _substring_re(rule.get("class_contains"), "class_contains", label)
+    id_re = _substring_re(rule.get("id_contains"), "id_contains", label)
+    if tags is None and class_re is None and id_re is None:
+        raise ValueError(f"Rule {label}: needs at least one of tags, class_contains, id_contains")
+    return tags, class_re, id_re
+
+
+class RuleMatcher:
+    """All removal rules compiled into one matcher for a single tree traversal"""
+
+    def __init__(self, rules: Iterable[dict] = DEFAULT_REMOVAL_RULES):
+        """Compile rules
+
+        Args:
+            rules: Rule dicts (see module docstring)
+        """
+        self.rules = list(rules)
+
+        # Rules on the tag alone become one set lookup; the rest are checked in turn
+        self._tags = set()
+        self._attribute_rules = []
+        for rule in self.rules:
+            tags, class_re, id_re = _compile_rule(rule)
+            if class_re is None and id_re is None:
+                self._tags |= tags
+            else:
+                self._attribute_rules.append((tags, class_re, id_re))
+        self._tags = frozenset(self._tags)
+
+    def matches(self, name: str, classes: list[str], element_id: Optional[str]) -> bool:
+        """Whether an element with this tag name, class list and id is unwanted"""
+        if name in self._tags:
+            return True
+        if not self._attribute_rules:
+            return False
+
+        # Classes never contain spaces, so a substring can't match across two of them
+        class_text = ' '.join(classes).lower() if classes else None
+        id_text = element_id.lower() if element_id else None
+        for tags, class_re, id_re in self._attribute_rules:
+            if tags is not None and name not in tags:
+                continue
+            if class_re is not None and (class_text is None or not class_re.search(class_text)):
+                continue
+            if id_re is not None and (id_text is None or not id_re.search(id_text)):
+                continue
+            return True
+        return False
+
+    def find_matches(self, backend, node) -> list:
+        """Unwanted elements under node, in one traversal
+
+        Subtrees of matched elements are not searched (they go with their
+        ancestor), so every returned element can be removed independently.
+
+        Args:
+            backend: ParserBackend that built the tree
+            node: Root of the subtree to search (not tested itself)
+
+        Returns:
+            Matched elements in document order
+        """
+        matched = []
+        stack = list(reversed(backend.children(node)))
+        while stack:
+            element = stack.pop()
+            if self.matches(backend.tag_name(element), backend.get_classes(element),
+                            backend.get_attr(element, 'id')):
+                matched.append(element)
+            else:
+                stack.extend(reversed(backend.children(element)))
+        return matched
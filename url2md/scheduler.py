@@ -0,0 +1,122 @@
+"""Bounded-concurrency scheduling with per-host politeness limits"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Iterable, AsyncIterator, TypeVar
+from urllib.parse import urlparse
+
+
+T = TypeVar("T")
+
+
+class ConversionScheduler:
+    """Run URL jobs concurrently under a global limit and per-host limits
+
+    Each job first takes a slot for its hostname (at most ``per_host_limit``
+    in flight per host), then a global slot (at most ``max_concurrency`` in
+    flight overall), and finally waits until ``min_host_delay`` seconds have
+    passed since the last job started on the same host. Waiting on a busy
+    host never holds a global slot, so one slow site does not stall the
+    others; the delay is applied once the job can actually start, so jobs
+    queued behind a full global limit still start spaced out.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        per_host_limit: int = 2,
+        min_host_delay: float = 0.5,
+    ):
+        """Initialize scheduler
+
+        Args:
+            max_concurrency: Maximum jobs running at once across all hosts
+            per_host_limit: Maximum jobs running at once against one hostname
+            min_host_delay: Minimum seconds between job starts on one hostname
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit must be at least 1")
+        if min_host_delay < 0:
+            raise ValueError("min_host_delay must not be negative")
+
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.min_host_delay = min_host_delay
+
+        # Created lazily so they bind to the running event loop
+        self._global = None
+        self._hosts = {}
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Hostname used to group politeness limits"""
+        return (urlparse(url).hostname or "").lower()
+
+    def _host_state(self, host: str) -> dict:
+        """Get (or create) the semaphore, delay lock and last start time for a host"""
+        state = self._hosts.get(host)
+        if state is None:
+            state = {
+                'semaphore': asyncio.Semaphore(self.per_host_limit),
+                'lock': asyncio.Lock(),
+                'last_start': 0.0,
+            }
+            self._hosts[host] = state
+        return state
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold a host slot and a global slot for the duration of one job
+
+        Args:
+            url: URL the job will request
+        """
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+
+        state = self._host_state(self.host_key(url))
+
+        async with state['semaphore']:
+            async with self._global:
+                # Space out request starts on the same host
+                async with state['lock']:
+                    wait = state['last_start'] + self.min_host_delay - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    state['last_start'] = time.monotonic()
+                yield
+
+    async def map(
+        self,
+        urls: Iterable[str],
+        job: Callable[[str], Awaitable[T]],
+    ) -> AsyncIterator[T]:
+        """Run job(url) for every URL, yielding results in completion order
+
+        Exceptions raised by a job propagate to the consumer; wrap the job if
+        failures should be reported per URL instead.
+
+        Args:
+            urls: URLs to process
+            job: Coroutine function called once per URL
+
+        Yields:
+            Each job's return value as soon as it finishes
+        """
+        async def run(url: str) -> T:
+            async with self.slot(url):
+                return await job(url)
+
+        tasks = [asyncio.ensure_future(run(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early or a job failed: don't leave work running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
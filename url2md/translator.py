@@ -6,6 +6,14 @@ from pathlib import Path
 from typing import Optional, Dict, Any, Literal
 import httpx
 from datetime import datetime
+from .cache import TranslationCache, CACHE_MODES
+from .chunker import chunk_markdown
+from .masking import mask_spans, unmask_spans
+
+
+# Bump whenever _create_translation_prompt changes, so translations made with
+# an older prompt are not served from the cache
+PROMPT_VERSION = 2
 
 
 class TranslationConfig:
@@ -22,6 +30,12 @@ class TranslationConfig:
         target_language: str = "Chinese",
         chunk_size: int = 3000,
         timeout: int = 120,
+        max_concurrency: Optional[int] = None,
+        http2: bool = False,
+        cache_mode: str = "use",
+        cache_path: str = "cache/translations.sqlite3",
+        cache_max_mb: float = 100,
+        mask_spans: bool = True,
     ):
         """Initialize translation configuration
         
@@ -35,6 +49,16 @@ class TranslationConfig:
             target_language: Target language for translation
             chunk_size: Characters per chunk for large documents
             timeout: Request timeout in seconds
+            max_concurrency: Chunks translated at once (default: 4, or 1 for
+                ollama, whose local server handles one request at a time)
+            http2: Use HTTP/2 for API requests (needs `pip install httpx[http2]`)
+            cache_mode: Translated-chunk cache: "use" serves cached chunks,
+                "refresh" retranslates and overwrites them, "bypass" disables it
+            cache_path: SQLite file of the translation cache
+            cache_max_mb: Size of cached translations kept before the least
+                recently used are evicted
+            mask_spans: Send code, URLs and raw HTML as placeholders instead
+                of text, and restore them in the translation
         """
         self.provider = provider
         self.api_key = api_key
@@ -43,6 +67,14 @@ class TranslationConfig:
         self.max_tokens = max_tokens
         self.chunk_size = chunk_size
         self.timeout = timeout
+        self.http2 = http2
+        
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {cache_mode} (expected one of {', '.join(CACHE_MODES)})")
+        self.cache_mode = cache_mode
+        self.cache_path = cache_path
+        self.cache_max_mb = cache_max_mb
+        self.mask_spans = mask_spans
         
         # Set default model and API base based on provider
         if model is None:
@@ -54,6 +86,13 @@ class TranslationConfig:
             self.api_base = self._get_default_api_base(provider)
         else:
             self.api_base = api_base
+        
+        if max_concurrency is None:
+            self.max_concurrency = self._get_default_max_concurrency(provider)
+        elif max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        else:
+            self.max_concurrency = max_concurrency
     
     def _get_default_model(self, provider: str) -> str:
         """Get default model for provider"""
@@ -73,6 +112,15 @@ class TranslationConfig:
         }
         return defaults.get(provider, "https://api.openai.com/v1")
     
+    def _get_default_max_concurrency(self, provider: str) -> int:
+        """Get default number of concurrent chunk requests for provider"""
+        defaults = {
+            "openai": 4,
+            "gemini": 4,
+            "ollama": 1,
+        }
+        return defaults.get(provider, 4)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert config to dictionary"""
         return {
@@ -84,20 +132,91 @@ class TranslationConfig:
             "target_language": self.target_language,
             "chunk_size": self.chunk_size,
             "timeout": self.timeout,
+            "max_concurrency": self.max_concurrency,
+            "http2": self.http2,
+            "cache_mode": self.cache_mode,
+            "cache_path": self.cache_path,
+            "cache_max_mb": self.cache_max_mb,
+            "mask_spans": self.mask_spans,
         }
 
 
+def create_http_client(config: TranslationConfig) -> httpx.AsyncClient:
+    """Create a pooled HTTP client for translation API requests
+    
+    Connections are kept alive between chunks and retries; the pool holds
+    one connection per concurrent chunk request.
+    
+    Args:
+        config: Translation configuration (timeout, max_concurrency, http2)
+        
+    Returns:
+        httpx.AsyncClient (the caller closes it)
+    """
+    # Separate read timeout: translations of long chunks take a while
+    timeout = httpx.Timeout(
+        connect=30.0,  # Connection timeout
+        read=config.timeout,  # Read timeout (for response)
+        write=30.0,  # Write timeout
+        pool=30.0  # Pool timeout
+    )
+    return httpx.AsyncClient(
+        timeout=timeout,
+        http2=config.http2,
+        limits=httpx.Limits(
+            max_connections=config.max_concurrency,
+            max_keepalive_connections=config.max_concurrency,
+        ),
+    )
+
+
 class TranslationAgent:
     """Agent for translating Markdown files using various LLM APIs"""
     
-    def __init__(self, config: TranslationConfig):
+    def __init__(self, config: TranslationConfig, http_client: Optional[httpx.AsyncClient] = None):
         """Initialize translation agent
         
         Args:
             config: Translation configuration
+            http_client: Client shared with other agents (e.g. across a batch);
+                the caller closes it. Without one, the agent opens its own
+                for each file (or between start() and close())
         """
         self.config = config
         self.log_messages = []
+        self._http_client = http_client
+        self._owns_client = http_client is None
+        
+        # Translated chunks from earlier runs (per chunk text and settings)
+        self.cache = None
+        if config.cache_mode != "bypass":
+            self.cache = TranslationCache(Path(config.cache_path), int(config.cache_max_mb * 1024 * 1024))
+    
+    async def start(self):
+        """Open the HTTP client reused by every request until close()"""
+        if self._http_client is None:
+            self._http_client = create_http_client(self.config)
+    
+    async def close(self):
+        """Close the HTTP client opened by start()"""
+        if self._owns_client and self._http_client is not None:
+            client = self._http_client
+            self._http_client = None
+            await client.aclose()
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """POST on the shared client, or on a one-off client outside a session"""
+        if self._http_client is not None:
+            return await self._http_client.post(url, **kwargs)
+        async with create_http_client(self.config) as client:
+            return await client.post(url, **kwargs)
     
     def _log(self, message: str):
         """Add log message"""
@@ -106,60 +225,41 @@ class TranslationAgent:
         self.log_messages.append(log_entry)
         print(log_entry)
     
-    def _create_translation_prompt(self, content: str) -> str:
+    def _create_translation_prompt(self, content: str, placeholders: bool = False) -> str:
         """Create translation prompt
         
         Args:
             content: Markdown content to translate
+            placeholders: Whether content has masked spans (see masking.py)
             
         Returns:
             Translation prompt
         """
+        placeholder_rule = "\n5. Copy every placeholder like ⟦0⟧ exactly, once, in place" if placeholders else ""
         return f"""Translate this Markdown to {self.config.target_language}.
 
 Rules:
 1. Keep all Markdown formatting (headers, links, code blocks, lists)
 2. Don't translate: code blocks, URLs, HTML tags
 3. Keep original structure
-4. Output only the translated Markdown
+4. Output only the translated Markdown{placeholder_rule}
 
 {content}"""
     
     def _split_content(self, content: str) -> list[str]:
         """Split content into chunks for translation
         
+        Chunks follow the markdown block structure (see chunker.py): they
+        break between headings, paragraphs, code blocks and tables, never
+        inside a code fence or a table.
+        
         Args:
             content: Full markdown content
             
         Returns:
             List of content chunks
         """
-        # If content is small enough, return as single chunk
-        if len(content) <= self.config.chunk_size:
-            return [content]
-        
-        chunks = []
-        lines = content.split('\n')
-        current_chunk = []
-        current_length = 0
-        
-        for line in lines:
-            line_length = len(line) + 1  # +1 for newline
-            
-            # If adding this line exceeds chunk size, start new chunk
-            if current_length + line_length > self.config.chunk_size and current_chunk:
-                chunks.append('\n'.join(current_chunk))
-                current_chunk = [line]
-                current_length = line_length
-            else:
-                current_chunk.append(line)
-                current_length += line_length
-        
-        # Add remaining content
-        if current_chunk:
-            chunks.append('\n'.join(current_chunk))
-        
-        return chunks
+        return chunk_markdown(content, self.config.chunk_size)
     
     async def _call_openai_api(self, prompt: str) -> str:
         """Call OpenAI-compatible API
@@ -191,30 +291,21 @@ Rules:
         
         url = f"{self.config.api_base}/chat/completions"
         
-        # Create timeout configuration with separate read timeout
-        timeout = httpx.Timeout(
-            connect=30.0,  # Connection timeout
-            read=self.config.timeout,  # Read timeout (for response)
-            write=30.0,  # Write timeout
-            pool=30.0  # Pool timeout
-        )
-        
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                response = await client.post(url, headers=headers, json=data)
-                response.raise_for_status()
-                result = response.json()
-                
-                return result["choices"][0]["message"]["content"].strip()
-            except httpx.TimeoutException as e:
-                self._log(f"✗ Timeout error: {e}")
-                raise Exception(f"Translation request timed out after {self.config.timeout}s. Try reducing chunk_size or increasing timeout.")
-            except httpx.HTTPStatusError as e:
-                self._log(f"✗ HTTP error {e.response.status_code}: {e.response.text}")
-                raise Exception(f"API returned error {e.response.status_code}: {e.response.text[:200]}")
-            except Exception as e:
-                self._log(f"✗ Unexpected error: {e}")
-                raise
+        try:
+            response = await self._post(url, headers=headers, json=data)
+            response.raise_for_status()
+            result = response.json()
+            
+            return result["choices"][0]["message"]["content"].strip()
+        except httpx.TimeoutException as e:
+            self._log(f"✗ Timeout error: {e}")
+            raise Exception(f"Translation request timed out after {self.config.timeout}s. Try reducing chunk_size or increasing timeout.")
+        except httpx.HTTPStatusError as e:
+            self._log(f"✗ HTTP error {e.response.status_code}: {e.response.text}")
+            raise Exception(f"API returned error {e.response.status_code}: {e.response.text[:200]}")
+        except Exception as e:
+            self._log(f"✗ Unexpected error: {e}")
+            raise
     
     async def _call_gemini_api(self, prompt: str) -> str:
         """Call Google Gemini API
@@ -247,30 +338,49 @@ Rules:
         if self.config.max_tokens:
             data["generationConfig"]["maxOutputTokens"] = self.config.max_tokens
         
-        # Create timeout configuration
-        timeout = httpx.Timeout(
-            connect=30.0,
-            read=self.config.timeout,
-            write=30.0,
-            pool=30.0
-        )
+        try:
+            response = await self._post(url, params=params, headers=headers, json=data)
+            response.raise_for_status()
+            result = response.json()
+            
+            return result["candidates"][0]["content"]["parts"][0]["text"].strip()
+        except httpx.TimeoutException as e:
+            self._log(f"✗ Timeout error: {e}")
+            raise Exception(f"Translation request timed out after {self.config.timeout}s")
+        except httpx.HTTPStatusError as e:
+            self._log(f"✗ HTTP error {e.response.status_code}: {e.response.text}")
+            raise Exception(f"API returned error {e.response.status_code}: {e.response.text[:200]}")
+        except Exception as e:
+            self._log(f"✗ Unexpected error: {e}")
+            raise
+    
+    async def _call_api(self, prompt: str) -> str:
+        """Call the configured provider's API
         
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                response = await client.post(url, params=params, headers=headers, json=data)
-                response.raise_for_status()
-                result = response.json()
-                
-                return result["candidates"][0]["content"]["parts"][0]["text"].strip()
-            except httpx.TimeoutException as e:
-                self._log(f"✗ Timeout error: {e}")
-                raise Exception(f"Translation request timed out after {self.config.timeout}s")
-            except httpx.HTTPStatusError as e:
-                self._log(f"✗ HTTP error {e.response.status_code}: {e.response.text}")
-                raise Exception(f"API returned error {e.response.status_code}: {e.response.text[:200]}")
-            except Exception as e:
-                self._log(f"✗ Unexpected error: {e}")
-                raise
+        Args:
+            prompt: Translation prompt
+            
+        Returns:
+            Translated text
+        """
+        if self.config.provider == "gemini":
+            return await self._call_gemini_api(prompt)
+        # Both OpenAI and Ollama use OpenAI-compatible API
+        return await self._call_openai_api(prompt)
+    
+    def _cache_key(self, chunk: str) -> str:
+        """Translation cache key: the chunk plus every setting that shapes its translation"""
+        return TranslationCache.key(
+            chunk,
+            provider=self.config.provider,
+            api_base=self.config.api_base,
+            model=self.config.model,
+            target_language=self.config.target_language,
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            prompt_version=PROMPT_VERSION,
+            mask_spans=self.config.mask_spans,
+        )
     
     async def _translate_chunk(self, chunk: str, chunk_num: int, total_chunks: int) -> str:
         """Translate a single chunk with retry mechanism
@@ -283,9 +393,22 @@ Rules:
         Returns:
             Translated chunk
         """
-        self._log(f"Translating chunk {chunk_num}/{total_chunks} ({len(chunk)} chars)...")
+        cache_key = self._cache_key(chunk)
+        if self.cache is not None and self.config.cache_mode == "use":
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._log(f"✓ Chunk {chunk_num}/{total_chunks} served from cache ({len(cached)} chars)")
+                return cached
+        
+        # Code, URLs and raw HTML come back unchanged: send placeholders instead
+        masked, spans = mask_spans(chunk) if self.config.mask_spans else (chunk, [])
+        if spans:
+            self._log(f"Translating chunk {chunk_num}/{total_chunks} ({len(chunk)} chars, "
+                      f"{len(masked)} sent with {len(spans)} spans masked)...")
+        else:
+            self._log(f"Translating chunk {chunk_num}/{total_chunks} ({len(chunk)} chars)...")
         
-        prompt = self._create_translation_prompt(chunk)
+        prompt = self._create_translation_prompt(masked, placeholders=bool(spans))
         
         # Retry mechanism for transient failures
         max_retries = 2
@@ -293,14 +416,22 @@ Rules:
         
         for attempt in range(max_retries + 1):
             try:
-                # Call appropriate API based on provider
-                if self.config.provider == "gemini":
-                    translated = await self._call_gemini_api(prompt)
-                else:
-                    # Both OpenAI and Ollama use OpenAI-compatible API
-                    translated = await self._call_openai_api(prompt)
+                translated = await self._call_api(prompt)
+                
+                if spans:
+                    try:
+                        translated = unmask_spans(translated, spans)
+                    except ValueError as e:
+                        # The model dropped placeholders: resend the chunk as is right
+                        # away (not a failed attempt, so no backoff)
+                        self._log(f"⚠ {e}, resending chunk {chunk_num} unmasked")
+                        prompt = self._create_translation_prompt(chunk)
+                        spans = []
+                        translated = await self._call_api(prompt)
                 
                 self._log(f"✓ Chunk {chunk_num}/{total_chunks} translated ({len(translated)} chars)")
+                if self.cache is not None:
+                    self.cache.put(cache_key, translated)
                 return translated
                 
             except Exception as e:
@@ -344,11 +475,41 @@ Rules:
         if total_chunks > 1:
             self._log(f"Split into {total_chunks} chunks for translation")
         
-        # Translate each chunk
-        translated_chunks = []
-        for i, chunk in enumerate(chunks, 1):
-            translated_chunk = await self._translate_chunk(chunk, i, total_chunks)
-            translated_chunks.append(translated_chunk)
+        # Translate chunks concurrently (at most max_concurrency requests in
+        # flight); gather keeps the results in chunk order
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        completed = 0
+        
+        async def translate(chunk: str, chunk_num: int) -> str:
+            nonlocal completed
+            async with semaphore:
+                translated_chunk = await self._translate_chunk(chunk, chunk_num, total_chunks)
+            completed += 1
+            if total_chunks > 1:
+                self._log(f"Progress: {completed}/{total_chunks} chunks done")
+            return translated_chunk
+        
+        # One pooled client serves every chunk and retry of the file, unless
+        # a session (or a client shared across files) is already open
+        owns_session = self._http_client is None
+        if owns_session:
+            await self.start()
+        
+        tasks = [asyncio.ensure_future(translate(chunk, i)) for i, chunk in enumerate(chunks, 1)]
+        try:
+            translated_chunks = await asyncio.gather(*tasks)
+        except BaseException:
+            # One chunk failed for good: don't keep paying for the others
+            for task in tasks:
+                task.cancel()
+            # Let them unwind before the shared client closes
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            if owns_session:
+                await self.close()
+            if self.cache is not None:
+                self.cache.close()
         
         # Combine translated chunks
         translated_content = '\n\n'.join(translated_chunks)
@@ -435,6 +596,7 @@ async def translate_markdown_file(
     config: Optional[TranslationConfig] = None,
     auto_translate: bool = False,
     output_path: Optional[Path] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
 ) -> Optional[Path]:
     """Translate a Markdown file with confirmation
     
@@ -443,6 +605,8 @@ async def translate_markdown_file(
         config: Translation configuration (uses default if not provided)
         auto_translate: If True, skip confirmation
         output_path: Path to output file (optional)
+        http_client: Client to reuse across files (see create_http_client);
+            not closed here
         
     Returns:
         Path to translated file, or None if translation was cancelled
@@ -458,7 +622,7 @@ async def translate_markdown_file(
             return None
     
     # Create translator and translate
-    translator = TranslationAgent(config)
+    translator = TranslationAgent(config, http_client)
     
     try:
         translated_path = await translator.translate_file(input_path, output_path)